@@ -13,7 +13,7 @@ from azure.cli.command_modules.interactive.events import (
     EVENT_INTERACTIVE_POST_SUB_TREE_CREATE
 )
 
-from azext_alias.util import get_alias_table
+from azext_alias.util import get_alias_index
 from azext_alias._validators import (
     process_alias_create_namespace,
     process_alias_import_namespace,
@@ -85,7 +85,7 @@ def get_alias_completer(cmd, prefix, namespace, **kwargs):  # pylint: disable=un
     """
     An argument completer for alias name.
     """
-    return get_alias_table().sections()
+    return get_alias_index().sections()
 
 
 COMMAND_LOADER_CLS = AliasExtCommandLoader
@@ -9,16 +9,23 @@ from azure.cli.core._environment import get_config_dir
 
 GLOBAL_CONFIG_DIR = get_config_dir()
 ALIAS_FILE_NAME = 'alias'
-ALIAS_HASH_FILE_NAME = 'alias.sha1'
-COLLIDED_ALIAS_FILE_NAME = 'collided_alias'
+ALIAS_STATE_FILE_NAME = 'alias_state'
+ALIAS_STATE_VERSION = 1
+ALIAS_INDEX_FILE_NAME = 'alias.index'
+ALIAS_INDEX_VERSION = 3
 ALIAS_TAB_COMP_TABLE_FILE_NAME = 'alias_tab_completion'
 GLOBAL_ALIAS_TAB_COMP_TABLE_PATH = os.path.join(GLOBAL_CONFIG_DIR, ALIAS_TAB_COMP_TABLE_FILE_NAME)
+ALIAS_TEMPLATE_CACHE_DIR_NAME = 'alias_templates'
+GLOBAL_ALIAS_TEMPLATE_CACHE_DIR = os.path.join(GLOBAL_CONFIG_DIR, ALIAS_TEMPLATE_CACHE_DIR_NAME)
+RESERVED_COMMANDS_FILE_NAME = 'alias_reserved_commands'
+GLOBAL_RESERVED_COMMANDS_PATH = os.path.join(GLOBAL_CONFIG_DIR, RESERVED_COMMANDS_FILE_NAME)
 COLLISION_CHECK_LEVEL_DEPTH = 5
 
 INSUFFICIENT_POS_ARG_ERROR = 'alias: "{}" takes exactly {} positional argument{} ({} given)'
 CONFIG_PARSING_ERROR = 'alias: Please ensure you have a valid alias configuration file. Error detail: %s'
 DEBUG_MSG = 'Alias Manager: Transforming "%s" to "%s"'
 DEBUG_MSG_WITH_TIMING = 'Alias Manager: Transformed args to %s in %.3fms'
+PHASE_DEBUG_MSG = 'Alias Manager: Phase "%s" completed in %.3fms'
 POS_ARG_DEBUG_MSG = 'Alias Manager: Transforming "%s" to "%s", with the following positional arguments: %s'
 DUPLICATED_PLACEHOLDER_ERROR = 'alias: Duplicated placeholders found when transforming "{}"'
 RENDER_TEMPLATE_ERROR = 'alias: Encounted error when injecting positional arguments to "{}". Error detail: {}'
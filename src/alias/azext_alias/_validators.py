@@ -9,17 +9,17 @@ import shlex
 
 from knack.util import CLIError
 
-import azext_alias
 from azext_alias.argument import get_placeholders
 from azext_alias.util import (
     get_config_parser,
     is_url,
     reduce_alias_table,
     filter_alias_create_namespace,
-    retrieve_file_from_url
+    retrieve_file_from_url,
+    remove_pos_arg_placeholders,
+    get_reserved_command_index
 )
 from azext_alias._const import (
-    COLLISION_CHECK_LEVEL_DEPTH,
     INVALID_ALIAS_COMMAND_ERROR,
     EMPTY_ALIAS_ERROR,
     INVALID_STARTING_CHAR_ERROR,
@@ -108,18 +108,10 @@ def _validate_alias_command(alias_command):
     if not alias_command:
         raise CLIError(EMPTY_ALIAS_ERROR)
 
-    split_command = shlex.split(alias_command)
-    boundary_index = len(split_command)
-    for i, subcommand in enumerate(split_command):
-        if not re.match('^[a-z]', subcommand.lower()) or i > COLLISION_CHECK_LEVEL_DEPTH:
-            boundary_index = i
-            break
-
     # Extract possible CLI commands and validate
-    command_to_validate = ' '.join(split_command[:boundary_index]).lower()
-    for command in azext_alias.cached_reserved_commands:
-        if re.match(r'([a-z\-]*\s)*{}($|\s)'.format(command_to_validate), command):
-            return
+    command_to_validate = remove_pos_arg_placeholders(alias_command)
+    if get_reserved_command_index().has_command(command_to_validate):
+        return
 
     _validate_positional_arguments(shlex.split(alias_command))
 
@@ -188,20 +180,30 @@ def _validate_alias_file_path(alias_file_path):
 def _validate_alias_file_content(alias_file_path, url=''):
     """
     Make sure the alias name and alias command in the alias file is in valid format.
+    All the aliases are validated against the same reserved command index, and the errors
+    of all invalid aliases are reported together.
 
     Args:
         The alias file path to import aliases from.
     """
     alias_table = get_config_parser()
+    error_messages = []
     try:
         alias_table.read(alias_file_path)
-        for alias_name, alias_command in reduce_alias_table(alias_table):
+    except Exception as exception:  # pylint: disable=broad-except
+        error_messages.append(AliasManager.process_exception_message(exception))
+
+    for alias_name, alias_command in reduce_alias_table(alias_table):
+        try:
             _validate_alias_name(alias_name)
             _validate_alias_command(alias_command)
             _validate_alias_command_level(alias_name, alias_command)
             _validate_pos_args_syntax(alias_name, alias_command)
-    except Exception as exception:  # pylint: disable=broad-except
-        error_msg = CONFIG_PARSING_ERROR % AliasManager.process_exception_message(exception)
+        except Exception as exception:  # pylint: disable=broad-except
+            error_messages.append(AliasManager.process_exception_message(exception))
+
+    if error_messages:
+        error_msg = CONFIG_PARSING_ERROR % '\n'.join(error_messages)
         error_msg = error_msg.replace(alias_file_path, url or alias_file_path)
         raise CLIError(error_msg)
 
@@ -228,10 +230,11 @@ def _validate_positional_arguments(args):
         else:
             break
 
+    reserved_command_index = get_reserved_command_index()
     while nouns:
         search = ' '.join(nouns)
         # Since the command name may be immediately followed by a positional arg, strip those off
-        if not next((x for x in azext_alias.cached_reserved_commands if x.endswith(search)), False):
+        if not reserved_command_index.has_command_suffix(search):
             del nouns[-1]
         else:
             return
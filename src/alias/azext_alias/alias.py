@@ -4,7 +4,6 @@
 # --------------------------------------------------------------------------------------------
 
 import os
-import re
 import json
 import shlex
 import hashlib
@@ -12,30 +11,44 @@ from collections import defaultdict
 
 from knack.log import get_logger
 
-import azext_alias
 from azext_alias import telemetry
 from azext_alias._const import (
     GLOBAL_CONFIG_DIR,
     ALIAS_FILE_NAME,
-    ALIAS_HASH_FILE_NAME,
-    COLLIDED_ALIAS_FILE_NAME,
+    ALIAS_STATE_FILE_NAME,
+    ALIAS_STATE_VERSION,
+    ALIAS_INDEX_FILE_NAME,
     CONFIG_PARSING_ERROR,
     DEBUG_MSG,
     COLLISION_CHECK_LEVEL_DEPTH,
     POS_ARG_DEBUG_MSG
 )
-from azext_alias.argument import build_pos_args_table, render_template
+from azext_alias.argument import build_pos_args_table, render_template, clear_template_cache
+from azext_alias.index import AliasIndex
+from azext_alias.profiler import (
+    profile_phase,
+    CONFIG_READ_PHASE,
+    HASH_CHECK_PHASE,
+    COMMAND_TABLE_LOAD_PHASE,
+    COLLISION_TABLE_BUILD_PHASE,
+    COMPLETION_TABLE_BUILD_PHASE,
+    TEMPLATE_RENDER_PHASE,
+    ENV_VAR_EXPANSION_PHASE,
+    STATE_WRITE_PHASE
+)
 from azext_alias.util import (
     is_alias_command,
     cache_reserved_commands,
-    get_config_parser,
+    load_alias_index,
+    write_file_atomically,
+    get_reserved_command_index,
     build_tab_completion_table
 )
 
 
 GLOBAL_ALIAS_PATH = os.path.join(GLOBAL_CONFIG_DIR, ALIAS_FILE_NAME)
-GLOBAL_ALIAS_HASH_PATH = os.path.join(GLOBAL_CONFIG_DIR, ALIAS_HASH_FILE_NAME)
-GLOBAL_COLLIDED_ALIAS_PATH = os.path.join(GLOBAL_CONFIG_DIR, COLLIDED_ALIAS_FILE_NAME)
+GLOBAL_ALIAS_STATE_PATH = os.path.join(GLOBAL_CONFIG_DIR, ALIAS_STATE_FILE_NAME)
+GLOBAL_ALIAS_INDEX_PATH = os.path.join(GLOBAL_CONFIG_DIR, ALIAS_INDEX_FILE_NAME)
 
 logger = get_logger(__name__)
 
@@ -43,51 +56,48 @@ logger = get_logger(__name__)
 class AliasManager(object):
 
     def __init__(self, **kwargs):
-        self.alias_table = get_config_parser()
+        self.alias_table = AliasIndex()
         self.kwargs = kwargs
         self.collided_alias = defaultdict(list)
         self.alias_config_str = ''
         self.alias_config_hash = ''
-        self.load_alias_table()
-        self.load_alias_hash()
+        # The alias state persisted by the last run, see read_alias_state()
+        self.alias_state = {}
+        with profile_phase(CONFIG_READ_PHASE):
+            self.load_alias_table()
+        with profile_phase(HASH_CHECK_PHASE):
+            self.load_alias_hash()
 
     def load_alias_table(self):
         """
         Load (create, if not exist) the alias config file.
+
+        The parsed alias table is loaded from the alias index if it was compiled from the current
+        alias config file. Otherwise, the alias config file is parsed and the alias index is recompiled.
         """
         try:
-            # w+ creates the alias config file if it does not exist
-            open_mode = 'r+' if os.path.exists(GLOBAL_ALIAS_PATH) else 'w+'
-            with open(GLOBAL_ALIAS_PATH, open_mode) as alias_config_file:
-                self.alias_config_str = alias_config_file.read()
-            self.alias_table.read(GLOBAL_ALIAS_PATH)
+            if os.path.exists(GLOBAL_ALIAS_PATH):
+                with open(GLOBAL_ALIAS_PATH, 'r') as alias_config_file:
+                    self.alias_config_str = alias_config_file.read()
+            self.alias_table = load_alias_index(self.alias_config_str)
             telemetry.set_number_of_aliases_registered(len(self.alias_table.sections()))
         except Exception as exception:  # pylint: disable=broad-except
             logger.warning(CONFIG_PARSING_ERROR, AliasManager.process_exception_message(exception))
-            self.alias_table = get_config_parser()
+            self.alias_table = AliasIndex()
             telemetry.set_exception(exception)
 
     def load_alias_hash(self):
         """
-        Load (create, if not exist) the alias hash file.
+        Load the alias hash from the alias state file.
         """
-        # w+ creates the alias hash file if it does not exist
-        open_mode = 'r+' if os.path.exists(GLOBAL_ALIAS_HASH_PATH) else 'w+'
-        with open(GLOBAL_ALIAS_HASH_PATH, open_mode) as alias_config_hash_file:
-            self.alias_config_hash = alias_config_hash_file.read()
+        self.alias_state = AliasManager.read_alias_state()
+        self.alias_config_hash = self.alias_state.get('hash', '')
 
     def load_collided_alias(self):
         """
-        Load (create, if not exist) the collided alias file.
+        Load the collided aliases from the alias state file.
         """
-        # w+ creates the alias config file if it does not exist
-        open_mode = 'r+' if os.path.exists(GLOBAL_COLLIDED_ALIAS_PATH) else 'w+'
-        with open(GLOBAL_COLLIDED_ALIAS_PATH, open_mode) as collided_alias_file:
-            collided_alias_str = collided_alias_file.read()
-            try:
-                self.collided_alias = json.loads(collided_alias_str if collided_alias_str else '{}')
-            except Exception:  # pylint: disable=broad-except
-                self.collided_alias = {}
+        self.collided_alias = self.alias_state.get('collided_alias', {})
 
     def detect_alias_config_change(self):
         """
@@ -120,14 +130,22 @@ class AliasManager(object):
         """
         if self.parse_error():
             # Write an empty hash so next run will check the config file against the entire command table again
-            AliasManager.write_alias_config_hash(empty_hash=True)
+            if self.alias_state.get('hash'):
+                AliasManager.write_alias_state('', self.alias_state.get('collided_alias', {}))
             return args
 
         # Only load the entire command table if it detects changes in the alias config
-        if self.detect_alias_config_change():
-            self.load_full_command_table()
-            self.collided_alias = AliasManager.build_collision_table(self.alias_table.sections())
-            build_tab_completion_table(self.alias_table)
+        with profile_phase(HASH_CHECK_PHASE):
+            alias_config_changed = self.detect_alias_config_change()
+
+        if alias_config_changed:
+            with profile_phase(COMMAND_TABLE_LOAD_PHASE):
+                self.load_full_command_table()
+            with profile_phase(COLLISION_TABLE_BUILD_PHASE):
+                self.collided_alias = AliasManager.build_collision_table(self.alias_table.sections())
+            with profile_phase(COMPLETION_TABLE_BUILD_PHASE):
+                build_tab_completion_table(self.alias_table)
+                clear_template_cache()
         else:
             self.load_collided_alias()
 
@@ -156,14 +174,19 @@ class AliasManager(object):
             pos_args_table = build_pos_args_table(full_alias, args, alias_index)
             if pos_args_table:
                 logger.debug(POS_ARG_DEBUG_MSG, full_alias, cmd_derived_from_alias, pos_args_table)
-                transformed_commands += render_template(cmd_derived_from_alias, pos_args_table)
+                with profile_phase(TEMPLATE_RENDER_PHASE):
+                    compiled_expressions = self.alias_table.get_compiled_expressions(full_alias)
+                    transformed_commands += render_template(cmd_derived_from_alias, pos_args_table,
+                                                            compiled_expressions)
 
                 # Skip the next arg(s) because they have been already consumed as a positional argument above
                 for pos_arg in pos_args_table:  # pylint: disable=unused-variable
                     next(alias_iter)
             else:
                 logger.debug(DEBUG_MSG, full_alias, cmd_derived_from_alias)
-                transformed_commands += shlex.split(cmd_derived_from_alias)
+                split_command = self.alias_table.get_split_command(full_alias)
+                transformed_commands += split_command if split_command is not None \
+                    else shlex.split(cmd_derived_from_alias)
 
         return self.post_transform(transformed_commands)
 
@@ -177,22 +200,21 @@ class AliasManager(object):
         Returns:
             The full alias (with the placeholders, if any).
         """
-        if query in self.alias_table.sections():
-            return query
-
-        return next((section for section in self.alias_table.sections() if section.split()[0] == query), '')
+        return self.alias_table.get_full_alias(query)
 
     def load_full_command_table(self):
         """
         Perform a full load of the command table to get all the reserved command words.
+        The full load is skipped if the reserved commands are persisted for the installed commands.
         """
         load_cmd_tbl_func = self.kwargs.get('load_cmd_tbl_func', lambda _: {})
-        cache_reserved_commands(load_cmd_tbl_func)
-        telemetry.set_full_command_table_loaded()
+        if cache_reserved_commands(load_cmd_tbl_func):
+            telemetry.set_full_command_table_loaded()
 
     def post_transform(self, args):
         """
-        Inject environment variables, and write hash to alias hash file after transforming alias to commands.
+        Inject environment variables, and write the alias state file after transforming alias to commands.
+        The alias state file is only written if the alias hash or the collided aliases have changed.
 
         Args:
             args: A list of args to post-transform.
@@ -201,15 +223,18 @@ class AliasManager(object):
         args = args[1:] if args and args[0] == 'az' else args
 
         post_transform_commands = []
-        for i, arg in enumerate(args):
-            # Do not translate environment variables for command argument
-            if is_alias_command(['create'], args) and i > 0 and args[i - 1] in ['-c', '--command']:
-                post_transform_commands.append(arg)
-            else:
-                post_transform_commands.append(os.path.expandvars(arg))
-
-        AliasManager.write_alias_config_hash(self.alias_config_hash)
-        AliasManager.write_collided_alias(self.collided_alias)
+        with profile_phase(ENV_VAR_EXPANSION_PHASE):
+            for i, arg in enumerate(args):
+                # Do not translate environment variables for command argument
+                if is_alias_command(['create'], args) and i > 0 and args[i - 1] in ['-c', '--command']:
+                    post_transform_commands.append(arg)
+                else:
+                    post_transform_commands.append(os.path.expandvars(arg))
+
+        if self.alias_config_hash != self.alias_state.get('hash') \
+                or self.collided_alias != self.alias_state.get('collided_alias'):
+            with profile_phase(STATE_WRITE_PHASE):
+                AliasManager.write_alias_state(self.alias_config_hash, self.collided_alias)
 
         return post_transform_commands
 
@@ -246,41 +271,55 @@ class AliasManager(object):
             levels: the amount of levels we tranverse through the command table tree.
         """
         collided_alias = defaultdict(list)
+        reserved_command_index = get_reserved_command_index()
         for alias in aliases:
             # Only care about the first word in the alias because alias
             # cannot have spaces (unless they have positional arguments)
             word = alias.split()[0]
-            for level in range(1, levels + 1):
-                collision_regex = r'^{}{}($|\s)'.format(r'([a-z\-]*\s)' * (level - 1), word.lower())
-                if list(filter(re.compile(collision_regex).match, azext_alias.cached_reserved_commands)) \
-                        and level not in collided_alias[word]:
+            for level in reserved_command_index.get_collision_levels(word, levels):
+                if level not in collided_alias[word]:
                     collided_alias[word].append(level)
 
         telemetry.set_collided_aliases(list(collided_alias.keys()))
         return collided_alias
 
     @staticmethod
-    def write_alias_config_hash(alias_config_hash='', empty_hash=False):
+    def read_alias_state():
         """
-        Write self.alias_config_hash to the alias hash file.
+        Read the alias state file, which is structured as:
+        {
+            'version': ALIAS_STATE_VERSION,
+            'hash': the SHA1 of the alias config file that the collided aliases are built from,
+            'collided_alias': the collision table, see build_collision_table()
+        }
 
-        Args:
-            empty_hash: True if we want to write an empty string into the file. Empty string in the alias hash file
-                means that we have to perform a full load of the command table in the next run.
+        Returns:
+            The alias state, or an empty dictionary if the alias state file is missing or outdated.
         """
-        with open(GLOBAL_ALIAS_HASH_PATH, 'w') as alias_config_hash_file:
-            alias_config_hash_file.write('' if empty_hash else alias_config_hash)
+        try:
+            with open(GLOBAL_ALIAS_STATE_PATH, 'r') as alias_state_file:
+                alias_state = json.loads(alias_state_file.read())
+            if alias_state.get('version') == ALIAS_STATE_VERSION:
+                return alias_state
+        except Exception:  # pylint: disable=broad-except
+            pass
+        return {}
 
     @staticmethod
-    def write_collided_alias(collided_alias_dict):
+    def write_alias_state(alias_config_hash, collided_alias):
         """
-        Write the collided aliases string into the collided alias file.
+        Atomically write the alias hash and the collided aliases to the alias state file.
+
+        Args:
+            alias_config_hash: The SHA1 of the alias config file. An empty string means that we have
+                to perform a full load of the command table in the next run.
+            collided_alias: The collision table.
         """
-        # w+ creates the alias config file if it does not exist
-        open_mode = 'r+' if os.path.exists(GLOBAL_COLLIDED_ALIAS_PATH) else 'w+'
-        with open(GLOBAL_COLLIDED_ALIAS_PATH, open_mode) as collided_alias_file:
-            collided_alias_file.truncate()
-            collided_alias_file.write(json.dumps(collided_alias_dict))
+        write_file_atomically(GLOBAL_ALIAS_STATE_PATH, json.dumps({
+            'version': ALIAS_STATE_VERSION,
+            'hash': alias_config_hash,
+            'collided_alias': collided_alias
+        }))
 
     @staticmethod
     def process_exception_message(exception):
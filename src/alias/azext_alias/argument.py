@@ -5,13 +5,16 @@
 
 # pylint: disable=import-error
 
+import os
 import re
 import shlex
 
+from six.moves import builtins
 from knack.util import CLIError
 
 import jinja2 as jinja
 from azext_alias._const import (
+    GLOBAL_ALIAS_TEMPLATE_CACHE_DIR,
     DUPLICATED_PLACEHOLDER_ERROR,
     RENDER_TEMPLATE_ERROR,
     INSUFFICIENT_POS_ARG_ERROR,
@@ -19,6 +22,68 @@ from azext_alias._const import (
     PLACEHOLDER_BRACKETS_ERROR
 )
 
+# In-process caches of parsed placeholders and normalized placeholders, keyed by the function arguments
+_placeholders_cache = {}
+_normalized_placeholders_cache = {}
+# In-process cache of compiled placeholder expressions, keyed by the command derived from an alias
+_compiled_expressions_cache = {}
+
+# The only builtins available to placeholder expressions at evaluation time
+PLACEHOLDER_EVAL_BUILTINS = {name: getattr(builtins, name) for name in [
+    'abs', 'bool', 'dict', 'False', 'float', 'int', 'len', 'list', 'max',
+    'min', 'None', 'range', 'reversed', 'sorted', 'str', 'sum', 'True', 'tuple'
+]}
+
+# The Jinja environment used to compile templates, see get_template_environment()
+_template_env = None
+
+
+class AliasBytecodeCache(jinja.FileSystemBytecodeCache):
+    """
+    A Jinja bytecode cache that persists compiled alias templates in the config dir.
+    Failures to write the cache are ignored since the templates can always be recompiled.
+    """
+
+    def dump_bytecode(self, bucket):
+        try:
+            super(AliasBytecodeCache, self).dump_bytecode(bucket)
+        except (IOError, OSError):
+            pass
+
+
+def get_template_environment():
+    """
+    Get the Jinja environment used to render alias commands. The template name is the template source itself,
+    so compiled templates are cached in-process by the environment and on disk by the bytecode cache.
+
+    Returns:
+        A Jinja environment.
+    """
+    global _template_env  # pylint: disable=global-statement
+    if _template_env is None:
+        try:
+            if not os.path.isdir(GLOBAL_ALIAS_TEMPLATE_CACHE_DIR):
+                os.makedirs(GLOBAL_ALIAS_TEMPLATE_CACHE_DIR)
+            bytecode_cache = AliasBytecodeCache(GLOBAL_ALIAS_TEMPLATE_CACHE_DIR, 'alias_%s.cache')
+        except (IOError, OSError):
+            bytecode_cache = None
+        _template_env = jinja.Environment(loader=jinja.FunctionLoader(lambda source: source),
+                                          bytecode_cache=bytecode_cache)
+    return _template_env
+
+
+def clear_template_cache():
+    """
+    Clear the compiled templates cached on disk. Called whenever the alias configuration changes.
+    """
+    template_env = get_template_environment()
+    template_env.cache.clear()
+    if template_env.bytecode_cache:
+        try:
+            template_env.bytecode_cache.clear()
+        except (IOError, OSError):
+            pass
+
 
 def get_placeholders(arg, check_duplicates=False):
     """
@@ -33,6 +98,10 @@ def get_placeholders(arg, check_duplicates=False):
     Returns:
         A list of positional arguments in order.
     """
+    cache_key = (arg, check_duplicates)
+    if cache_key in _placeholders_cache:
+        return list(_placeholders_cache[cache_key])
+
     placeholders = []
     last_match = None
     arg = normalize_placeholders(arg)
@@ -60,7 +129,8 @@ def get_placeholders(arg, check_duplicates=False):
     if check_duplicates and len(placeholders) != len(set(placeholders)):
         raise CLIError(DUPLICATED_PLACEHOLDER_ERROR.format(arg))
 
-    return placeholders
+    _placeholders_cache[cache_key] = placeholders
+    return list(placeholders)
 
 
 def normalize_placeholders(arg, inject_quotes=False):
@@ -78,12 +148,21 @@ def normalize_placeholders(arg, inject_quotes=False):
         A processed string where placeholders are surrounded by "" and
         numbered placeholders are prepended with "_".
     """
-    number_placeholders = re.findall(r'{{\s*\d+\s*}}', arg)
+    cache_key = (arg, inject_quotes)
+    if cache_key in _normalized_placeholders_cache:
+        return _normalized_placeholders_cache[cache_key]
+
+    normalized_arg = arg
+    number_placeholders = re.findall(r'{{\s*\d+\s*}}', normalized_arg)
     for number_placeholder in number_placeholders:
         number = re.search(r'\d+', number_placeholder).group()
-        arg = arg.replace(number_placeholder, '{{_' + number + '}}')
+        normalized_arg = normalized_arg.replace(number_placeholder, '{{_' + number + '}}')
+
+    if inject_quotes:
+        normalized_arg = normalized_arg.replace('{{', '"{{').replace('}}', '}}"')
 
-    return arg.replace('{{', '"{{').replace('}}', '}}"') if inject_quotes else arg
+    _normalized_placeholders_cache[cache_key] = normalized_arg
+    return normalized_arg
 
 
 def build_pos_args_table(full_alias, args, start_index):
@@ -116,20 +195,21 @@ def build_pos_args_table(full_alias, args, start_index):
     return dict(zip(pos_args_placeholder, pos_args))
 
 
-def render_template(cmd_derived_from_alias, pos_args_table):
+def render_template(cmd_derived_from_alias, pos_args_table, compiled_expressions=None):
     """
     Render cmd_derived_from_alias as a Jinja template with pos_args_table as the arguments.
 
     Args:
         cmd_derived_from_alias: The string to be injected with positional arguemnts.
         pos_args_table: The dictionary used to rendered.
+        compiled_expressions: The precompiled placeholder expressions of cmd_derived_from_alias, if any.
 
     Returns:
         A processed string with positional arguments injected.
     """
     try:
         cmd_derived_from_alias = normalize_placeholders(cmd_derived_from_alias, inject_quotes=True)
-        template = jinja.Template(cmd_derived_from_alias)
+        template = get_template_environment().get_template(cmd_derived_from_alias)
 
         # Shlex.split allows us to split a string by spaces while preserving quoted substrings
         # (positional arguments in this case)
@@ -139,7 +219,7 @@ def render_template(cmd_derived_from_alias, pos_args_table):
         # since Jinja template engine only checks for compile time error.
         # Only check for runtime errors if there is an empty string in rendered.
         if '' in rendered:
-            check_runtime_errors(cmd_derived_from_alias, pos_args_table)
+            check_runtime_errors(cmd_derived_from_alias, pos_args_table, compiled_expressions)
 
         return rendered
     except Exception as exception:
@@ -167,7 +247,34 @@ def render_template(cmd_derived_from_alias, pos_args_table):
         raise CLIError(error_msg)
 
 
-def check_runtime_errors(cmd_derived_from_alias, pos_args_table):
+def compile_placeholder_expressions(cmd_derived_from_alias):
+    """
+    Compile the placeholder expressions in cmd_derived_from_alias into Python code objects.
+
+    Args:
+        cmd_derived_from_alias: The command derived from the alias
+            (include any positional argument placehodlers)
+
+    Returns:
+        A list of (expression, code) tuples in order. code is None if the expression
+        does not compile, in which case the compile error is reported when it is evaluated.
+    """
+    if cmd_derived_from_alias in _compiled_expressions_cache:
+        return _compiled_expressions_cache[cmd_derived_from_alias]
+
+    compiled_expressions = []
+    for expression in get_placeholders(cmd_derived_from_alias):
+        try:
+            code = compile(expression, '<alias>', 'eval')
+        except SyntaxError:
+            code = None
+        compiled_expressions.append((expression, code))
+
+    _compiled_expressions_cache[cmd_derived_from_alias] = compiled_expressions
+    return compiled_expressions
+
+
+def check_runtime_errors(cmd_derived_from_alias, pos_args_table, compiled_expressions=None):
     """
     Validate placeholders and their expressions in cmd_derived_from_alias to make sure
     that there is no runtime error (such as index out of range).
@@ -176,14 +283,19 @@ def check_runtime_errors(cmd_derived_from_alias, pos_args_table):
         cmd_derived_from_alias: The command derived from the alias
             (include any positional argument placehodlers)
         pos_args_table: The positional argument table.
+        compiled_expressions: The precompiled placeholder expressions of cmd_derived_from_alias, if any.
     """
-    for placeholder, value in pos_args_table.items():
-        exec('{} = "{}"'.format(placeholder, value))  # pylint: disable=exec-used
+    if compiled_expressions is None:
+        compiled_expressions = compile_placeholder_expressions(cmd_derived_from_alias)
 
-    expressions = get_placeholders(cmd_derived_from_alias)
-    for expression in expressions:
+    # Unescape '"' since the values are not surrounded by "" when evaluated directly
+    namespace = {placeholder: value.replace('\\"', '"') for placeholder, value in pos_args_table.items()}
+    eval_globals = {'__builtins__': PLACEHOLDER_EVAL_BUILTINS}
+    for expression, code in compiled_expressions:
         try:
-            exec(expression)  # pylint: disable=exec-used
+            if code is None:
+                code = compile(expression, '<alias>', 'eval')
+            eval(code, eval_globals, dict(namespace))  # pylint: disable=eval-used
         except Exception as exception:  # pylint: disable=broad-except
             error_msg = PLACEHOLDER_EVAL_ERROR.format(expression, exception)
             raise CLIError(error_msg)
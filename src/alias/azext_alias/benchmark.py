@@ -0,0 +1,201 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Benchmark the alias transformation against synthetic alias configuration files and reserved command tables.
+
+Usage:
+    python -m azext_alias.benchmark --sizes 10 1000 10000 --iterations 100
+"""
+
+from __future__ import print_function
+
+import os
+import math
+import shutil
+import string
+import argparse
+import tempfile
+import timeit
+
+import azext_alias
+from azext_alias import telemetry
+from azext_alias.alias import AliasManager
+from azext_alias._const import (
+    ALIAS_FILE_NAME,
+    ALIAS_INDEX_FILE_NAME,
+    ALIAS_STATE_FILE_NAME,
+    ALIAS_TAB_COMP_TABLE_FILE_NAME,
+    ALIAS_TEMPLATE_CACHE_DIR_NAME,
+    RESERVED_COMMANDS_FILE_NAME
+)
+
+DEFAULT_SIZES = [10, 1000, 10000]
+DEFAULT_ITERATIONS = 100
+DEFAULT_NUM_RESERVED_COMMANDS = 3000
+PERCENTILES = [50, 90, 99]
+
+
+def _word(index):
+    """
+    Convert an index to a lowercase word (a, b, ..., z, ba, bb, ...) so that it is a valid command word.
+    """
+    word = ''
+    while True:
+        index, remainder = divmod(index, 26)
+        word = string.ascii_lowercase[remainder] + word
+        if not index:
+            return word
+
+
+def generate_reserved_commands(num_commands):
+    """
+    Generate a synthetic reserved command table of three-level commands (group subgroup verb).
+
+    Args:
+        num_commands: The number of reserved commands to generate.
+
+    Returns:
+        A list of reserved commands.
+    """
+    verbs = ['create', 'delete', 'list', 'show', 'update']
+    return ['group-{} sub-{} {}'.format(_word(i // 50), _word(i // len(verbs)), verbs[i % len(verbs)])
+            for i in range(num_commands)]
+
+
+def generate_alias_config(num_aliases, reserved_commands, pos_args=False):
+    """
+    Generate a synthetic alias configuration file.
+
+    Args:
+        num_aliases: The number of aliases to generate.
+        reserved_commands: The reserved commands that the aliases point to.
+        pos_args: True if the aliases take positional arguments.
+
+    Returns:
+        The content of the alias configuration file.
+    """
+    sections = []
+    for i in range(num_aliases):
+        command = reserved_commands[i % len(reserved_commands)]
+        if pos_args:
+            sections.append('[alias-{0} {{{{ arg_1 }}}} {{{{ arg_2 }}}}]\n'
+                            'command = {1} -n {{{{ arg_1 }}}} -g {{{{ arg_2.split("/")[0] | upper }}}}\n'
+                            .format(_word(i), command))
+        else:
+            sections.append('[alias-{}]\ncommand = {} -otable\n'.format(_word(i), command))
+    return '\n'.join(sections)
+
+
+def percentile(sorted_values, percent):
+    """
+    Get the nearest-rank percentile of a list of sorted values.
+    """
+    rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[max(0, min(rank, len(sorted_values)) - 1)]
+
+
+def benchmark_transform(num_aliases, pos_args=False, iterations=DEFAULT_ITERATIONS,
+                        num_reserved_commands=DEFAULT_NUM_RESERVED_COMMANDS):
+    """
+    Measure the latency of transforming the last alias of a synthetic alias configuration file,
+    the same way alias_event_handler does on every invocation.
+
+    Args:
+        num_aliases: The number of aliases in the alias configuration file.
+        pos_args: True if the aliases take positional arguments.
+        iterations: The number of warm transformations to measure.
+        num_reserved_commands: The number of reserved commands in the synthetic command table.
+
+    Returns:
+        A dictionary with the cold transformation latency (the first run after the alias configuration file
+        changes), the warm transformation latency percentiles (in ms), the phases of the transformation recorded
+        by the cold and the last warm run, and the transformed args.
+    """
+    try:
+        from unittest import mock
+    except ImportError:
+        # Python 2.x
+        import mock
+
+    reserved_commands = generate_reserved_commands(num_reserved_commands)
+    command_table = {command: None for command in reserved_commands}
+    args = ['alias-{}'.format(_word(num_aliases - 1))] + (['test-name', 'test-group/sub'] if pos_args else [])
+
+    config_dir = tempfile.mkdtemp()
+    patchers = [
+        mock.patch('azext_alias.alias.GLOBAL_ALIAS_PATH', os.path.join(config_dir, ALIAS_FILE_NAME)),
+        mock.patch('azext_alias.alias.GLOBAL_ALIAS_INDEX_PATH', os.path.join(config_dir, ALIAS_INDEX_FILE_NAME)),
+        mock.patch('azext_alias.alias.GLOBAL_ALIAS_STATE_PATH', os.path.join(config_dir, ALIAS_STATE_FILE_NAME)),
+        mock.patch('azext_alias.util.GLOBAL_ALIAS_TAB_COMP_TABLE_PATH',
+                   os.path.join(config_dir, ALIAS_TAB_COMP_TABLE_FILE_NAME)),
+        mock.patch('azext_alias.util.GLOBAL_RESERVED_COMMANDS_PATH',
+                   os.path.join(config_dir, RESERVED_COMMANDS_FILE_NAME)),
+        mock.patch('azext_alias.util.get_installed_command_version', mock.Mock(return_value='benchmark')),
+        mock.patch('azext_alias.argument.GLOBAL_ALIAS_TEMPLATE_CACHE_DIR',
+                   os.path.join(config_dir, ALIAS_TEMPLATE_CACHE_DIR_NAME)),
+        mock.patch('azext_alias.argument._template_env', None),
+        mock.patch('azext_alias.cached_reserved_commands', [])
+    ]
+    for patcher in patchers:
+        patcher.start()
+
+    def transform():
+        telemetry.start()
+        start_time = timeit.default_timer()
+        transformed_args = AliasManager(load_cmd_tbl_func=lambda _: command_table).transform(list(args))
+        latency = (timeit.default_timer() - start_time) * 1000
+        return transformed_args, latency, list(telemetry._session.phase_times)  # pylint: disable=protected-access
+
+    try:
+        with open(os.path.join(config_dir, ALIAS_FILE_NAME), 'w') as alias_config_file:
+            alias_config_file.write(generate_alias_config(num_aliases, reserved_commands, pos_args))
+
+        transformed_args, cold_latency, cold_phases = transform()
+        warm_phases = cold_phases
+        latencies = []
+        for _ in range(iterations):
+            # Every invocation of az is a new process
+            azext_alias.cached_reserved_commands = []
+            _, latency, warm_phases = transform()
+            latencies.append(latency)
+    finally:
+        for patcher in patchers:
+            patcher.stop()
+        shutil.rmtree(config_dir)
+
+    latencies.sort()
+    result = {
+        'cold': cold_latency,
+        'max': latencies[-1] if latencies else cold_latency,
+        'cold_phases': cold_phases,
+        'warm_phases': warm_phases,
+        'transformed_args': transformed_args
+    }
+    for percent in PERCENTILES:
+        result['p{}'.format(percent)] = percentile(latencies, percent) if latencies else cold_latency
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the alias transformation.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Numbers of aliases in the synthetic alias configuration files.')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS,
+                        help='Number of warm transformations to measure per alias configuration file.')
+    parser.add_argument('--reserved-commands', type=int, default=DEFAULT_NUM_RESERVED_COMMANDS,
+                        help='Number of reserved commands in the synthetic command table.')
+    args = parser.parse_args()
+
+    columns = ['cold'] + ['p{}'.format(percent) for percent in PERCENTILES] + ['max']
+    print('{:>8} {:>9} '.format('aliases', 'pos args') + ' '.join('{:>10}'.format(c + ' ms') for c in columns))
+    for size in args.sizes:
+        for pos_args in [False, True]:
+            result = benchmark_transform(size, pos_args, args.iterations, args.reserved_commands)
+            print('{:>8} {:>9} '.format(size, str(pos_args)) + ' '.join('{:>10.3f}'.format(result[c]) for c in columns))
+
+
+if __name__ == '__main__':
+    main()
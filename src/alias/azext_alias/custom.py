@@ -10,7 +10,9 @@ from knack.util import CLIError
 from knack.log import get_logger
 
 from azext_alias._const import ALIAS_NOT_FOUND_ERROR, POST_EXPORT_ALIAS_MSG, ALIAS_FILE_NAME
-from azext_alias.alias import GLOBAL_ALIAS_PATH, AliasManager
+from azext_alias.alias import GLOBAL_ALIAS_PATH, GLOBAL_ALIAS_INDEX_PATH, AliasManager
+from azext_alias.index import AliasIndex
+from azext_alias.argument import clear_template_cache
 from azext_alias.util import (
     get_alias_table,
     is_url,
@@ -122,7 +124,7 @@ def remove_all_aliases():
 def _commit_change(alias_table, export_path=None, post_commit=True):
     """
     Record changes to the alias table.
-    Also write new alias config hash and collided alias, if any.
+    Also write new alias state (alias config hash and collided aliases) and alias index.
 
     Args:
         alias_table: The alias table to commit.
@@ -134,7 +136,8 @@ def _commit_change(alias_table, export_path=None, post_commit=True):
         if post_commit:
             alias_config_file.seek(0)
             alias_config_hash = hashlib.sha1(alias_config_file.read().encode('utf-8')).hexdigest()
-            AliasManager.write_alias_config_hash(alias_config_hash)
+            AliasIndex.from_alias_table(alias_table, alias_config_hash).dump(GLOBAL_ALIAS_INDEX_PATH)
             collided_alias = AliasManager.build_collision_table(alias_table.sections())
-            AliasManager.write_collided_alias(collided_alias)
+            AliasManager.write_alias_state(alias_config_hash, collided_alias)
             build_tab_completion_table(alias_table)
+            clear_template_cache()
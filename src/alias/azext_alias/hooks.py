@@ -3,7 +3,6 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-import json
 import timeit
 
 from knack.log import get_logger
@@ -14,10 +13,12 @@ from azext_alias.alias import AliasManager
 from azext_alias.util import (
     is_alias_command,
     cache_reserved_commands,
-    get_alias_table,
-    filter_aliases
+    get_alias_index,
+    filter_aliases,
+    load_tab_completion_table,
+    remove_pos_arg_placeholders
 )
-from azext_alias._const import DEBUG_MSG_WITH_TIMING, GLOBAL_ALIAS_TAB_COMP_TABLE_PATH
+from azext_alias._const import DEBUG_MSG_WITH_TIMING
 
 logger = get_logger(__name__)
 
@@ -56,16 +57,19 @@ def enable_aliases_autocomplete(_, **kwargs):
     Enable aliases autocomplete by injecting aliases into Azure CLI tab completion list.
     """
     external_completions = kwargs.get('external_completions', [])
-    prefix = kwargs.get('cword_prefix', [])
+    prefix = kwargs.get('cword_prefix', '')
     cur_commands = kwargs.get('comp_words', [])
-    alias_table = get_alias_table()
+    alias_table = get_alias_index()
     # Transform aliases if they are in current commands,
     # so parser can get the correct subparser when chaining aliases
     _transform_cur_commands(cur_commands, alias_table=alias_table)
 
-    for alias, alias_command in filter_aliases(alias_table):
-        if alias.startswith(prefix) and alias.strip() != prefix and _is_autocomplete_valid(cur_commands, alias_command):
-            # Only autocomplete the first word because alias is space-delimited
+    tab_completion_table = load_tab_completion_table()
+    for full_alias in alias_table.get_aliases_by_prefix(prefix):
+        # Only autocomplete the first word because alias is space-delimited
+        alias = full_alias.split()[0]
+        alias_command = remove_pos_arg_placeholders(alias_table.get(full_alias, 'command'))
+        if alias != prefix and _is_autocomplete_valid(cur_commands, alias_command, tab_completion_table):
             external_completions.append(alias)
 
     # Append spaces if necessary (https://github.com/kislyuk/argcomplete/blob/master/argcomplete/__init__.py#L552-L559)
@@ -98,31 +102,26 @@ def enable_aliases_autocomplete_interactive(_, **kwargs):
     if not subtree or not hasattr(subtree, 'children'):
         return
 
-    for alias, alias_command in filter_aliases(get_alias_table()):
+    for alias, alias_command in filter_aliases(get_alias_index()):
         # Only autocomplete the first word because alias is space-delimited
         if subtree.in_tree(alias_command.split()):
             subtree.add_child(CommandBranch(alias))
 
 
-def _is_autocomplete_valid(cur_commands, alias_command):
+def _is_autocomplete_valid(cur_commands, alias_command, tab_completion_table):
     """
     Determine whether autocomplete can be performed at the current state.
 
     Args:
-        parser: The current CLI parser.
         cur_commands: The current commands typed in the console.
         alias_command: The alias command.
+        tab_completion_table: The tab completion table loaded by load_tab_completion_table().
 
     Returns:
         True if autocomplete can be performed.
     """
     parent_command = ' '.join(cur_commands[1:])
-    with open(GLOBAL_ALIAS_TAB_COMP_TABLE_PATH, 'r') as tab_completion_table_file:
-        try:
-            tab_completion_table = json.loads(tab_completion_table_file.read())
-            return alias_command in tab_completion_table and parent_command in tab_completion_table[alias_command]
-        except Exception:  # pylint: disable=broad-except
-            return False
+    return parent_command in tab_completion_table.get(alias_command, [])
 
 
 def _transform_cur_commands(cur_commands, alias_table=None):
@@ -134,9 +133,9 @@ def _transform_cur_commands(cur_commands, alias_table=None):
         cur_commands: current commands typed in the console.
     """
     transformed = []
-    alias_table = alias_table if alias_table else get_alias_table()
+    alias_table = alias_table if alias_table else get_alias_index()
     for cmd in cur_commands:
-        if cmd in alias_table.sections() and alias_table.has_option(cmd, 'command'):
+        if alias_table.has_option(cmd, 'command'):
             transformed += alias_table.get(cmd, 'command').split()
         else:
             transformed.append(cmd)
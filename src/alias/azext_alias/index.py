@@ -0,0 +1,361 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# pylint: disable=import-error
+
+import re
+import sys
+import shlex
+import marshal
+from binascii import hexlify
+from bisect import bisect_left
+from collections import defaultdict
+
+from knack.log import get_logger
+from knack.util import CLIError
+
+from azext_alias._const import ALIAS_INDEX_VERSION, COLLISION_CHECK_LEVEL_DEPTH
+from azext_alias.argument import compile_placeholder_expressions
+
+logger = get_logger(__name__)
+
+
+def _get_interpreter_tag():
+    """
+    Get a tag of the running interpreter. The marshal format depends on the interpreter version,
+    so an alias index is only loaded by the interpreter that wrote it.
+    """
+    try:
+        from importlib.util import MAGIC_NUMBER
+    except ImportError:
+        # Python 2.x
+        from imp import get_magic
+        MAGIC_NUMBER = get_magic()
+    return '{}.{}-{}'.format(sys.version_info[0], sys.version_info[1], hexlify(MAGIC_NUMBER).decode('ascii'))
+
+
+class AliasIndex(object):
+    """
+    A compiled snapshot of the alias configuration file.
+
+    The index is keyed by the SHA1 of the alias configuration file and is persisted to disk,
+    so subsequent runs can skip parsing the INI file. It exposes the read-only subset of the
+    ConfigParser interface used by the extension (sections, has_option and get), so it can be
+    used wherever an alias table is expected.
+    """
+
+    def __init__(self, alias_config_hash='', sections=None, commands=None, compiled_tables=None):
+        self.alias_config_hash = alias_config_hash
+        self._sections = sections or []
+        self._section_set = set(self._sections)
+        self._commands = commands or {}
+        self._compiled_tables = compiled_tables or self._compile(self._sections, self._commands)
+        self._first_words = self._compiled_tables['first_words']
+        self._split_commands = self._compiled_tables['split_commands']
+        self._sorted_aliases = self._compiled_tables['sorted_aliases']
+        self._sorted_first_words = self._compiled_tables['sorted_first_words']
+        self._placeholder_expressions = self._compiled_tables['placeholder_expressions']
+
+    @staticmethod
+    def _compile(sections, commands):
+        """
+        Compile the lookup tables derived from the sections and the commands of the alias table.
+        They are persisted along with the alias index so loading the index does not recompute them.
+        """
+        first_words = {}
+        split_commands = {}
+        placeholder_expressions = {}
+        # (first word, section) of the aliases with a command, sorted for prefix lookups
+        sorted_aliases = []
+
+        for section in sections:
+            split_section = section.split()
+            if split_section:
+                # The first section wins if multiple aliases share the same first word
+                first_words.setdefault(split_section[0], section)
+                if section in commands:
+                    sorted_aliases.append((split_section[0], section))
+        sorted_aliases.sort()
+
+        for section, command in commands.items():
+            # Aliases with placeholders are rendered by Jinja at transformation time,
+            # extract their placeholder expressions to check for runtime errors. Only the expressions are
+            # persisted, code objects are specific to the interpreter and are compiled in-process on use
+            if '{{' in section:
+                try:
+                    placeholder_expressions[section] = [expression for expression, _
+                                                        in compile_placeholder_expressions(command)]
+                except CLIError:
+                    # Let the transformation surface the error if the alias is ever used
+                    pass
+                continue
+            try:
+                split_commands[section] = shlex.split(command)
+            except ValueError:
+                # Let the transformation surface the error if the alias is ever used
+                pass
+
+        return {
+            'first_words': first_words,
+            'split_commands': split_commands,
+            'sorted_aliases': sorted_aliases,
+            'sorted_first_words': [first_word for first_word, _ in sorted_aliases],
+            'placeholder_expressions': placeholder_expressions
+        }
+
+    @classmethod
+    def from_alias_table(cls, alias_table, alias_config_hash=''):
+        """
+        Compile an alias table into an alias index.
+
+        Args:
+            alias_table: The alias table (ConfigParser) to compile.
+            alias_config_hash: The SHA1 of the alias configuration file that alias_table is read from.
+
+        Returns:
+            An instance of AliasIndex.
+        """
+        sections = alias_table.sections()
+        commands = {}
+        for section in sections:
+            if alias_table.has_option(section, 'command'):
+                commands[section] = alias_table.get(section, 'command')
+        return cls(alias_config_hash, sections, commands)
+
+    @classmethod
+    def load(cls, index_path, alias_config_hash):
+        """
+        Load the alias index from disk.
+
+        Args:
+            index_path: The path of the alias index file.
+            alias_config_hash: The SHA1 of the current alias configuration file.
+
+        Returns:
+            An instance of AliasIndex if the index on disk is compiled from the current alias
+            configuration file by the running interpreter. Otherwise, return None.
+        """
+        try:
+            with open(index_path, 'rb') as index_file:
+                payload = marshal.loads(index_file.read())
+            if payload.get('version') != ALIAS_INDEX_VERSION or payload.get('hash') != alias_config_hash or \
+                    payload.get('interpreter') != _get_interpreter_tag():
+                return None
+            return cls(alias_config_hash, payload['sections'], payload['commands'], payload['compiled_tables'])
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    def dump(self, index_path):
+        """
+        Write the alias index to disk.
+
+        Args:
+            index_path: The path of the alias index file.
+        """
+        payload = {
+            'version': ALIAS_INDEX_VERSION,
+            'interpreter': _get_interpreter_tag(),
+            'hash': self.alias_config_hash,
+            'sections': self._sections,
+            'commands': self._commands,
+            'compiled_tables': self._compiled_tables
+        }
+        # Imported here since azext_alias.util depends on this module
+        from azext_alias.util import write_file_atomically
+        try:
+            # Concurrent runs and readers never see a partially written index
+            write_file_atomically(index_path, marshal.dumps(payload))
+        except Exception as exception:  # pylint: disable=broad-except
+            logger.debug('Alias Manager: Unable to write the alias index. Error detail: %s', exception)
+
+    def sections(self):
+        return list(self._sections)
+
+    def has_option(self, section, option):
+        return option == 'command' and section in self._commands
+
+    def get(self, section, option):
+        if not self.has_option(section, option):
+            raise KeyError('No option "{}" in alias "{}"'.format(option, section))
+        return self._commands[section]
+
+    def get_full_alias(self, query):
+        """
+        Get the full alias given a search query.
+
+        Args:
+            query: The query this function performs searching on.
+
+        Returns:
+            The full alias (with the placeholders, if any).
+        """
+        if query in self._section_set:
+            return query
+        return self._first_words.get(query, '')
+
+    def get_aliases_by_prefix(self, prefix):
+        """
+        Get all the aliases whose first word starts with a given prefix.
+
+        Args:
+            prefix: The prefix to search for.
+
+        Returns:
+            A list of full aliases (with the placeholders, if any), sorted by their first words.
+        """
+        start_index = bisect_left(self._sorted_first_words, prefix)
+        aliases = []
+        for first_word, section in self._sorted_aliases[start_index:]:
+            if not first_word.startswith(prefix):
+                break
+            aliases.append(section)
+        return aliases
+
+    def get_split_command(self, alias):
+        """
+        Get the pre-split command of an alias without positional arguments.
+
+        Args:
+            alias: The full alias.
+
+        Returns:
+            A list of words of the command that the alias points to, or None if it is not precompiled.
+        """
+        split_command = self._split_commands.get(alias)
+        return list(split_command) if split_command is not None else None
+
+    def get_compiled_expressions(self, alias):
+        """
+        Get the precompiled placeholder expressions of the command of an alias with positional arguments.
+
+        Args:
+            alias: The full alias.
+
+        Returns:
+            A list of (expression, code) tuples, or None if they are not precompiled.
+        """
+        if alias not in self._placeholder_expressions:
+            return None
+        # Compiled once per process, compile_placeholder_expressions() caches the code objects
+        return compile_placeholder_expressions(self._commands[alias])
+
+
+class ReservedCommandIndex(object):
+    """
+    A per-level word index of the reserved command tree.
+
+    For example, 'storage account create' registers 'storage' at level 1, 'account' at level 2
+    and 'create' at level 3, so checking whether a word is a reserved command at a given level
+    is a set lookup instead of a regex match against every reserved command.
+
+    The index also maps every word to the positions at which it appears in the reserved commands,
+    so finding where a command is nested in the command tree is proportional to the number of matches.
+    """
+
+    def __init__(self, reserved_commands, levels=COLLISION_CHECK_LEVEL_DEPTH):
+        self.levels = levels
+        self.reserved_commands = reserved_commands
+        # The reversed reserved commands in sorted order, built on first use by has_command_suffix()
+        self._reversed_commands = None
+        self.level_words = defaultdict(set)
+        self.split_commands = [reserved_command.split() for reserved_command in reserved_commands]
+        self.word_positions = defaultdict(list)
+        for command_index, split_command in enumerate(self.split_commands):
+            for level, word in enumerate(split_command[:levels], 1):
+                self.level_words[level].add(word)
+                # Words after a non-command word (e.g. one with digits) are not part of the command tree
+                if not re.match(r'^[a-z\-]*$', word):
+                    break
+            for offset, word in enumerate(split_command):
+                self.word_positions[word].append((command_index, offset))
+
+    def get_collision_levels(self, word, levels=None):
+        """
+        Get the command levels at which a word collides with the reserved command tree.
+
+        Args:
+            word: The word to check.
+            levels: The amount of levels to check. Default: the depth of the index.
+
+        Returns:
+            A list of command levels (starting at 1) at which word is a reserved command.
+        """
+        levels = min(levels or self.levels, self.levels)
+        word = word.lower()
+        return [level for level in range(1, levels + 1) if word in self.level_words[level]]
+
+    def has_command(self, command):
+        """
+        Check if a command is a reserved command, or is nested in a reserved command.
+
+        For example, 'network dns', 'dns' and 'dns record-set' are all nested in 'network dns record-set'.
+
+        Args:
+            command: The command to check.
+
+        Returns:
+            True if any reserved command contains the words of the command consecutively.
+        """
+        split_command = command.split()
+        if not split_command:
+            return False
+
+        for command_index, offset in self.word_positions.get(split_command[0], []):
+            if self.split_commands[command_index][offset:offset + len(split_command)] == split_command:
+                return True
+        return False
+
+    def has_command_suffix(self, suffix):
+        """
+        Check if any reserved command ends with a given string.
+
+        Args:
+            suffix: The string to check.
+
+        Returns:
+            True if any reserved command ends with suffix.
+        """
+        if not suffix:
+            return False
+        if self._reversed_commands is None:
+            self._reversed_commands = sorted(reserved_command[::-1] for reserved_command in self.reserved_commands)
+
+        # A reserved command ends with suffix if its reverse starts with the reversed suffix,
+        # and the reversed commands starting with it sort right after it
+        reversed_suffix = suffix[::-1]
+        i = bisect_left(self._reversed_commands, reversed_suffix)
+        return i < len(self._reversed_commands) and self._reversed_commands[i].startswith(reversed_suffix)
+
+    def get_parent_commands(self, command):
+        """
+        Get all the parent commands of a command in the reserved command tree.
+
+        For example, the parent commands of 'dns' are ['network'] because of 'network dns ...'.
+        An empty string means that the command can be invoked without any parent command.
+
+        Args:
+            command: The command to search for.
+
+        Returns:
+            A list of unique parent commands, in the order of the reserved commands.
+        """
+        split_command = command.split()
+        if not split_command:
+            return []
+
+        parent_commands = []
+        last_command_index = None
+        for command_index, offset in self.word_positions.get(split_command[0], []):
+            # Only the first occurrence of the command in each reserved command is relevant
+            if command_index == last_command_index:
+                continue
+            reserved_command = self.split_commands[command_index]
+            if reserved_command[offset:offset + len(split_command)] != split_command:
+                continue
+            last_command_index = command_index
+            parent_command = ' '.join(reserved_command[:offset])
+            if parent_command not in parent_commands:
+                parent_commands.append(parent_command)
+        return parent_commands
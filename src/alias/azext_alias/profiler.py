@@ -0,0 +1,42 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import timeit
+from contextlib import contextmanager
+
+from knack.log import get_logger
+
+from azext_alias import telemetry
+from azext_alias._const import PHASE_DEBUG_MSG
+
+CONFIG_READ_PHASE = 'config_read'
+HASH_CHECK_PHASE = 'hash_check'
+COMMAND_TABLE_LOAD_PHASE = 'command_table_load'
+COLLISION_TABLE_BUILD_PHASE = 'collision_table_build'
+COMPLETION_TABLE_BUILD_PHASE = 'completion_table_build'
+TEMPLATE_RENDER_PHASE = 'template_render'
+ENV_VAR_EXPANSION_PHASE = 'env_var_expansion'
+STATE_WRITE_PHASE = 'state_write'
+
+logger = get_logger(__name__)
+
+
+@contextmanager
+def profile_phase(phase):
+    """
+    Measure the elapsed time of a phase of the alias transformation. The elapsed time is logged
+    in --debug and recorded in the telemetry session. A phase that occurs multiple times in one run
+    (e.g. rendering several aliases) is accumulated.
+
+    Args:
+        phase: The name of the phase.
+    """
+    start_time = timeit.default_timer()
+    try:
+        yield
+    finally:
+        elapsed_time = (timeit.default_timer() - start_time) * 1000
+        logger.debug(PHASE_DEBUG_MSG, phase, elapsed_time)
+        telemetry.add_phase_time(phase, elapsed_time)
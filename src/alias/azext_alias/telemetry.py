@@ -7,6 +7,7 @@ import os
 import sys
 import datetime
 import traceback
+from collections import OrderedDict
 
 from knack.log import get_logger
 
@@ -34,6 +35,8 @@ class AliasExtensionTelemetrySession(object):
         self.full_command_table_loaded = False
         self.aliases_hit = []
         self.number_of_aliases_registered = 0
+        # Elapsed time (ms) of each phase of the alias transformation, in the order they first occur
+        self.phase_times = OrderedDict()
 
     def generate_payload(self):
         """
@@ -62,6 +65,9 @@ class AliasExtensionTelemetrySession(object):
         self.set_custom_properties(properties, 'EndTime', str(self.end_time))
         self.set_custom_properties(properties, 'Version', VERSION)
         self.set_custom_properties(properties, 'ExecutionTimeMs', self.execution_time)
+        self.set_custom_properties(properties, 'PhaseTimesMs',
+                                   ','.join('{}={}'.format(phase, round(elapsed_time, 2))
+                                            for phase, elapsed_time in self.phase_times.items()))
         self.set_custom_properties(properties, 'FullCommandTableLoaded', str(self.full_command_table_loaded))
         self.set_custom_properties(properties, 'CollidedAliases', ','.join(self.collided_aliases))
         self.set_custom_properties(properties, 'AliasesHit', ','.join(self.aliases_hit))
@@ -76,6 +82,9 @@ class AliasExtensionTelemetrySession(object):
     def add_alias_hit(self, alias_used):
         self.aliases_hit.append(alias_used)
 
+    def add_phase_time(self, phase, elapsed_time):
+        self.phase_times[phase] = self.phase_times.get(phase, 0) + elapsed_time
+
     @classmethod
     def set_custom_properties(cls, prop, name, value):
         if name and value is not None:
@@ -100,6 +109,7 @@ _session = AliasExtensionTelemetrySession()
 @decorators.suppress_all_exceptions(raise_in_diagnostics=True)
 def start():
     _session.start_time = datetime.datetime.now()
+    _session.phase_times.clear()
 
 
 @decorators.suppress_all_exceptions(raise_in_diagnostics=True)
@@ -107,6 +117,11 @@ def set_execution_time(elapsed_time):
     _session.execution_time = elapsed_time
 
 
+@decorators.suppress_all_exceptions(raise_in_diagnostics=True)
+def add_phase_time(phase, elapsed_time):
+    _session.add_phase_time(phase, elapsed_time)
+
+
 @decorators.suppress_all_exceptions(raise_in_diagnostics=True)
 def set_full_command_table_loaded():
     _session.full_command_table_loaded = True
@@ -8,6 +8,8 @@
 import os
 import sys
 import shlex
+import shutil
+import tempfile
 import unittest
 from mock import Mock, patch
 from six.moves import configparser
@@ -15,6 +17,9 @@ from six.moves import configparser
 from knack.util import CLIError
 
 import azext_alias
+from azext_alias.index import AliasIndex
+from azext_alias.util import get_config_parser
+from azext_alias._const import ALIAS_TEMPLATE_CACHE_DIR_NAME
 from azext_alias.tests._const import (DEFAULT_MOCK_ALIAS_STRING,
                                       COLLISION_MOCK_ALIAS_STRING,
                                       TEST_RESERVED_COMMANDS,
@@ -148,13 +153,19 @@ TEST_FN = {
 class TestAlias(unittest.TestCase):
 
     def setUp(self):
-        azext_alias.alias.AliasManager.write_alias_config_hash = Mock()
-        azext_alias.alias.AliasManager.write_collided_alias = Mock()
-        self.patcher = patch('azext_alias.cached_reserved_commands', TEST_RESERVED_COMMANDS)
-        self.patcher.start()
+        self.mock_config_dir = tempfile.mkdtemp()
+        self.patchers = []
+        self.patchers.append(patch('azext_alias.alias.AliasManager.write_alias_state', Mock()))
+        self.patchers.append(patch('azext_alias.cached_reserved_commands', TEST_RESERVED_COMMANDS))
+        self.patchers.append(patch('azext_alias.argument.GLOBAL_ALIAS_TEMPLATE_CACHE_DIR', os.path.join(self.mock_config_dir, ALIAS_TEMPLATE_CACHE_DIR_NAME)))
+        self.patchers.append(patch('azext_alias.argument._template_env', None))
+        for patcher in self.patchers:
+            patcher.start()
 
     def tearDown(self):
-        self.patcher.stop()
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.mock_config_dir)
 
     def test_build_empty_collision_table(self):
         alias_manager = self.get_alias_manager(DEFAULT_MOCK_ALIAS_STRING)
@@ -180,6 +191,22 @@ class TestAlias(unittest.TestCase):
         alias_manager.alias_config_str = ''
         self.assertTrue(alias_manager.detect_alias_config_change())
 
+    def test_post_transform_unchanged_alias_state(self):
+        alias_manager = self.get_alias_manager()
+        alias_manager.alias_state = {'hash': alias_manager.alias_config_hash, 'collided_alias': {}}
+        alias_manager.collided_alias = {}
+        azext_alias.alias.AliasManager.write_alias_state.reset_mock()
+        alias_manager.post_transform(['account'])
+        azext_alias.alias.AliasManager.write_alias_state.assert_not_called()
+
+    def test_post_transform_changed_alias_state(self):
+        alias_manager = self.get_alias_manager()
+        alias_manager.alias_state = {'hash': '', 'collided_alias': {}}
+        alias_manager.collided_alias = {}
+        azext_alias.alias.AliasManager.write_alias_state.reset_mock()
+        alias_manager.post_transform(['account'])
+        azext_alias.alias.AliasManager.write_alias_state.assert_called_once_with(alias_manager.alias_config_hash, {})
+
     """
     Helper functions
     """
@@ -202,16 +229,18 @@ class MockAliasManager(azext_alias.alias.AliasManager):
     def load_alias_table(self):
 
         self.alias_config_str = self.kwargs.get('mock_alias_str', '')
+        alias_table = get_config_parser()
         try:
             if sys.version_info.major == 3:
                 # Python 3.x implementation
-                self.alias_table.read_string(self.alias_config_str)
+                alias_table.read_string(self.alias_config_str)
             else:
                 # Python 2.x implementation
                 from StringIO import StringIO
-                self.alias_table.readfp(StringIO(self.alias_config_str))
+                alias_table.readfp(StringIO(self.alias_config_str))
         except Exception:  # pylint: disable=broad-except
-            self.alias_table = configparser.ConfigParser()
+            alias_table = configparser.ConfigParser()
+        self.alias_table = AliasIndex.from_alias_table(alias_table)
 
     def load_alias_hash(self):
         import hashlib
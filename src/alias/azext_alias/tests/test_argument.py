@@ -5,7 +5,11 @@
 
 # pylint: disable=line-too-long,no-self-use,too-many-public-methods
 
+import os
+import shutil
+import tempfile
 import unittest
+import mock
 
 from knack.util import CLIError
 
@@ -14,12 +18,29 @@ from azext_alias.argument import (
     normalize_placeholders,
     build_pos_args_table,
     render_template,
-    check_runtime_errors
+    check_runtime_errors,
+    compile_placeholder_expressions,
+    clear_template_cache
 )
+from azext_alias._const import ALIAS_TEMPLATE_CACHE_DIR_NAME
 
 
 class TestArgument(unittest.TestCase):
 
+    def setUp(self):
+        self.mock_config_dir = tempfile.mkdtemp()
+        self.template_cache_dir = os.path.join(self.mock_config_dir, ALIAS_TEMPLATE_CACHE_DIR_NAME)
+        self.patchers = []
+        self.patchers.append(mock.patch('azext_alias.argument.GLOBAL_ALIAS_TEMPLATE_CACHE_DIR', self.template_cache_dir))
+        self.patchers.append(mock.patch('azext_alias.argument._template_env', None))
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.mock_config_dir)
+
     def test_get_placeholders(self):
         self.assertListEqual(['arg_1', 'arg_2'], get_placeholders('{{ arg_1 }} {{ arg_2 }}'))
 
@@ -119,6 +140,21 @@ class TestArgument(unittest.TestCase):
             render_template('{{ arg_1 }} {{ arg_2 }', pos_args_table)
         self.assertEqual(str(cm.exception), 'alias: Encounted error when injecting positional arguments to ""{{ arg_1 }}" "{{ arg_2 }". Error detail: unexpected \'}\'')
 
+    def test_render_template_bytecode_cache(self):
+        pos_args_table = {
+            'arg_1': 'test_1'
+        }
+        self.assertListEqual(['test_1'], render_template('{{ arg_1 }}', pos_args_table))
+        self.assertEqual(1, len(os.listdir(self.template_cache_dir)))
+        self.assertListEqual(['test_1'], render_template('{{ arg_1 }}', pos_args_table))
+        clear_template_cache()
+        self.assertEqual(0, len(os.listdir(self.template_cache_dir)))
+
+    def test_get_placeholders_cached(self):
+        placeholders = get_placeholders('{{ arg_1 }} {{ arg_2 }}')
+        placeholders.append('arg_3')
+        self.assertListEqual(['arg_1', 'arg_2'], get_placeholders('{{ arg_1 }} {{ arg_2 }}'))
+
     def test_check_runtime_errors_no_error(self):
         pos_args_table = {
             'arg_1': 'test_1',
@@ -135,6 +171,27 @@ class TestArgument(unittest.TestCase):
             check_runtime_errors('{{ arg_1.split("_")[2] }} {{ arg_2.split("_")[1] }}', pos_args_table)
         self.assertEqual(str(cm.exception), 'alias: Encounted error when evaluating "arg_1.split("_")[2]". Error detail: list index out of range')
 
+    def test_check_runtime_errors_precompiled(self):
+        compiled_expressions = compile_placeholder_expressions('{{ arg_1.split("_")[2] }}')
+        self.assertEqual('arg_1.split("_")[2]', compiled_expressions[0][0])
+        with self.assertRaises(CLIError) as cm:
+            check_runtime_errors('', {'arg_1': 'test_1'}, compiled_expressions)
+        self.assertEqual(str(cm.exception), 'alias: Encounted error when evaluating "arg_1.split("_")[2]". Error detail: list index out of range')
+
+    def test_check_runtime_errors_escaped_quotes(self):
+        check_runtime_errors('{{ arg_1.split("\\"")[1] }}', build_pos_args_table('alias {{ arg_1 }}', ['alias', 'a"b'], 1))
+
+    def test_check_runtime_errors_syntax_error(self):
+        compiled_expressions = compile_placeholder_expressions('{{ arg_1 if }}')
+        self.assertIsNone(compiled_expressions[0][1])
+        with self.assertRaises(CLIError):
+            check_runtime_errors('{{ arg_1 if }}', {'arg_1': 'test_1'}, compiled_expressions)
+
+    def test_check_runtime_errors_restricted_builtins(self):
+        check_runtime_errors('{{ len(arg_1) }}', {'arg_1': 'test_1'})
+        with self.assertRaises(CLIError):
+            check_runtime_errors('{{ __import__("os").getcwd() }}', {'arg_1': 'test_1'})
+
 
 if __name__ == '__main__':
     unittest.main()
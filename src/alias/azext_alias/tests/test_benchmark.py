@@ -0,0 +1,69 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# pylint: disable=line-too-long,protected-access
+
+import unittest
+
+from azext_alias import telemetry
+from azext_alias.profiler import (
+    CONFIG_READ_PHASE,
+    HASH_CHECK_PHASE,
+    TEMPLATE_RENDER_PHASE,
+    COMMAND_TABLE_LOAD_PHASE,
+    COLLISION_TABLE_BUILD_PHASE,
+    STATE_WRITE_PHASE
+)
+from azext_alias.benchmark import (
+    generate_reserved_commands,
+    generate_alias_config,
+    benchmark_transform,
+    percentile
+)
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_generate_reserved_commands(self):
+        reserved_commands = generate_reserved_commands(100)
+        self.assertEqual(100, len(set(reserved_commands)))
+        self.assertEqual('group-a sub-a create', reserved_commands[0])
+
+    def test_generate_alias_config(self):
+        reserved_commands = generate_reserved_commands(10)
+        self.assertEqual('[alias-a]\ncommand = group-a sub-a create -otable\n', generate_alias_config(1, reserved_commands))
+        self.assertEqual('[alias-a {{ arg_1 }} {{ arg_2 }}]\ncommand = group-a sub-a create -n {{ arg_1 }} -g {{ arg_2.split("/")[0] | upper }}\n',
+                         generate_alias_config(1, reserved_commands, pos_args=True))
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(99, percentile(values, 99))
+        self.assertEqual(1, percentile([1], 90))
+
+    def test_benchmark_transform(self):
+        result = benchmark_transform(10, iterations=5, num_reserved_commands=100)
+        self.assertListEqual(['group-a', 'sub-b', 'update', '-otable'], result['transformed_args'])
+        for key in ['cold', 'p50', 'p90', 'p99', 'max']:
+            self.assertIn(key, result)
+        self.assertIn(CONFIG_READ_PHASE, telemetry._session.phase_times)
+        self.assertIn(HASH_CHECK_PHASE, telemetry._session.phase_times)
+
+    def test_benchmark_transform_pos_args(self):
+        result = benchmark_transform(10, pos_args=True, iterations=5, num_reserved_commands=100)
+        self.assertListEqual(['group-a', 'sub-b', 'update', '-n', 'test-name', '-g', 'TEST-GROUP'], result['transformed_args'])
+        self.assertIn(TEMPLATE_RENDER_PHASE, telemetry._session.phase_times)
+
+    def test_benchmark_warm_transform_skips_rebuild(self):
+        for pos_args in [False, True]:
+            result = benchmark_transform(100, pos_args=pos_args, iterations=2, num_reserved_commands=100)
+            # The first run after the alias configuration file changes rebuilds the collision table
+            for phase in [COMMAND_TABLE_LOAD_PHASE, COLLISION_TABLE_BUILD_PHASE, STATE_WRITE_PHASE]:
+                self.assertIn(phase, result['cold_phases'])
+                self.assertNotIn(phase, result['warm_phases'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# pylint: disable=line-too-long
+
+import marshal
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from azext_alias.index import AliasIndex, ReservedCommandIndex
+from azext_alias.util import get_config_parser
+from azext_alias._const import ALIAS_INDEX_FILE_NAME
+from azext_alias.tests._const import TEST_RESERVED_COMMANDS
+
+
+class TestAliasIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_config_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.mock_config_dir, ALIAS_INDEX_FILE_NAME)
+        self.alias_table = get_config_parser()
+        self.alias_table.add_section('ac')
+        self.alias_table.set('ac', 'command', 'account')
+        self.alias_table.add_section('cp {{ arg_1 }} {{ arg_2 }}')
+        self.alias_table.set('cp {{ arg_1 }} {{ arg_2 }}', 'command', 'storage blob copy start-batch --source-uri {{ arg_1 }}')
+        self.alias_table.add_section('no-command')
+
+    def tearDown(self):
+        shutil.rmtree(self.mock_config_dir)
+
+    def test_from_alias_table(self):
+        alias_index = AliasIndex.from_alias_table(self.alias_table, 'test-hash')
+        self.assertEqual(self.alias_table.sections(), alias_index.sections())
+        self.assertTrue(alias_index.has_option('ac', 'command'))
+        self.assertFalse(alias_index.has_option('no-command', 'command'))
+        self.assertEqual('account', alias_index.get('ac', 'command'))
+        self.assertEqual(['account'], alias_index.get_split_command('ac'))
+        self.assertIsNone(alias_index.get_split_command('cp {{ arg_1 }} {{ arg_2 }}'))
+
+    def test_get_full_alias(self):
+        alias_index = AliasIndex.from_alias_table(self.alias_table)
+        self.assertEqual('ac', alias_index.get_full_alias('ac'))
+        self.assertEqual('cp {{ arg_1 }} {{ arg_2 }}', alias_index.get_full_alias('cp'))
+        self.assertEqual('', alias_index.get_full_alias('non-existing'))
+
+    def test_get_aliases_by_prefix(self):
+        alias_index = AliasIndex.from_alias_table(self.alias_table)
+        self.assertEqual(['ac'], alias_index.get_aliases_by_prefix('a'))
+        self.assertEqual(['ac', 'cp {{ arg_1 }} {{ arg_2 }}'], alias_index.get_aliases_by_prefix(''))
+        self.assertEqual([], alias_index.get_aliases_by_prefix('no'))
+
+    def test_dump_and_load(self):
+        AliasIndex.from_alias_table(self.alias_table, 'test-hash').dump(self.index_path)
+        alias_index = AliasIndex.load(self.index_path, 'test-hash')
+        self.assertEqual(self.alias_table.sections(), alias_index.sections())
+        self.assertEqual('account', alias_index.get('ac', 'command'))
+        compiled_expressions = alias_index.get_compiled_expressions('cp {{ arg_1 }} {{ arg_2 }}')
+        self.assertEqual(['arg_1'], [expression for expression, _ in compiled_expressions])
+        self.assertEqual('test', eval(compiled_expressions[0][1], {}, {'arg_1': 'test'}))  # pylint: disable=eval-used
+        self.assertIsNone(alias_index.get_compiled_expressions('ac'))
+
+    def test_dump_has_no_code_objects(self):
+        AliasIndex.from_alias_table(self.alias_table, 'test-hash').dump(self.index_path)
+        with open(self.index_path, 'rb') as index_file:
+            payload = marshal.loads(index_file.read())
+        self.assertEqual({'cp {{ arg_1 }} {{ arg_2 }}': ['arg_1']},
+                         payload['compiled_tables']['placeholder_expressions'])
+
+    def test_load_hash_mismatch(self):
+        AliasIndex.from_alias_table(self.alias_table, 'test-hash').dump(self.index_path)
+        self.assertIsNone(AliasIndex.load(self.index_path, 'another-hash'))
+
+    def test_load_other_interpreter(self):
+        AliasIndex.from_alias_table(self.alias_table, 'test-hash').dump(self.index_path)
+        with mock.patch('azext_alias.index._get_interpreter_tag', return_value='2.7-03f30d0a'):
+            self.assertIsNone(AliasIndex.load(self.index_path, 'test-hash'))
+
+    def test_dump_replaces_index_atomically(self):
+        with open(self.index_path, 'wb') as index_file:
+            index_file.write(b'truncated')
+        AliasIndex.from_alias_table(self.alias_table, 'test-hash').dump(self.index_path)
+        self.assertIsNotNone(AliasIndex.load(self.index_path, 'test-hash'))
+        self.assertEqual([ALIAS_INDEX_FILE_NAME], os.listdir(self.mock_config_dir))
+
+    def test_load_non_existing_index(self):
+        self.assertIsNone(AliasIndex.load(self.index_path, 'test-hash'))
+
+
+class TestReservedCommandIndex(unittest.TestCase):
+
+    def test_get_collision_levels(self):
+        reserved_command_index = ReservedCommandIndex(TEST_RESERVED_COMMANDS)
+        self.assertEqual([1, 2], reserved_command_index.get_collision_levels('account'))
+        self.assertEqual([1], reserved_command_index.get_collision_levels('Network'))
+        self.assertEqual([3], reserved_command_index.get_collision_levels('create'))
+        self.assertEqual([], reserved_command_index.get_collision_levels('create', levels=2))
+        self.assertEqual([], reserved_command_index.get_collision_levels('non-existing'))
+
+    def test_has_command(self):
+        reserved_command_index = ReservedCommandIndex(TEST_RESERVED_COMMANDS)
+        self.assertTrue(reserved_command_index.has_command('storage account'))
+        self.assertTrue(reserved_command_index.has_command('account create'))
+        self.assertFalse(reserved_command_index.has_command('storage create'))
+        self.assertFalse(reserved_command_index.has_command(''))
+
+    def test_has_command_suffix(self):
+        reserved_command_index = ReservedCommandIndex(TEST_RESERVED_COMMANDS)
+        self.assertTrue(reserved_command_index.has_command_suffix('dns'))
+        self.assertTrue(reserved_command_index.has_command_suffix('ns'))
+        self.assertFalse(reserved_command_index.has_command_suffix('network'))
+        self.assertTrue(reserved_command_index.has_command_suffix('account create'))
+        self.assertFalse(reserved_command_index.has_command_suffix('snd'))
+        self.assertFalse(reserved_command_index.has_command_suffix(''))
+
+    def test_get_parent_commands(self):
+        reserved_command_index = ReservedCommandIndex(TEST_RESERVED_COMMANDS)
+        self.assertEqual(['', 'storage'], reserved_command_index.get_parent_commands('account'))
+        self.assertEqual([''], reserved_command_index.get_parent_commands('account list-locations'))
+        self.assertEqual(['network'], reserved_command_index.get_parent_commands('dns'))
+        self.assertEqual(['storage'], reserved_command_index.get_parent_commands('account create'))
+        self.assertEqual([], reserved_command_index.get_parent_commands('dns create'))
+        self.assertEqual([], reserved_command_index.get_parent_commands(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,12 +7,22 @@
 
 import os
 import shutil
+import hashlib
 import tempfile
 import unittest
 import mock
 
-from azext_alias.util import remove_pos_arg_placeholders, build_tab_completion_table, get_config_parser
-from azext_alias._const import ALIAS_TAB_COMP_TABLE_FILE_NAME
+import azext_alias
+from azext_alias.util import (
+    remove_pos_arg_placeholders,
+    build_tab_completion_table,
+    get_config_parser,
+    cache_reserved_commands,
+    load_alias_index,
+    write_file_atomically
+)
+from azext_alias.index import AliasIndex
+from azext_alias._const import ALIAS_FILE_NAME, ALIAS_INDEX_FILE_NAME, ALIAS_TAB_COMP_TABLE_FILE_NAME, RESERVED_COMMANDS_FILE_NAME
 from azext_alias.tests._const import TEST_RESERVED_COMMANDS
 
 
@@ -22,6 +32,7 @@ class TestUtil(unittest.TestCase):
         self.mock_config_dir = tempfile.mkdtemp()
         self.patchers = []
         self.patchers.append(mock.patch('azext_alias.util.GLOBAL_ALIAS_TAB_COMP_TABLE_PATH', os.path.join(self.mock_config_dir, ALIAS_TAB_COMP_TABLE_FILE_NAME)))
+        self.patchers.append(mock.patch('azext_alias.util.GLOBAL_RESERVED_COMMANDS_PATH', os.path.join(self.mock_config_dir, RESERVED_COMMANDS_FILE_NAME)))
         self.patchers.append(mock.patch('azext_alias.cached_reserved_commands', TEST_RESERVED_COMMANDS))
         for patcher in self.patchers:
             patcher.start()
@@ -61,6 +72,51 @@ class TestUtil(unittest.TestCase):
             'account list-locations': ['']
         }, tab_completion_table)
 
+    @mock.patch('azext_alias.util.get_installed_command_version', mock.Mock(return_value='core=2.0.0'))
+    def test_cache_reserved_commands_persisted(self):
+        load_cmd_tbl_func = mock.Mock(return_value={command: None for command in TEST_RESERVED_COMMANDS})
+        azext_alias.cached_reserved_commands = []
+        self.assertTrue(cache_reserved_commands(load_cmd_tbl_func))
+
+        azext_alias.cached_reserved_commands = []
+        self.assertFalse(cache_reserved_commands(load_cmd_tbl_func))
+        self.assertEqual(1, load_cmd_tbl_func.call_count)
+        self.assertListEqual(sorted(TEST_RESERVED_COMMANDS), sorted(azext_alias.cached_reserved_commands))
+
+    def test_cache_reserved_commands_version_changed(self):
+        load_cmd_tbl_func = mock.Mock(return_value={command: None for command in TEST_RESERVED_COMMANDS})
+        with mock.patch('azext_alias.util.get_installed_command_version', mock.Mock(return_value='core=2.0.0')):
+            azext_alias.cached_reserved_commands = []
+            cache_reserved_commands(load_cmd_tbl_func)
+
+        with mock.patch('azext_alias.util.get_installed_command_version', mock.Mock(return_value='core=2.0.1')):
+            azext_alias.cached_reserved_commands = []
+            self.assertTrue(cache_reserved_commands(load_cmd_tbl_func))
+        self.assertEqual(2, load_cmd_tbl_func.call_count)
+
+    def test_write_file_atomically(self):
+        file_path = os.path.join(self.mock_config_dir, 'test_file')
+        write_file_atomically(file_path, 'test 1')
+        write_file_atomically(file_path, 'test 2')
+        with open(file_path, 'r') as test_file:
+            self.assertEqual('test 2', test_file.read())
+        self.assertListEqual(['test_file'], [f for f in os.listdir(self.mock_config_dir) if f.startswith(('test_file', '.test_file'))])
+
+    def test_load_alias_index_parses_hashed_string(self):
+        alias_index_path = os.path.join(self.mock_config_dir, ALIAS_INDEX_FILE_NAME)
+        alias_path = os.path.join(self.mock_config_dir, ALIAS_FILE_NAME)
+        # The alias config file changes after its content is read
+        with open(alias_path, 'w') as alias_config_file:
+            alias_config_file.write('[mv]\ncommand = network\n')
+        with mock.patch('azext_alias.alias.GLOBAL_ALIAS_PATH', alias_path), \
+                mock.patch('azext_alias.alias.GLOBAL_ALIAS_INDEX_PATH', alias_index_path):
+            alias_index = load_alias_index('[mn]\ncommand = monitor\n')
+            self.assertListEqual(['mn'], alias_index.sections())
+            self.assertEqual('monitor', alias_index.get('mn', 'command'))
+
+        persisted_index = AliasIndex.load(alias_index_path, hashlib.sha1(b'[mn]\ncommand = monitor\n').hexdigest())
+        self.assertListEqual(['mn'], persisted_index.sections())
+
 
 if __name__ == '__main__':
     unittest.main()
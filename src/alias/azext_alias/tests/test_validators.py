@@ -130,6 +130,17 @@ class TestValidators(unittest.TestCase):
             self.assertEqual(str(cm.exception), 'alias: Please ensure you have a valid alias configuration file. Error detail: File contains no alias headers.file: \'{}\', line: 1\'invalid alias config format\''.format(mock_alias_config_file))
         os.remove(mock_alias_config_file)
 
+    def test_process_alias_import_namespace_multiple_invalid_aliases(self):
+        _, mock_alias_config_file = tempfile.mkstemp()
+        with open(mock_alias_config_file, 'w') as f:
+            f.write('[ac]\ncommand = account\n\n[nc]\ncommand = non existing command\n\n[account]\ncommand = dns\n')
+        with self.assertRaises(CLIError) as cm:
+            process_alias_import_namespace(MockAliasImportNamespace(mock_alias_config_file))
+        self.assertEqual(str(cm.exception), 'alias: Please ensure you have a valid alias configuration file. Error detail: '
+                                            'alias: Invalid Azure CLI command "non existing command"\n'
+                                            'alias: "account" is a reserved command and cannot be used to represent "dns"')
+        os.remove(mock_alias_config_file)
+
     def test_process_alias_import_namespace_dir(self):
         with self.assertRaises(CLIError) as cm:
             process_alias_import_namespace(MockAliasImportNamespace(os.getcwd()))
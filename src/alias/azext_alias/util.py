@@ -5,11 +5,13 @@
 
 # pylint: disable=wrong-import-order,import-error,relative-import
 
+import os
 import re
 import sys
 import json
 import shlex
-from collections import defaultdict
+import hashlib
+import tempfile
 from six.moves import configparser
 from six.moves.urllib.parse import urlparse
 from six.moves.urllib.request import urlretrieve
@@ -17,7 +19,16 @@ from six.moves.urllib.request import urlretrieve
 from knack.util import CLIError
 
 import azext_alias
-from azext_alias._const import COLLISION_CHECK_LEVEL_DEPTH, GLOBAL_ALIAS_TAB_COMP_TABLE_PATH, ALIAS_FILE_URL_ERROR
+from azext_alias.index import AliasIndex, ReservedCommandIndex
+from azext_alias._const import (
+    COLLISION_CHECK_LEVEL_DEPTH,
+    GLOBAL_ALIAS_TAB_COMP_TABLE_PATH,
+    GLOBAL_RESERVED_COMMANDS_PATH,
+    ALIAS_FILE_URL_ERROR
+)
+
+# The reserved command index built from azext_alias.cached_reserved_commands, alongside the list it is built from
+_reserved_command_index_cache = {}
 
 
 def get_config_parser():
@@ -44,6 +55,86 @@ def get_alias_table():
         return get_config_parser()
 
 
+def load_alias_index(alias_config_str):
+    """
+    Load the alias index compiled from the alias config file. If the alias index is missing or outdated,
+    parse the alias config file and recompile the alias index.
+
+    Args:
+        alias_config_str: The content of the alias config file.
+
+    Returns:
+        An instance of AliasIndex.
+    """
+    alias_config_sha1 = hashlib.sha1(alias_config_str.encode('utf-8')).hexdigest()
+    alias_index = AliasIndex.load(azext_alias.alias.GLOBAL_ALIAS_INDEX_PATH, alias_config_sha1)
+    if not alias_index:
+        # Parse the string that was hashed rather than the file, which may have changed since it was read
+        alias_table = get_config_parser()
+        if sys.version_info.major == 3:
+            alias_table.read_string(alias_config_str)
+        else:
+            # Python 2.x implementation
+            from StringIO import StringIO
+            alias_table.readfp(StringIO(alias_config_str))  # pylint: disable=deprecated-method
+        alias_index = AliasIndex.from_alias_table(alias_table, alias_config_sha1)
+        alias_index.dump(azext_alias.alias.GLOBAL_ALIAS_INDEX_PATH)
+    return alias_index
+
+
+def get_alias_index():
+    """
+    Get the current alias index, a read-only alternative of get_alias_table() that avoids parsing
+    the alias config file whenever possible.
+    """
+    try:
+        with open(azext_alias.alias.GLOBAL_ALIAS_PATH, 'r') as alias_config_file:
+            return load_alias_index(alias_config_file.read())
+    except Exception:  # pylint: disable=broad-except
+        return AliasIndex()
+
+
+def load_tab_completion_table():
+    """
+    Load the tab completion table built by build_tab_completion_table().
+
+    Returns:
+        The tab completion table, or an empty dictionary if it cannot be loaded.
+    """
+    try:
+        with open(GLOBAL_ALIAS_TAB_COMP_TABLE_PATH, 'r') as tab_completion_table_file:
+            return json.loads(tab_completion_table_file.read())
+    except Exception:  # pylint: disable=broad-except
+        return {}
+
+
+def write_file_atomically(file_path, content):
+    """
+    Write content to a file atomically by writing to a temporary file in the same directory
+    and renaming it over the destination, so concurrent readers never see a partially written file.
+
+    Args:
+        file_path: The path of the file to write.
+        content: The string to write, or bytes to write the file in binary mode.
+    """
+    file_dir, file_name = os.path.split(file_path)
+    fd, temp_path = tempfile.mkstemp(dir=file_dir or None, prefix='.{}.'.format(file_name))
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(content, bytes) else 'w') as temp_file:
+            temp_file.write(content)
+        if hasattr(os, 'replace'):
+            os.replace(temp_path, file_path)  # pylint: disable=no-member
+        else:
+            # Python 2.x cannot rename over an existing file on Windows
+            if os.name == 'nt' and os.path.exists(file_path):
+                os.remove(file_path)
+            os.rename(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
 def is_alias_command(subcommands, args):
     """
     Check if the user is invoking one of the comments in 'subcommands' in the  from az alias .
@@ -72,11 +163,101 @@ def cache_reserved_commands(load_cmd_tbl_func):
     This cache saves the entire command table globally so custom.py can have access to it.
     Alter this cache through cache_reserved_commands(load_cmd_tbl_func) in util.py.
 
+    The reserved commands are also persisted to the config dir, along with the versions of Azure CLI core
+    and the installed extensions, so the entire command table is only loaded when the installed commands change.
+
     Args:
         load_cmd_tbl_func: The function to load the entire command table.
+
+    Returns:
+        True if the entire command table is loaded.
+    """
+    if azext_alias.cached_reserved_commands:
+        return False
+
+    installed_command_version = get_installed_command_version()
+    reserved_commands = load_reserved_commands(installed_command_version)
+    if reserved_commands:
+        azext_alias.cached_reserved_commands = reserved_commands
+        return False
+
+    azext_alias.cached_reserved_commands = list(load_cmd_tbl_func([]).keys())
+    if azext_alias.cached_reserved_commands:
+        write_reserved_commands(azext_alias.cached_reserved_commands, installed_command_version)
+    return True
+
+
+def get_installed_command_version():
+    """
+    Get a string that identifies the installed command set, i.e. the versions of Azure CLI core and
+    all the installed extensions.
+
+    Returns:
+        A string that changes whenever Azure CLI core or any extension is installed, removed or updated.
+    """
+    from azure.cli.core import __version__ as core_version
+    try:
+        from azure.cli.core.extension import get_extensions
+        extensions = sorted('{}={}'.format(ext.name, ext.version) for ext in get_extensions())
+    except Exception:  # pylint: disable=broad-except
+        extensions = []
+    return ';'.join(['core={}'.format(core_version)] + extensions)
+
+
+def load_reserved_commands(installed_command_version):
+    """
+    Load the persisted reserved commands.
+
+    Args:
+        installed_command_version: The current installed command version.
+
+    Returns:
+        A list of reserved commands, or an empty list if they were persisted with a different installed command version.
+    """
+    try:
+        with open(GLOBAL_RESERVED_COMMANDS_PATH, 'r') as reserved_commands_file:
+            reserved_commands = json.loads(reserved_commands_file.read())
+        if reserved_commands.get('version') == installed_command_version:
+            return reserved_commands.get('commands', [])
+    except Exception:  # pylint: disable=broad-except
+        pass
+    return []
+
+
+def write_reserved_commands(reserved_commands, installed_command_version):
+    """
+    Persist the reserved commands to the config dir.
+
+    Args:
+        reserved_commands: The list of reserved commands.
+        installed_command_version: The current installed command version.
+    """
+    try:
+        write_file_atomically(GLOBAL_RESERVED_COMMANDS_PATH, json.dumps({
+            'version': installed_command_version,
+            'commands': reserved_commands
+        }, separators=(',', ':')))
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+def get_reserved_command_index():
+    """
+    Get the index of the reserved command tree built from azext_alias.cached_reserved_commands.
+    The index is only rebuilt when the cached reserved commands change.
+
+    Returns:
+        An instance of ReservedCommandIndex.
     """
-    if not azext_alias.cached_reserved_commands:
-        azext_alias.cached_reserved_commands = list(load_cmd_tbl_func([]).keys())
+    reserved_commands = azext_alias.cached_reserved_commands
+    if _reserved_command_index_cache.get('reserved_commands') is not reserved_commands \
+            or _reserved_command_index_cache.get('size') != len(reserved_commands):
+        _reserved_command_index_cache.update({
+            'reserved_commands': reserved_commands,
+            'size': len(reserved_commands),
+            'index': ReservedCommandIndex(reserved_commands)
+        })
+    return _reserved_command_index_cache['index']
 
 
 def remove_pos_arg_placeholders(alias_command):
@@ -134,23 +315,16 @@ def build_tab_completion_table(alias_table):
     Returns:
         The tab completion table.
     """
-    alias_commands = [t[1] for t in filter_aliases(alias_table)]
-    tab_completion_table = defaultdict(list)
-    for alias_command in alias_commands:
-        for reserved_command in azext_alias.cached_reserved_commands:
-            # Check if alias_command has no parent command
-            if reserved_command == alias_command or reserved_command.startswith(alias_command + ' ') \
-                    and '' not in tab_completion_table[alias_command]:
-                tab_completion_table[alias_command].append('')
-            elif ' {} '.format(alias_command) in reserved_command or reserved_command.endswith(' ' + alias_command):
-                # Extract parent commands
-                index = reserved_command.index(alias_command)
-                parent_command = reserved_command[:index - 1]
-                if parent_command not in tab_completion_table[alias_command]:
-                    tab_completion_table[alias_command].append(parent_command)
-
-    with open(GLOBAL_ALIAS_TAB_COMP_TABLE_PATH, 'w') as f:
-        f.write(json.dumps(tab_completion_table))
+    reserved_command_index = get_reserved_command_index()
+    tab_completion_table = {}
+    for _, alias_command in filter_aliases(alias_table):
+        if alias_command in tab_completion_table:
+            continue
+        parent_commands = reserved_command_index.get_parent_commands(alias_command)
+        if parent_commands:
+            tab_completion_table[alias_command] = parent_commands
+
+    write_file_atomically(GLOBAL_ALIAS_TAB_COMP_TABLE_PATH, json.dumps(tab_completion_table, separators=(',', ':')))
 
     return tab_completion_table
 
@@ -23,6 +23,50 @@ No credentials specified to access storage service. Please provide any of the fo
 
 logger = get_logger(__name__)
 
+# the key of the requests session shared by the data service clients in the data of the CLI context
+_REQUEST_SESSION_DATA_KEY = 'storage_request_session'
+
+
+def get_request_session(cli_ctx):
+    """
+    Get the requests session shared by all the storage data service clients created by the CLI context, whichever the
+    service, so that they reuse each other's connections to the account (keep-alive and TLS sessions).
+    """
+    session = cli_ctx.data[_REQUEST_SESSION_DATA_KEY]
+    if session is None:
+        import requests
+        session = requests.Session()
+        cli_ctx.data[_REQUEST_SESSION_DATA_KEY] = session
+    return session
+
+
+def size_connection_pool(client, pool_size):
+    """
+    Grow the connection pools of the session of a data service client to keep up to pool_size connections per host.
+    The pools of requests keep 10 connections per host by default, so the connections of more concurrent requests
+    are opened and discarded for every request. The pools never shrink, since the session is shared.
+    """
+    from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
+
+    session = client._httpclient.session  # pylint: disable=protected-access
+    current_size = session.get_adapter('https://').poolmanager.connection_pool_kw.get('maxsize', DEFAULT_POOLSIZE)
+    if pool_size > current_size:
+        logger.debug('growing the connection pools of the storage clients to %d connection(s) per host', pool_size)
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+
+def _get_connection_pool_size(kwargs):
+    """Get the connections per host a command runs concurrently from its arguments."""
+    from .transfer_util import AUTO_TUNE_MAX_CONNECTIONS
+
+    max_connections = kwargs.get('max_connections') or 1
+    if kwargs.get('auto_tune'):
+        max_connections = max(max_connections, AUTO_TUNE_MAX_CONNECTIONS)
+    # the batch commands list the source with as many connections while the transfers run
+    return 2 * max_connections
+
 
 # edited from azure.cli.core.commands.client_factory
 def get_data_service_client(cli_ctx, service_type, account_name, account_key, connection_string=None,
@@ -39,6 +83,7 @@ def get_data_service_client(cli_ctx, service_type, account_name, account_key, co
             client_kwargs['token_credential'] = token_credential
         if endpoint_suffix:
             client_kwargs['endpoint_suffix'] = endpoint_suffix
+        client_kwargs['request_session'] = get_request_session(cli_ctx)
         client = service_type(**client_kwargs)
     except ValueError as exc:
         _ERROR_STORAGE_MISSING_INFO = get_sdk(cli_ctx, CUSTOM_DATA_STORAGE,
@@ -80,10 +125,12 @@ def storage_client_factory(cli_ctx, **_):
 
 def file_data_service_factory(cli_ctx, kwargs):
     t_file_svc = get_sdk(cli_ctx, CUSTOM_DATA_STORAGE, 'file#FileService')
-    return generic_data_service_factory(cli_ctx, t_file_svc, kwargs.pop('account_name', None),
-                                        kwargs.pop('account_key', None),
-                                        connection_string=kwargs.pop('connection_string', None),
-                                        sas_token=kwargs.pop('sas_token', None))
+    client = generic_data_service_factory(cli_ctx, t_file_svc, kwargs.pop('account_name', None),
+                                          kwargs.pop('account_key', None),
+                                          connection_string=kwargs.pop('connection_string', None),
+                                          sas_token=kwargs.pop('sas_token', None))
+    size_connection_pool(client, _get_connection_pool_size(kwargs))
+    return client
 
 
 def page_blob_service_factory(cli_ctx, kwargs):
@@ -99,12 +146,14 @@ def blob_data_service_factory(cli_ctx, kwargs):
     blob_type = kwargs.get('blob_type')
     blob_service = get_blob_service_by_type(cli_ctx, blob_type) or get_blob_service_by_type(cli_ctx, 'block')
 
-    return generic_data_service_factory(cli_ctx, blob_service, kwargs.pop('account_name', None),
-                                        kwargs.pop('account_key', None),
-                                        connection_string=kwargs.pop('connection_string', None),
-                                        sas_token=kwargs.pop('sas_token', None),
-                                        socket_timeout=kwargs.pop('socket_timeout', None),
-                                        token_credential=kwargs.pop('token_credential', None))
+    client = generic_data_service_factory(cli_ctx, blob_service, kwargs.pop('account_name', None),
+                                          kwargs.pop('account_key', None),
+                                          connection_string=kwargs.pop('connection_string', None),
+                                          sas_token=kwargs.pop('sas_token', None),
+                                          socket_timeout=kwargs.pop('socket_timeout', None),
+                                          token_credential=kwargs.pop('token_credential', None))
+    size_connection_pool(client, _get_connection_pool_size(kwargs))
+    return client
 
 
 def table_data_service_factory(cli_ctx, kwargs):
@@ -42,9 +42,60 @@ helps['storage blob upload'] = """
         - name: --tier
           short-summary: A page blob tier value to set the blob to. The tier correlates to the size of the blob and
                          number of allowed IOPS. This is only applicable to page blobs on premium storage accounts.
+        - name: --resume
+          short-summary: Make an interrupted upload resumable. Only applicable to block blobs.
+          long-summary: The IDs of the blocks are derived from the path, size and modification time of the file and the offset of
+                        the block. Running the command again after an interruption uploads only the blocks that have not been staged
+                        yet, provided the file has not changed. Uncommitted blocks are discarded by the service after a week.
+        - name: --auto-tune
+          short-summary: Tune the block size and the number of connections as the upload runs.
+          long-summary: The throughput of the first blocks is measured to size the blocks of the rest of the upload and to double
+                        the connections, starting from --max-connections, as long as doing so increases the throughput, up to 16
+                        connections. The chosen parameters are reported in the --debug output. Only applicable to block blobs.
     examples:
         - name: Upload to a blob.
           text: az storage blob upload -f /path/to/file -c MyContainer -n MyBlob
+        - name: Upload a large file to a block blob, resuming the previous upload of the file if it was interrupted.
+          text: az storage blob upload -f /path/to/file -c MyContainer -n MyBlob --resume
+"""
+
+helps['storage blob download'] = """
+    type: command
+    short-summary: Download a blob to a file path, with automatic chunking and progress notifications.
+    parameters:
+        - name: --sparse
+          short-summary: Download only the populated pages of a page blob.
+          long-summary: The page ranges of the blob are queried first and only the populated ranges are downloaded. The unpopulated
+                        ranges, which read as zeros, are not written, so the file is created as a sparse file where the file system
+                        supports it. This is typically much faster for virtual hard disks, most of which are unallocated.
+        - name: --auto-tune
+          short-summary: Tune the chunk size and the number of connections as the download runs.
+          long-summary: The throughput of the first chunks is measured to size the chunks of the rest of the download and to double
+                        the connections, starting from --max-connections, as long as doing so increases the throughput, up to 16
+                        connections. The chosen parameters are reported in the --debug output.
+    examples:
+        - name: Download a blob.
+          text: az storage blob download -c MyContainer -n MyBlob -f /path/to/file
+        - name: Download a large blob, resuming the previous download of the blob if it was interrupted.
+          text: az storage blob download -c MyContainer -n MyBlob -f /path/to/file --resume
+        - name: Download the populated pages of a virtual hard disk.
+          text: az storage blob download -c MyContainer -n MyDisk.vhd -f /path/to/MyDisk.vhd --sparse
+"""
+
+helps['storage blob incremental-download'] = """
+    type: command
+    short-summary: Update a local copy of a snapshot of a page blob with the pages changed since that snapshot.
+    long-summary: Only the pages which differ between the previous snapshot and a more recent snapshot, or the current blob, are
+                  downloaded. They are written to the local file in place and the pages which were cleared are zeroed, so the
+                  transfer is proportional to the changes rather than to the size of the blob. If the command fails, the file is
+                  partially updated and running the command again completes it.
+    parameters:
+        - name: --max-connections
+          type: integer
+          short-summary: The maximum number of parallel connections to use. Default value is 2.
+    examples:
+        - name: Update the local copy of the snapshot of a disk taken yesterday to the snapshot taken today.
+          text: az storage blob incremental-download -c MyContainer -n MyDisk.vhd -f /backup/MyDisk.vhd --previous-snapshot 2018-05-01T00:00:00.0000000Z --snapshot 2018-05-02T00:00:00.0000000Z
 """
 
 helps['storage file upload'] = """
@@ -295,6 +346,48 @@ helps['storage blob upload-batch'] = """
           short-summary: The max length in bytes permitted for an append blob.
         - name: --lease-id
           short-summary: Required if the blob has an active lease
+        - name: --max-connections
+          type: integer
+          short-summary: The maximum number of parallel connections to use. Default value is 2.
+          long-summary: The connections are shared by the files uploaded concurrently and the chunks of large files.
+                        A file that fails to upload does not stop the upload of the other files.
+        - name: --resume
+          short-summary: Make interrupted uploads resumable. Only applicable to block blobs.
+          long-summary: The IDs of the blocks of large files are derived from the path, size and modification time of the file and
+                        the offset of the block. Running the command again after an interruption uploads only the blocks that have not
+                        been staged yet, provided the files have not changed.
+"""
+
+helps['storage blob sync'] = """
+    type: command
+    short-summary: Synchronize a local directory to a blob container by uploading only the new and changed files.
+    long-summary: >
+        A file is unchanged when a blob of the same name and size exists and either the file and the blob have not
+        changed since the last sync, according to a manifest kept in the CLI config directory, or the MD5 of the file
+        matches the Content-MD5 of the blob. Uploaded blobs get the Content-MD5 of their content.
+    parameters:
+        - name: --source -s
+          type: string
+          short-summary: The directory where the files to be synchronized are located.
+        - name: --destination -d
+          type: string
+          short-summary: The blob container where the files will be synchronized to.
+          long-summary: The destination can be the container URL or the container name. When the destination is the container URL, the storage
+                        account name will be parsed from the URL.
+        - name: --pattern
+          type: string
+          short-summary: The pattern used for globbing files in the source. The supported patterns are '*', '?', '[seq]', and '[!seq]'.
+        - name: --dryrun
+          type: bool
+          short-summary: Show the summary of the operations to be taken instead of actually synchronizing the file(s).
+        - name: --type -t
+          short-summary: Defaults to 'page' for *.vhd files, or 'block' otherwise.
+        - name: --max-connections
+          type: integer
+          short-summary: The maximum number of parallel connections to use. Default value is 2.
+    examples:
+        - name: Upload the new and changed files of a directory, and delete the blobs whose file has been removed.
+          text: az storage blob sync -s /path/to/directory -d mycontainer --account-name mystorageaccount --delete-orphans
 """
 
 helps['storage blob download-batch'] = """
@@ -315,6 +408,17 @@ helps['storage blob download-batch'] = """
         - name: --dryrun
           type: bool
           short-summary: Show the summary of the operations to be taken instead of actually downloading the file(s).
+        - name: --max-connections
+          type: integer
+          short-summary: The maximum number of parallel connections to use. Default value is 2.
+          long-summary: The connections are shared by the blobs downloaded concurrently and the chunks of large blobs.
+                        A blob that fails to download does not stop the download of the other blobs.
+        - name: --resume
+          type: bool
+          short-summary: Record the downloaded chunks of large blobs next to their destination files, so that an interrupted download resumes from the missing chunks.
+          long-summary: Each blob larger than a single request is downloaded in chunks and the completed chunks are recorded in a
+                        '.azjournal' file next to its destination file. The journal is removed once the blob is downloaded. A blob
+                        which has changed since the interrupted download is downloaded again from the start.
 """
 
 helps['storage blob delete-batch'] = """
@@ -550,7 +654,9 @@ helps['storage file upload-batch'] = """
           short-summary: List the files and blobs to be uploaded. No actual data transfer will occur.
         - name: --max-connections
           type: integer
-          short-summary: The maximum number of parallel connections to use. Default value is 1.
+          short-summary: The maximum number of parallel connections to use. Default value is 2.
+          long-summary: The connections are shared by the files uploaded concurrently and the ranges of large files.
+                        A file that fails to upload does not stop the upload of the other files.
         - name: --validate-content
           type: bool
           short-summary: If set, calculates an MD5 hash for each range of the file for validation.
@@ -577,7 +683,10 @@ helps['storage file download-batch'] = """
           short-summary: List the files and blobs to be downloaded. No actual data transfer will occur.
         - name: --max-connections
           type: integer
-          short-summary: The maximum number of parallel connections to use. Default value is 1.
+          short-summary: The maximum number of parallel connections to use. Default value is 2.
+          long-summary: The share is listed with up to this many concurrent requests while the files are being downloaded.
+                        The download connections are shared by the files downloaded concurrently and the chunks of large
+                        files. A file that fails to download does not stop the download of the other files.
         - name: --validate-content
           type: bool
           short-summary: If set, calculates an MD5 hash for each range of the file for validation.
@@ -270,6 +270,12 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('blob_type', options_list=('--type', '-t'), validator=validate_blob_type,
                    arg_type=get_enum_type(get_blob_types()))
         c.argument('validate_content', action='store_true', min_api='2016-05-31')
+        c.argument('resume', action='store_true',
+                   help='Derive the block IDs from the file, so that an interrupted upload of the same file to the '
+                        'same block blob skips the blocks already uploaded.')
+        c.argument('auto_tune', action='store_true',
+                   help='Tune the chunk size and the number of connections from the throughput of the first '
+                        'chunks. --max-connections sets the initial number of connections.')
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
         # TODO: Remove once #807 is complete. Smart Create Generation requires this parameter.
@@ -293,6 +299,24 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('maxsize_condition', arg_group='Content Control')
         c.argument('validate_content', action='store_true', min_api='2016-05-31', arg_group='Content Control')
         c.argument('blob_type', options_list=('--type', '-t'), arg_type=get_enum_type(get_blob_types()))
+        c.argument('resume', action='store_true',
+                   help='Derive the block IDs from the files, so that an interrupted upload of the same files to the '
+                        'same block blobs skips the blocks already uploaded.')
+        c.extra('no_progress', progress_type)
+        c.extra('socket_timeout', socket_timeout_type)
+
+    with self.argument_context('storage blob sync') as c:
+        from .sdkutil import get_blob_types
+        from ._validators import process_blob_upload_batch_parameters
+
+        c.ignore('source_files', 'destination_container_name')
+
+        c.argument('source', options_list=('--source', '-s'), validator=process_blob_upload_batch_parameters)
+        c.argument('destination', options_list=('--destination', '-d'))
+        c.argument('max_connections', type=int)
+        c.argument('blob_type', options_list=('--type', '-t'), arg_type=get_enum_type(get_blob_types()))
+        c.argument('delete_orphans', action='store_true',
+                   help='Delete the blobs in the destination path that match the pattern but have no local file.')
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
 
@@ -302,6 +326,25 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('start_range', type=int)
         c.argument('end_range', type=int)
         c.argument('validate_content', action='store_true', min_api='2016-05-31')
+        c.argument('resume', action='store_true',
+                   help='Record the downloaded chunks next to the destination file, so that an interrupted download '
+                        'of the same blob resumes from the missing chunks.')
+        c.argument('sparse', action='store_true',
+                   help='Download only the populated pages of a page blob into a sparse file.')
+        c.argument('auto_tune', action='store_true',
+                   help='Tune the chunk size and the number of connections from the throughput of the first '
+                        'chunks. --max-connections sets the initial number of connections.')
+        c.extra('no_progress', progress_type)
+        c.extra('socket_timeout', socket_timeout_type)
+
+    with self.argument_context('storage blob incremental-download') as c:
+        c.argument('file_path', options_list=('--file', '-f'), type=file_type, completer=FilesCompleter(),
+                   help='Path of the local copy of the previous snapshot of the blob, which is updated in place.')
+        c.argument('previous_snapshot', help='The previous snapshot of the blob, which the local file is a copy of.')
+        c.argument('snapshot', help='The snapshot of the blob to update the local file to. Default to the current '
+                                    'blob.')
+        c.argument('max_connections', type=int)
+        c.argument('validate_content', action='store_true', min_api='2016-05-31')
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
 
@@ -314,6 +357,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
         c.argument('max_connections', type=int)
+        c.argument('resume', action='store_true',
+                   help='Record the downloaded chunks of large blobs next to their destination files, so that an '
+                        'interrupted download resumes from the missing chunks.')
 
     with self.argument_context('storage blob delete') as c:
         from .sdkutil import get_delete_blob_snapshot_type_names
@@ -526,6 +572,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('max_connections', type=int)
         c.argument('start_range', type=int)
         c.argument('end_range', type=int)
+        c.argument('auto_tune', action='store_true',
+                   help='Tune the chunk size and the number of connections from the throughput of the first '
+                        'chunks. --max-connections sets the initial number of connections.')
 
     with self.argument_context('storage file exists') as c:
         c.register_path_argument()
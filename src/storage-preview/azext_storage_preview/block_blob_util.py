@@ -0,0 +1,145 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Tools to upload local files to block blobs block by block.
+"""
+
+import hashlib
+import os
+import threading
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+# the offset in the block ID is zero-padded so that all the block IDs of a blob have the same length
+BLOCK_ID_FORMAT = '{prefix}{offset:020d}'
+# the service limits of the blocks of a block blob
+MAX_BLOCKS_PER_BLOB = 50000
+MAX_PUT_BLOCK_SIZE = 100 * 1024 * 1024
+
+
+def get_block_size(client, size):
+    """
+    Get the block size of the upload of a file of the given size: MAX_BLOCK_SIZE bytes of the client, or the
+    smallest multiple of it for the blocks to fit in the block list of a blob, up to MAX_PUT_BLOCK_SIZE. Raise a
+    CLIError if the file does not fit in MAX_BLOCKS_PER_BLOB blocks of MAX_PUT_BLOCK_SIZE bytes.
+    """
+    min_block_size = (size + MAX_BLOCKS_PER_BLOB - 1) // MAX_BLOCKS_PER_BLOB
+    if min_block_size > MAX_PUT_BLOCK_SIZE:
+        from knack.util import CLIError
+        raise CLIError('The file is too large for a block blob: {} bytes, the maximum is {} bytes.'
+                       .format(size, MAX_BLOCKS_PER_BLOB * MAX_PUT_BLOCK_SIZE))
+
+    block_size = client.MAX_BLOCK_SIZE * ((min_block_size + client.MAX_BLOCK_SIZE - 1) // client.MAX_BLOCK_SIZE)
+    return min(MAX_PUT_BLOCK_SIZE, max(client.MAX_BLOCK_SIZE, block_size))
+
+
+def get_block_id_prefix(file_path, file_stat, block_size):
+    """
+    Derive the prefix of the block IDs of an upload from the identity of the file: its path, size and modification
+    time, and the block size. Uploading the same version of the file again yields the same block IDs.
+    """
+    identity = '{}:{}:{}:{}'.format(os.path.abspath(file_path), file_stat.st_size, int(file_stat.st_mtime * 1000000),
+                                    block_size)
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()[:24]
+
+
+def _get_staged_blocks(cmd, client, container_name, blob_name, lease_id=None, timeout=None):
+    """Get the sizes of the uncommitted blocks of a blob by block ID."""
+    from azure.common import AzureMissingResourceHttpError
+
+    t_block_list_type = cmd.get_models('blob.models#BlockListType')
+    try:
+        block_list = client.get_block_list(container_name, blob_name, block_list_type=t_block_list_type.Uncommitted,
+                                           lease_id=lease_id, timeout=timeout)
+    except AzureMissingResourceHttpError:
+        return {}
+    return {block.id: block.size for block in block_list.uncommitted_blocks}
+
+
+def upload_block_blob_from_path(cmd, client, container_name, blob_name, file_path, content_settings=None,
+                                metadata=None, validate_content=False, progress_callback=None, max_connections=2,
+                                lease_id=None, if_modified_since=None, if_unmodified_since=None, if_match=None,
+                                if_none_match=None, timeout=None, resume=False, auto_tune=False):
+    """
+    Upload a file to a block blob in blocks of get_block_size() bytes. Every block is read by the thread uploading it
+    with a positional read, so the threads neither wait for each other to read the file nor copy the blocks through an
+    intermediate buffer.
+
+    The IDs of the blocks are derived from the file and the offset of the block. If resume is True, the blocks of the
+    same version of the file already staged by an interrupted upload are skipped. The uncommitted blocks are kept by
+    the service until the blob is committed, for up to a week. If auto_tune is True, the block size and the
+    connections are tuned as the upload runs. A tuned upload cannot be resumed, since its blocks depend on the tuning.
+    """
+    from knack.util import CLIError
+    from .transfer_util import PositionalFileReader, TransferTuner, run_chunks, AUTO_TUNE_MAX_CONNECTIONS
+
+    t_blob_block = cmd.get_models('blob.models#BlobBlock')
+
+    file_stat = os.stat(file_path)
+    size = file_stat.st_size
+    block_size = get_block_size(client, size)
+    prefix = get_block_id_prefix(file_path, file_stat, block_size)
+
+    def _get_block_size(offset):
+        return min(block_size, size - offset)
+
+    staged = _get_staged_blocks(cmd, client, container_name, blob_name, lease_id, timeout) if resume else {}
+    offsets = range(0, size, block_size)
+    skipped = set(offset for offset in offsets
+                  if staged.get(BLOCK_ID_FORMAT.format(prefix=prefix, offset=offset)) == _get_block_size(offset))
+    if skipped:
+        logger.info('resuming the upload of %s, %d of %d block(s) already staged', blob_name, len(skipped),
+                    len(offsets))
+
+    tuner = None
+    if auto_tune:
+        tuner = TransferTuner(blob_name, block_size, MAX_PUT_BLOCK_SIZE, max_connections,
+                              max(max_connections, AUTO_TUNE_MAX_CONNECTIONS))
+
+    # the IDs of the blocks by offset, the offsets are only known as the blocks are cut when the upload is tuned
+    block_ids = {}
+    progress = {'current': sum(_get_block_size(offset) for offset in skipped)}
+    progress_lock = threading.Lock()
+    if progress_callback:
+        progress_callback(progress['current'], size)
+
+    with PositionalFileReader(file_path) as reader:
+        def _upload_block(offset, end):
+            block_id = BLOCK_ID_FORMAT.format(prefix=prefix, offset=offset)
+            block_ids[offset] = block_id
+            if offset in skipped:
+                return
+
+            block = reader.read(offset, end - offset + 1)
+            client.put_block(container_name, blob_name, block, block_id, validate_content=validate_content,
+                             lease_id=lease_id, timeout=timeout)
+
+            if progress_callback:
+                with progress_lock:
+                    progress['current'] += len(block)
+                    progress_callback(progress['current'], size)
+
+        errors = []
+        for (offset, _), error in run_chunks(_upload_block, 0, size, block_size, max_connections, tuner):
+            logger.debug('failed to upload the block at offset %d of %s: %s', offset, file_path, error)
+            errors.append(error)
+
+    if errors:
+        raise CLIError('Failed to upload {} block(s) of {}: {}.{}'.format(
+            len(errors), file_path, errors[0], ' Run the command again to resume the upload.' if resume else ''))
+
+    current_stat = os.stat(file_path)
+    if (current_stat.st_size, current_stat.st_mtime) != (file_stat.st_size, file_stat.st_mtime):
+        raise CLIError('{} has changed during the upload. Run the command again to upload it.'.format(file_path))
+
+    return client.put_block_list(container_name, blob_name,
+                                 [t_blob_block(block_ids[offset]) for offset in sorted(block_ids)],
+                                 content_settings=content_settings, metadata=metadata,
+                                 validate_content=validate_content, lease_id=lease_id,
+                                 if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                                 if_match=if_match, if_none_match=if_none_match, timeout=timeout)
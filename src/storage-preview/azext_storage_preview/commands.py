@@ -105,7 +105,6 @@ def load_command_table(self, _):  # pylint: disable=too-many-locals, too-many-st
 
         g.storage_command_oauth('list', 'list_blobs', transform=transform_storage_list_output,
                                 table_transformer=transform_blob_output)
-        g.storage_command_oauth('download', 'get_blob_to_path')
         g.storage_command_oauth('generate-sas', 'generate_blob_shared_access_signature')
         g.storage_command_oauth('url', 'make_blob_url', transform=transform_url)
         g.storage_command_oauth('snapshot', 'snapshot_blob')
@@ -122,9 +121,13 @@ def load_command_table(self, _):  # pylint: disable=too-many-locals, too-many-st
         g.storage_custom_command_oauth('set-tier', 'set_blob_tier')
         g.storage_custom_command_oauth('upload', 'upload_blob',
                                        doc_string_source='blob#BlockBlobService.create_blob_from_path')
+        g.storage_custom_command_oauth('download', 'download_blob',
+                                       doc_string_source='blob#BaseBlobService.get_blob_to_path')
+        g.storage_custom_command_oauth('incremental-download', 'download_blob_incremental')
         g.storage_custom_command_oauth('upload-batch', 'storage_blob_upload_batch')
         g.storage_custom_command_oauth('download-batch', 'storage_blob_download_batch')
         g.storage_custom_command_oauth('delete-batch', 'storage_blob_delete_batch')
+        g.storage_custom_command_oauth('sync', 'storage_blob_sync')
 
         g.storage_command_oauth('metadata show', 'get_blob_metadata', exception_handler=g.get_handler_suppress_404())
         g.storage_command_oauth('metadata update', 'set_blob_metadata')
@@ -290,7 +293,7 @@ def load_command_table(self, _):  # pylint: disable=too-many-locals, too-many-st
                           exception_handler=g.get_handler_suppress_404())
         g.storage_command('update', 'set_file_properties')
         g.storage_command('exists', 'exists', transform=create_boolean_result_output_transformer('exists'))
-        g.storage_command('download', 'get_file_to_path')
+        g.storage_custom_command('download', 'download_file', doc_string_source='file#FileService.get_file_to_path')
         g.storage_command('upload', 'create_file_from_path')
         g.storage_command('metadata show', 'get_file_metadata', exception_handler=g.get_handler_suppress_404())
         g.storage_command('metadata update', 'set_file_metadata')
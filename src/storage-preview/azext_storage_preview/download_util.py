@@ -0,0 +1,148 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Tools to download blobs and files to file paths with positional writes.
+"""
+
+import threading
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def _parse_size_from_content_range(content_range):
+    """Parse the total size from a content range header: bytes 0-3/65537"""
+    return int(content_range.split('/', 1)[1])
+
+
+def _download_to_path(get_range, name, file_path, first_get_size, chunk_size, progress_callback=None,
+                      max_connections=2, tuner=None):
+    """
+    Download a blob or a file to a file path in chunks. get_range(start, end, first) gets a range of the blob or file,
+    where first is the result of the first range, or None when getting the first range.
+
+    As the SDK does, the first range establishes the size, then the rest is downloaded concurrently in chunks of
+    chunk_size bytes. The destination file is preallocated to its final size and every chunk is written to its
+    offset with a positional write by the thread downloading it, so the threads do not wait for each other to write.
+    If a TransferTuner is given, it tunes the chunk size and the connections of the rest of the download instead.
+    Get the result of the first range with the properties of the whole blob or file, or None if it is empty.
+    """
+    from azure.common import AzureHttpError
+    from knack.util import CLIError
+    from .transfer_util import PositionalFileWriter, run_chunks
+
+    try:
+        first = get_range(0, first_get_size - 1, None)
+    except AzureHttpError as ex:
+        if ex.status_code == 416:
+            # ranged gets fail on an empty blob or file
+            return None
+        raise
+
+    size = _parse_size_from_content_range(first.properties.content_range)
+    first_size = len(first.content)
+    progress = {'current': first_size}
+    progress_lock = threading.Lock()
+    if progress_callback:
+        progress_callback(first_size, size)
+
+    with PositionalFileWriter(file_path, size) as writer:
+        writer.write(0, first.content)
+        first.content = None
+
+        def _download_chunk(offset, end):
+            writer.write(offset, get_range(offset, end, first).content)
+
+            if progress_callback:
+                with progress_lock:
+                    progress['current'] += end - offset + 1
+                    progress_callback(progress['current'], size)
+
+        errors = []
+        for (offset, _), error in run_chunks(_download_chunk, first_size, size, chunk_size, max_connections, tuner):
+            logger.debug('failed to download the range at offset %d of %s: %s', offset, name, error)
+            errors.append(error)
+
+    if errors:
+        raise CLIError('Failed to download {} chunk(s) of {}: {}'.format(len(errors), name, errors[0]))
+
+    # the properties of the first range describe the whole blob or file, except for the range and the MD5
+    first.properties.content_length = size
+    first.properties.content_range = 'bytes {0}-{1}/{2}'.format(0, size - 1, size)
+    first.properties.content_md5 = None
+    return first
+
+
+def _create_tuner(client, name, validate_content, max_connections):
+    """Create a TransferTuner for the chunks of a download, starting from the chunk size of the SDK."""
+    from .transfer_util import TransferTuner, AUTO_TUNE_MAX_CONNECTIONS
+
+    # the service only provides transactional MD5s for ranges up to MAX_CHUNK_GET_SIZE
+    max_chunk_size = client.MAX_SINGLE_GET_SIZE if not validate_content else client.MAX_CHUNK_GET_SIZE
+    return TransferTuner(name, client.MAX_CHUNK_GET_SIZE, max_chunk_size, max_connections,
+                         max(max_connections, AUTO_TUNE_MAX_CONNECTIONS))
+
+
+def download_blob_to_path(client, container_name, blob_name, file_path, snapshot=None, validate_content=False,
+                          progress_callback=None, max_connections=2, lease_id=None, if_modified_since=None,
+                          if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None,
+                          auto_tune=False):
+    """
+    Download a whole blob to a file path, writing the chunks concurrently to a preallocated file. The access
+    conditions apply to the first chunk, the other chunks must come from the same version of the blob. If auto_tune
+    is True, the chunk size and the connections are tuned as the download runs.
+    """
+    def _get_range(start, end, first):
+        if first:
+            conditions = {'if_match': first.properties.etag}
+        else:
+            conditions = {'if_modified_since': if_modified_since, 'if_unmodified_since': if_unmodified_since,
+                          'if_match': if_match, 'if_none_match': if_none_match}
+        return client.get_blob_to_bytes(container_name, blob_name, snapshot=snapshot, start_range=start,
+                                        end_range=end, validate_content=validate_content, max_connections=1,
+                                        lease_id=lease_id, timeout=timeout, **conditions)
+
+    first_get_size = client.MAX_SINGLE_GET_SIZE if not validate_content else client.MAX_CHUNK_GET_SIZE
+    tuner = _create_tuner(client, blob_name, validate_content, max_connections) if auto_tune else None
+    blob = _download_to_path(_get_range, blob_name, file_path, first_get_size, client.MAX_CHUNK_GET_SIZE,
+                             progress_callback=progress_callback, max_connections=max_connections, tuner=tuner)
+    if blob is None:
+        return client.get_blob_to_path(container_name, blob_name, file_path, snapshot=snapshot,
+                                       validate_content=validate_content, progress_callback=progress_callback,
+                                       max_connections=1, lease_id=lease_id, if_modified_since=if_modified_since,
+                                       if_unmodified_since=if_unmodified_since, if_match=if_match,
+                                       if_none_match=if_none_match, timeout=timeout)
+    return blob
+
+
+def download_file_to_path(client, share_name, directory_name, file_name, file_path, validate_content=False,
+                          progress_callback=None, max_connections=2, timeout=None, snapshot=None, auto_tune=False):
+    """
+    Download a whole file to a file path, writing the chunks concurrently to a preallocated file. The file service
+    does not support conditional ranged gets, so the download fails if the ETag of a chunk differs from the ETag of
+    the first one. If auto_tune is True, the chunk size and the connections are tuned as the download runs.
+    """
+    from knack.util import CLIError
+
+    def _get_range(start, end, first):
+        chunk = client.get_file_to_bytes(share_name, directory_name, file_name, start_range=start, end_range=end,
+                                         validate_content=validate_content, max_connections=1, timeout=timeout,
+                                         snapshot=snapshot)
+        if first and chunk.properties.etag != first.properties.etag:
+            raise CLIError('{} has changed during the download.'.format(file_name))
+        return chunk
+
+    first_get_size = client.MAX_SINGLE_GET_SIZE if not validate_content else client.MAX_CHUNK_GET_SIZE
+    tuner = _create_tuner(client, file_name, validate_content, max_connections) if auto_tune else None
+    share_file = _download_to_path(_get_range, file_name, file_path, first_get_size, client.MAX_CHUNK_GET_SIZE,
+                                   progress_callback=progress_callback, max_connections=max_connections,
+                                   tuner=tuner)
+    if share_file is None:
+        return client.get_file_to_path(share_name, directory_name, file_name, file_path,
+                                       validate_content=validate_content, progress_callback=progress_callback,
+                                       max_connections=1, timeout=timeout, snapshot=snapshot)
+    return share_file
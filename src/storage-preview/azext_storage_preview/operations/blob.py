@@ -8,15 +8,21 @@ from __future__ import print_function
 import os
 from knack.log import get_logger
 
-from ..util import (create_blob_service_from_storage_client,
+from ..util import (create_blob_service_from_storage_client, create_page_blob_service_from_storage_client,
                     create_file_share_from_storage_client,
                     create_short_lived_share_sas,
                     create_short_lived_container_sas,
-                    filter_none, collect_blobs, collect_files,
+                    filter_none, collect_blobs, collect_blobs_with_size, iter_blobs_with_size, collect_files,
                     mkdir_p, guess_content_type, normalize_blob_file_path,
-                    check_precondition_success)
+                    check_precondition_success, compile_pattern)
 from ..url_quote_util import encode_for_url, make_encoded_file_url_and_params
 
+# delete-batch starts with a few concurrent deletes and ramps up as long as the service does not throttle
+DELETE_BATCH_INITIAL_CONCURRENCY = 8
+DELETE_BATCH_MAX_CONCURRENCY = 64
+
+SYNC_MANIFEST_VERSION = 1
+
 
 def set_blob_tier(client, container_name, blob_name, tier, blob_type='block', timeout=None):
     if blob_type == 'block':
@@ -140,23 +146,14 @@ def storage_blob_copy_batch(cmd, client, source_client, destination_container=No
 
 
 # pylint: disable=unused-argument
-def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False,
-                                progress_callback=None, max_connections=2):
-
-    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name):
-        # TODO: try catch IO exception
-        destination_path = os.path.join(destination_folder, normalized_blob_name)
-        destination_folder = os.path.dirname(destination_path)
-        if not os.path.exists(destination_folder):
-            mkdir_p(destination_folder)
-
-        blob = blob_service.get_blob_to_path(container, blob_name, destination_path, max_connections=max_connections,
-                                             progress_callback=progress_callback)
-        return blob.name
-
-    source_blobs = collect_blobs(client, source_container_name, pattern)
-    blobs_to_download = {}
-    for blob_name in source_blobs:
+def storage_blob_download_batch(cmd, client, source, destination, source_container_name, pattern=None,
+                                dryrun=False, progress_callback=None, max_connections=2, resume=False):
+    from collections import OrderedDict
+    from ..transfer_util import ConnectionBudget, BatchProgress, run_batch, get_download_connections
+
+    source_blobs = collect_blobs_with_size(client, source_container_name, pattern)
+    blobs_to_download = OrderedDict()
+    for blob_name, blob_size in source_blobs:
         # remove starting path seperator and normalize
         normalized_blob_name = normalize_blob_file_path(None, blob_name)
         if normalized_blob_name in blobs_to_download:
@@ -164,21 +161,126 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             raise CLIError('Multiple blobs with download path: `{}`. As a solution, use the `--pattern` parameter '
                            'to select for a subset of blobs to download OR utilize the `storage blob download` '
                            'command instead to download individual blobs.'.format(normalized_blob_name))
-        blobs_to_download[normalized_blob_name] = blob_name
+        blobs_to_download[normalized_blob_name] = (blob_name, blob_size)
 
+    logger = get_logger(__name__)
     if dryrun:
-        logger = get_logger(__name__)
         logger.warning('download action: from %s to %s', source, destination)
         logger.warning('    pattern %s', pattern)
         logger.warning('  container %s', source_container_name)
         logger.warning('      total %d', len(source_blobs))
         logger.warning(' operations')
-        for b in source_blobs:
+        for b, _ in source_blobs:
             logger.warning('  - %s', b)
         return []
 
-    return list(_download_blob(client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed])
-                for blob_normed in blobs_to_download)
+    # create the destination folders once, parents first, instead of checking for them before every download
+    for destination_folder in sorted(set(os.path.dirname(os.path.join(destination, normalized_blob_name))
+                                         for normalized_blob_name in blobs_to_download)):
+        mkdir_p(destination_folder)
+
+    connection_budget = ConnectionBudget(max_connections)
+    batch_progress = BatchProgress(progress_callback, sum(size or 0 for _, size in blobs_to_download.values()))
+
+    def _download_blob(normalized_blob_name):
+        blob_name, blob_size = blobs_to_download[normalized_blob_name]
+        destination_path = os.path.join(destination, normalized_blob_name)
+        blob_connections = get_download_connections(client, blob_size, connection_budget.size)
+
+        with connection_budget.reserve(blob_connections) as connections:
+            blob = download_blob(cmd, client, source_container_name, blob_name, destination_path,
+                                 max_connections=connections,
+                                 progress_callback=batch_progress.callback_for(normalized_blob_name),
+                                 resume=resume and blob_connections > 1)
+        return blob.name
+
+    results = {}
+    # collect the results as soon as the downloads complete, and report them in the order of the listing
+    for normalized_blob_name, result, error in run_batch(_download_blob, list(blobs_to_download),
+                                                         connection_budget.size, ordered=False):
+        if error:
+            logger.error('failed to download %s: %s', blobs_to_download[normalized_blob_name][0], error)
+        else:
+            logger.info('downloaded %s', result)
+            results[normalized_blob_name] = result
+
+    failures = [blob_name for normalized_blob_name, (blob_name, _) in blobs_to_download.items()
+                if normalized_blob_name not in results]
+    if failures:
+        from knack.util import CLIError
+        raise CLIError('{} of {} blob(s) failed to download: {}'.format(len(failures), len(blobs_to_download),
+                                                                        ', '.join(failures)))
+
+    return [results[normalized_blob_name] for normalized_blob_name in blobs_to_download]
+
+
+def download_blob(cmd, client, container_name, blob_name, file_path, open_mode='wb', snapshot=None, start_range=None,
+                  end_range=None, validate_content=False, progress_callback=None, max_connections=2, lease_id=None,
+                  if_modified_since=None, if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None,
+                  resume=False, sparse=False, auto_tune=False):
+    """Download a blob to a file path, with automatic chunking and progress notifications."""
+    whole_blob = start_range is None and end_range is None and open_mode == 'wb'
+    if auto_tune and (resume or sparse or not whole_blob):
+        from knack.util import CLIError
+        raise CLIError('usage error: --auto-tune cannot be combined with --resume, --sparse, --start-range, '
+                       '--end-range or --open-mode')
+
+    if sparse:
+        from knack.util import CLIError
+        if resume or not whole_blob:
+            raise CLIError('usage error: --sparse cannot be combined with --resume, --start-range, --end-range or '
+                           '--open-mode')
+
+        from ..page_blob_util import download_page_blob_sparse
+        return download_page_blob_sparse(create_page_blob_service_from_storage_client(cmd, client), container_name,
+                                         blob_name, file_path, snapshot=snapshot, validate_content=validate_content,
+                                         progress_callback=progress_callback, max_connections=max_connections,
+                                         lease_id=lease_id, if_modified_since=if_modified_since,
+                                         if_unmodified_since=if_unmodified_since, if_match=if_match,
+                                         if_none_match=if_none_match, timeout=timeout)
+
+    if not resume and whole_blob and (max_connections > 1 or auto_tune):
+        from ..download_util import download_blob_to_path
+        return download_blob_to_path(client, container_name, blob_name, file_path, snapshot=snapshot,
+                                     validate_content=validate_content, progress_callback=progress_callback,
+                                     max_connections=max_connections, lease_id=lease_id,
+                                     if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                                     if_match=if_match, if_none_match=if_none_match, timeout=timeout,
+                                     auto_tune=auto_tune)
+
+    if not resume:
+        return client.get_blob_to_path(container_name, blob_name, file_path, open_mode=open_mode, snapshot=snapshot,
+                                       start_range=start_range, end_range=end_range,
+                                       validate_content=validate_content, progress_callback=progress_callback,
+                                       max_connections=max_connections, lease_id=lease_id,
+                                       if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                                       if_match=if_match, if_none_match=if_none_match, timeout=timeout)
+
+    if not whole_blob:
+        from knack.util import CLIError
+        raise CLIError('usage error: --resume cannot be combined with --start-range, --end-range or --open-mode')
+
+    from ..resumable_util import download_blob_resumable
+    return download_blob_resumable(client, container_name, blob_name, file_path, snapshot=snapshot,
+                                   validate_content=validate_content, progress_callback=progress_callback,
+                                   max_connections=max_connections, lease_id=lease_id,
+                                   if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                                   if_match=if_match, if_none_match=if_none_match, timeout=timeout)
+
+
+def download_blob_incremental(cmd, client, container_name, blob_name, file_path, previous_snapshot, snapshot=None,
+                              validate_content=False, progress_callback=None, max_connections=2, lease_id=None,
+                              if_modified_since=None, if_unmodified_since=None, if_match=None, if_none_match=None,
+                              timeout=None):
+    """Update a local copy of a snapshot of a page blob with the pages changed since that snapshot."""
+    from ..page_blob_util import download_page_blob_incremental
+    return download_page_blob_incremental(create_page_blob_service_from_storage_client(cmd, client), container_name,
+                                          blob_name, file_path, previous_snapshot, snapshot=snapshot,
+                                          validate_content=validate_content, progress_callback=progress_callback,
+                                          max_connections=max_connections, lease_id=lease_id,
+                                          if_modified_since=if_modified_since,
+                                          if_unmodified_since=if_unmodified_since, if_match=if_match,
+                                          if_none_match=if_none_match, timeout=timeout)
 
 
 def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  # pylint: disable=too-many-locals
@@ -187,7 +289,7 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
                               content_settings=None, metadata=None, validate_content=False,
                               maxsize_condition=None, max_connections=2, lease_id=None, progress_callback=None,
                               if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, resume=False):
     def _create_return_result(blob_name, blob_content_settings, upload_result=None):
         blob_name = normalize_blob_file_path(destination_path, blob_name)
         return {
@@ -199,6 +301,10 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
     logger = get_logger(__name__)
     t_content_settings = cmd.get_models('blob.models#ContentSettings')
 
+    if resume and blob_type != 'block':
+        from knack.util import CLIError
+        raise CLIError('usage error: --resume is only supported for block blobs')
+
     results = []
     if dryrun:
         logger.info('upload action: from %s to %s', source, destination)
@@ -210,33 +316,235 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
         for src, dst in source_files or []:
             results.append(_create_return_result(dst, guess_content_type(src, content_settings, t_content_settings)))
     else:
+        from ..transfer_util import ConnectionBudget, BatchProgress, run_batch, get_file_size
+
         @check_precondition_success
         def _upload_blob(*args, **kwargs):
             return upload_blob(*args, **kwargs)
 
-        for src, dst in source_files or []:
+        source_files = list(source_files or [])
+        file_sizes = [get_file_size(src) for src, _ in source_files]
+        connection_budget = ConnectionBudget(max_connections)
+        batch_progress = BatchProgress(progress_callback, sum(file_sizes))
+
+        def _upload_action(index):
+            src, dst = source_files[index]
             logger.warning('uploading %s', src)
             guessed_content_settings = guess_content_type(src, content_settings, t_content_settings)
-
-            include, result = _upload_blob(cmd, client, destination_container_name,
-                                           normalize_blob_file_path(destination_path, dst), src,
-                                           blob_type=blob_type, content_settings=guessed_content_settings,
-                                           metadata=metadata, validate_content=validate_content,
-                                           maxsize_condition=maxsize_condition, max_connections=max_connections,
-                                           lease_id=lease_id, progress_callback=progress_callback,
-                                           if_modified_since=if_modified_since,
-                                           if_unmodified_since=if_unmodified_since, if_match=if_match,
-                                           if_none_match=if_none_match, timeout=timeout)
-            if include:
-                results.append(_create_return_result(dst, guessed_content_settings, result))
+            file_connections = _get_upload_connections(client, blob_type, file_sizes[index], connection_budget.size)
+
+            with connection_budget.reserve(file_connections) as connections:
+                include, result = _upload_blob(cmd, client, destination_container_name,
+                                               normalize_blob_file_path(destination_path, dst), src,
+                                               blob_type=blob_type, content_settings=guessed_content_settings,
+                                               metadata=metadata, validate_content=validate_content,
+                                               maxsize_condition=maxsize_condition, max_connections=connections,
+                                               lease_id=lease_id, progress_callback=batch_progress.callback_for(index),
+                                               if_modified_since=if_modified_since,
+                                               if_unmodified_since=if_unmodified_since, if_match=if_match,
+                                               if_none_match=if_none_match, timeout=timeout, resume=resume)
+            return include, _create_return_result(dst, guessed_content_settings, result)
+
+        failures = []
+        for index, outcome, error in run_batch(_upload_action, range(len(source_files)), connection_budget.size):
+            if error:
+                logger.error('failed to upload %s: %s', source_files[index][0], error)
+                failures.append(source_files[index][0])
+            elif outcome[0]:
+                results.append(outcome[1])
+
+        if failures:
+            from knack.util import CLIError
+            raise CLIError('{} of {} file(s) failed to upload: {}'.format(len(failures), len(source_files),
+                                                                          ', '.join(failures)))
 
     return results
 
 
+def storage_blob_sync(cmd, client, source, destination, pattern=None,  # pylint: disable=too-many-locals
+                      destination_path=None, source_files=None, destination_container_name=None, blob_type=None,
+                      delete_orphans=False, max_connections=2, progress_callback=None, timeout=None, dryrun=False):
+    """Upload the new and changed files of a local directory to a blob container."""
+    from ..transfer_util import ConnectionBudget, BatchProgress, run_batch
+
+    logger = get_logger(__name__)
+    t_content_settings = cmd.get_models('blob.models#ContentSettings')
+    source_files = list(source_files or [])
+
+    # normalizing an empty path gives '.'
+    prefix = normalize_blob_file_path(destination_path, '') + '/' if destination_path else ''
+    remote_blobs = dict((blob.name, blob.properties)
+                        for blob in client.list_blobs(destination_container_name, prefix=prefix or None))
+
+    manifest_path = _get_sync_manifest_path(cmd, client.account_name, destination_container_name, prefix, source)
+    manifest = _load_sync_manifest(manifest_path)
+    new_manifest = {}
+
+    connection_budget = ConnectionBudget(max_connections)
+    batch_progress = BatchProgress(progress_callback)
+
+    def _sync_action(index):
+        """Upload a file unless it is unchanged. Return the manifest entry of the file, or None in a dry run."""
+        src, dst = source_files[index]
+        blob_name = normalize_blob_file_path(destination_path, dst)
+        file_stat = os.stat(src)
+        remote = remote_blobs.get(blob_name)
+        local_md5 = None
+
+        if remote is not None and remote.content_length == file_stat.st_size:
+            # unchanged since the last sync, without reading the file
+            entry = manifest.get(blob_name)
+            if entry and entry == _create_sync_manifest_entry(file_stat, remote.etag):
+                return False, entry
+
+            remote_md5 = remote.content_settings.content_md5
+            if remote_md5:
+                local_md5 = _get_file_md5(src)
+                if local_md5 == remote_md5:
+                    return False, _create_sync_manifest_entry(file_stat, remote.etag)
+
+        if dryrun:
+            return True, None
+
+        # store the MD5 of the content so that the blob can be compared even without a manifest
+        content_settings = guess_content_type(src, t_content_settings(content_md5=local_md5 or _get_file_md5(src)),
+                                              t_content_settings)
+        batch_progress.add_total(file_stat.st_size)
+        file_connections = _get_upload_connections(client, blob_type, file_stat.st_size, connection_budget.size)
+        with connection_budget.reserve(file_connections) as connections:
+            logger.warning('uploading %s', src)
+            result = upload_blob(cmd, client, destination_container_name, blob_name, src, blob_type=blob_type,
+                                 content_settings=content_settings, max_connections=connections,
+                                 progress_callback=batch_progress.callback_for(index), timeout=timeout)
+        return True, _create_sync_manifest_entry(file_stat, result.etag)
+
+    uploaded = []
+    unchanged = 0
+    failures = []
+    for index, outcome, error in run_batch(_sync_action, range(len(source_files)), connection_budget.size):
+        src, dst = source_files[index]
+        blob_name = normalize_blob_file_path(destination_path, dst)
+        if error:
+            logger.error('failed to upload %s: %s', src, error)
+            failures.append(src)
+            continue
+
+        changed, entry = outcome
+        if changed:
+            uploaded.append(blob_name)
+        else:
+            unchanged += 1
+        if entry:
+            new_manifest[blob_name] = entry
+
+    # the blobs under the destination path and in the scope of the pattern, which have no local file
+    match_path = compile_pattern(pattern.lstrip('/') if pattern else None)
+    local_blobs = set(normalize_blob_file_path(destination_path, dst) for _, dst in source_files)
+    orphans = sorted(name for name in remote_blobs
+                     if name not in local_blobs and match_path(name[len(prefix):]))
+
+    deleted = []
+    if dryrun:
+        logger.warning('sync action: from %s to %s', source, destination)
+        logger.warning('    pattern %s', pattern)
+        logger.warning('  container %s', destination_container_name)
+        logger.warning('  unchanged %d', unchanged)
+        logger.warning(' operations')
+        for blob_name in uploaded:
+            logger.warning('  - upload %s', blob_name)
+        for blob_name in orphans if delete_orphans else []:
+            logger.warning('  - delete %s', blob_name)
+        return []
+
+    if delete_orphans:
+        def _delete_orphan(blob_name):
+            return client.delete_blob(destination_container_name, blob_name, timeout=timeout)
+
+        for blob_name, _, error in run_batch(_delete_orphan, orphans, connection_budget.size, ordered=False):
+            if error:
+                logger.error('failed to delete %s: %s', blob_name, error)
+                failures.append(blob_name)
+            else:
+                deleted.append(blob_name)
+    elif orphans:
+        logger.warning('%d blob(s) in the destination have no local file. Use --delete-orphans to delete them.',
+                       len(orphans))
+
+    _save_sync_manifest(manifest_path, new_manifest)
+
+    if failures:
+        from knack.util import CLIError
+        raise CLIError('{} file(s) or blob(s) failed to sync: {}'.format(len(failures), ', '.join(failures)))
+
+    return {
+        'Uploaded': [client.make_blob_url(destination_container_name, blob_name) for blob_name in uploaded],
+        'Deleted': [client.make_blob_url(destination_container_name, blob_name) for blob_name in deleted],
+        'Unchanged': unchanged
+    }
+
+
+def _create_sync_manifest_entry(file_stat, etag):
+    return {'size': file_stat.st_size, 'mtime': file_stat.st_mtime, 'etag': etag}
+
+
+def _get_sync_manifest_path(cmd, account_name, container_name, prefix, source):
+    """The manifest of a sync lives in the CLI config dir and is identified by its source and destination."""
+    import hashlib
+    sync_id = '\n'.join([account_name or '', container_name, prefix, os.path.realpath(source)])
+    return os.path.join(cmd.cli_ctx.config.config_dir, 'storage_sync',
+                        hashlib.sha1(sync_id.encode('utf-8')).hexdigest() + '.json')
+
+
+def _load_sync_manifest(manifest_path):
+    import json
+    try:
+        with open(manifest_path, 'r') as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get('version') == SYNC_MANIFEST_VERSION:
+            return manifest['files']
+    except (IOError, OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def _save_sync_manifest(manifest_path, files):
+    import json
+    import tempfile
+    temp_path = None
+    try:
+        mkdir_p(os.path.dirname(manifest_path))
+        # write to a temporary file and rename it over the manifest, so that an interrupted sync never leaves a
+        # partially written manifest or no manifest at all
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(manifest_path))
+        with os.fdopen(fd, 'w') as manifest_file:
+            json.dump({'version': SYNC_MANIFEST_VERSION, 'files': files}, manifest_file)
+        if hasattr(os, 'replace'):
+            os.replace(temp_path, manifest_path)  # pylint: disable=no-member
+        else:
+            # Python 2.x cannot rename over an existing file on Windows
+            if os.name == 'nt' and os.path.exists(manifest_path):
+                os.remove(manifest_path)
+            os.rename(temp_path, manifest_path)
+    except (IOError, OSError) as ex:
+        get_logger(__name__).warning('Failed to save the sync manifest %s: %s', manifest_path, ex)
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _get_file_md5(file_path):
+    import base64
+    import hashlib
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(4 * 1024 * 1024), b''):
+            md5.update(chunk)
+    return base64.b64encode(md5.digest()).decode('utf-8')
+
+
 def upload_blob(cmd, client, container_name, blob_name, file_path, blob_type=None, content_settings=None, metadata=None,
                 validate_content=False, maxsize_condition=None, max_connections=2, lease_id=None, tier=None,
                 if_modified_since=None, if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None,
-                progress_callback=None):
+                progress_callback=None, resume=False, auto_tune=False):
     """Upload a blob to a container."""
 
     t_content_settings = cmd.get_models('blob.models#ContentSettings')
@@ -276,11 +584,6 @@ def upload_blob(cmd, client, container_name, blob_name, file_path, blob_type=Non
         return client.append_blob_from_path(**append_blob_args)
 
     def upload_block_blob():
-        # increase the block size to 100MB when the block list will contain more than 50,000 blocks
-        if os.path.isfile(file_path) and os.stat(file_path).st_size > 50000 * 4 * 1024 * 1024:
-            client.MAX_BLOCK_SIZE = 100 * 1024 * 1024
-            client.MAX_SINGLE_PUT_SIZE = 256 * 1024 * 1024
-
         create_blob_args = {
             'container_name': container_name,
             'blob_name': blob_name,
@@ -303,8 +606,21 @@ def upload_blob(cmd, client, container_name, blob_name, file_path, blob_type=Non
         if cmd.supported_api_version(min_api='2016-05-31'):
             create_blob_args['validate_content'] = validate_content
 
+        # upload large files block by block with positional reads, the blocks are read concurrently without
+        # a shared lock on the file. The block size grows with the file for the block list to fit in 50,000 blocks.
+        if blob_type == 'block' and os.path.getsize(file_path) > client.MAX_SINGLE_PUT_SIZE:
+            from ..block_blob_util import upload_block_blob_from_path
+            return upload_block_blob_from_path(cmd, resume=resume, auto_tune=auto_tune, **create_blob_args)
+
         return client.create_blob_from_path(**create_blob_args)
 
+    if (resume or auto_tune) and blob_type != 'block':
+        from knack.util import CLIError
+        raise CLIError('usage error: --resume and --auto-tune are only supported for block blobs')
+    if resume and auto_tune:
+        from knack.util import CLIError
+        raise CLIError('usage error: --resume cannot be combined with --auto-tune')
+
     type_func = {
         'append': upload_append_blob,
         'block': upload_block_blob,
@@ -313,10 +629,22 @@ def upload_blob(cmd, client, container_name, blob_name, file_path, blob_type=Non
     return type_func[blob_type]()
 
 
+def _get_upload_connections(client, blob_type, file_size, max_connections):
+    """Get the number of connections an upload uses. Files uploaded in a single request use one connection."""
+    if blob_type == 'append' or file_size <= getattr(client, 'MAX_SINGLE_PUT_SIZE', 0):
+        return 1
+
+    chunk_size = getattr(client, 'MAX_BLOCK_SIZE', None) or getattr(client, 'MAX_PAGE_SIZE', None)
+    if not chunk_size:
+        return max_connections
+    return max(1, min(max_connections, (file_size + chunk_size - 1) // chunk_size))
+
+
 def storage_blob_delete_batch(client, source, source_container_name, pattern=None, lease_id=None,
                               delete_snapshots=None, if_modified_since=None, if_unmodified_since=None, if_match=None,
                               if_none_match=None, timeout=None, dryrun=False):
-    @check_precondition_success
+    from ..transfer_util import AdaptiveConcurrency, run_batch
+
     def _delete_blob(blob_name):
         delete_blob_args = {
             'container_name': source_container_name,
@@ -331,10 +659,9 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
         }
         return client.delete_blob(**delete_blob_args)
 
-    source_blobs = list(collect_blobs(client, source_container_name, pattern))
-
+    logger = get_logger(__name__)
     if dryrun:
-        logger = get_logger(__name__)
+        source_blobs = list(collect_blobs(client, source_container_name, pattern))
         logger.warning('delete action: from %s', source)
         logger.warning('    pattern %s', pattern)
         logger.warning('  container %s', source_container_name)
@@ -344,7 +671,54 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
             logger.warning('  - %s', blob)
         return []
 
-    return [result for include, result in (_delete_blob(blob) for blob in source_blobs) if include]
+    from .._client_factory import size_connection_pool
+    size_connection_pool(client, DELETE_BATCH_MAX_CONCURRENCY)
+    concurrency = AdaptiveConcurrency(DELETE_BATCH_INITIAL_CONCURRENCY, DELETE_BATCH_MAX_CONCURRENCY)
+    check_delete_blob = check_precondition_success(_delete_blob, log_failure=False)
+
+    def _delete_action(blob_name):
+        with concurrency.slot():
+            return check_delete_blob(blob_name)
+
+    # watch every response, including the ones retried by the retry policy, to back off as soon as
+    # the service starts throttling
+    response_callback = client.response_callback
+
+    def _check_throttling(response):
+        if response_callback:
+            response_callback(response)
+        if response.status in [500, 503]:
+            concurrency.report_throttling()
+
+    results = []
+    skipped = []
+    failures = []
+    client.response_callback = _check_throttling
+    try:
+        # delete the blobs while the pages of the listing are being retrieved
+        source_blobs = (blob_name for blob_name, _ in iter_blobs_with_size(client, source_container_name, pattern))
+        for blob_name, outcome, error in run_batch(_delete_action, source_blobs, concurrency.maximum, ordered=False):
+            if error:
+                logger.error('failed to delete %s: %s', blob_name, error)
+                failures.append(blob_name)
+            elif outcome[0]:
+                results.append(outcome[1])
+            else:
+                logger.info('failed precondition: %s', blob_name)
+                skipped.append(blob_name)
+    finally:
+        client.response_callback = response_callback
+
+    logger.debug('deleted %d blob(s), throttled %d time(s), final concurrency %d', len(results),
+                 concurrency.throttled_count, concurrency.limit)
+    if skipped:
+        logger.warning('%d blob(s) were not deleted because their preconditions were not met. Use --verbose to '
+                       'list them.', len(skipped))
+    if failures:
+        from knack.util import CLIError
+        raise CLIError('{} blob(s) failed to be deleted: {}'.format(len(failures), ', '.join(failures)))
+
+    return results
 
 
 def _copy_blob_to_blob_container(blob_service, source_blob_service, destination_container, destination_path,
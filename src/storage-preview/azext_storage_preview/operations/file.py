@@ -32,11 +32,12 @@ def list_share_files(cmd, client, share_name, directory_name=None, timeout=None,
 
 
 def storage_file_upload_batch(cmd, client, destination, source, destination_path=None, pattern=None, dryrun=False,
-                              validate_content=False, content_settings=None, max_connections=1, metadata=None,
+                              validate_content=False, content_settings=None, max_connections=2, metadata=None,
                               progress_callback=None):
     """ Upload local files to Azure Storage File Share in batch """
 
     from ..util import glob_files_locally, normalize_blob_file_path
+    from ..transfer_util import ConnectionBudget, BatchProgress, run_batch, get_file_size
 
     source_files = [c for c in glob_files_locally(source, pattern)]
     logger = get_logger(__name__)
@@ -51,42 +52,89 @@ def storage_file_upload_batch(cmd, client, destination, source, destination_path
                  'Type': guess_content_type(src, content_settings, settings_class).content_type} for src, dst in
                 source_files]
 
-    # TODO: Performance improvement
-    # 1. Upload files in parallel
-    def _upload_action(src, dst):
-        dst = normalize_blob_file_path(destination_path, dst)
+    destination_files = [normalize_blob_file_path(destination_path, dst) for _, dst in source_files]
+    connection_budget = ConnectionBudget(max_connections)
+
+    # create every directory once before uploading the files, parents first
+    _make_directories_in_files_share(client, destination,
+                                     set(os.path.dirname(dst) for dst in destination_files),
+                                     connection_budget.size)
+
+    file_sizes = [get_file_size(src) for src, _ in source_files]
+    batch_progress = BatchProgress(progress_callback, sum(file_sizes))
+    range_size = getattr(client, 'MAX_RANGE_SIZE', None)
+
+    def _upload_action(index):
+        src, dst = source_files[index][0], destination_files[index]
         dir_name = os.path.dirname(dst)
         file_name = os.path.basename(dst)
 
-        _make_directory_in_files_share(client, destination, dir_name)
-        create_file_args = {'share_name': destination, 'directory_name': dir_name, 'file_name': file_name,
-                            'local_file_path': src, 'progress_callback': progress_callback,
-                            'content_settings': guess_content_type(src, content_settings, settings_class),
-                            'metadata': metadata, 'max_connections': max_connections}
+        # files are uploaded in ranges, one connection per range
+        file_connections = (file_sizes[index] + range_size - 1) // range_size if range_size else max_connections
+        with connection_budget.reserve(file_connections) as connections:
+            create_file_args = {'share_name': destination, 'directory_name': dir_name, 'file_name': file_name,
+                                'local_file_path': src, 'progress_callback': batch_progress.callback_for(index),
+                                'content_settings': guess_content_type(src, content_settings, settings_class),
+                                'metadata': metadata, 'max_connections': connections}
 
-        if cmd.supported_api_version(min_api='2016-05-31'):
-            create_file_args['validate_content'] = validate_content
+            if cmd.supported_api_version(min_api='2016-05-31'):
+                create_file_args['validate_content'] = validate_content
 
-        logger.warning('uploading %s', src)
-        client.create_file_from_path(**create_file_args)
+            logger.warning('uploading %s', src)
+            client.create_file_from_path(**create_file_args)
 
         return client.make_file_url(destination, dir_name, file_name)
 
-    return list(_upload_action(src, dst) for src, dst in source_files)
+    results = []
+    failures = []
+    for index, result, error in run_batch(_upload_action, range(len(source_files)), connection_budget.size):
+        if error:
+            logger.error('failed to upload %s: %s', source_files[index][0], error)
+            failures.append(source_files[index][0])
+        else:
+            results.append(result)
+
+    if failures:
+        from knack.util import CLIError
+        raise CLIError('{} of {} file(s) failed to upload: {}'.format(len(failures), len(source_files),
+                                                                      ', '.join(failures)))
+
+    return results
+
+
+def download_file(client, share_name, directory_name, file_name, file_path, open_mode='wb', start_range=None,
+                  end_range=None, validate_content=False, progress_callback=None, max_connections=2, timeout=None,
+                  snapshot=None, auto_tune=False):
+    """Download a file to a file path, with automatic chunking and progress notifications."""
+    whole_file = start_range is None and end_range is None and open_mode == 'wb'
+    if auto_tune and not whole_file:
+        from knack.util import CLIError
+        raise CLIError('usage error: --auto-tune cannot be combined with --start-range, --end-range or --open-mode')
+
+    if whole_file and (max_connections > 1 or auto_tune):
+        from ..download_util import download_file_to_path
+        return download_file_to_path(client, share_name, directory_name, file_name, file_path,
+                                     validate_content=validate_content, progress_callback=progress_callback,
+                                     max_connections=max_connections, timeout=timeout, snapshot=snapshot,
+                                     auto_tune=auto_tune)
+
+    return client.get_file_to_path(share_name, directory_name, file_name, file_path, open_mode=open_mode,
+                                   start_range=start_range, end_range=end_range, validate_content=validate_content,
+                                   progress_callback=progress_callback, max_connections=max_connections,
+                                   timeout=timeout, snapshot=snapshot)
 
 
 def storage_file_download_batch(cmd, client, source, destination, pattern=None, dryrun=False, validate_content=False,
-                                max_connections=1, progress_callback=None):
+                                max_connections=2, progress_callback=None):
     """
     Download files from file share to local directory in batch
     """
 
-    from ..util import glob_files_remotely, mkdir_p
-
-    source_files = glob_files_remotely(cmd, client, source, pattern)
+    from ..util import glob_files_remotely, glob_files_remotely_with_size, mkdir_p
+    from ..transfer_util import ConnectionBudget, BatchProgress, run_batch, get_download_connections
 
     if dryrun:
-        source_files_list = list(source_files)
+        source_files_list = list(glob_files_remotely(cmd, client, source, pattern, max_workers=max_connections))
 
         logger = get_logger(__name__)
         logger.warning('download files from file share')
@@ -101,21 +149,53 @@ def storage_file_download_batch(cmd, client, source, destination, pattern=None,
 
         return []
 
-    def _download_action(pair):
-        destination_dir = os.path.join(destination, pair[0])
-        mkdir_p(destination_dir)
-
-        get_file_args = {'share_name': source, 'directory_name': pair[0], 'file_name': pair[1],
-                         'file_path': os.path.join(destination, *pair), 'max_connections': max_connections,
-                         'progress_callback': progress_callback}
-
-        if cmd.supported_api_version(min_api='2016-05-31'):
-            get_file_args['validate_content'] = validate_content
-
-        client.get_file_to_path(**get_file_args)
-        return client.make_file_url(source, *pair)
+    logger = get_logger(__name__)
+    connection_budget = ConnectionBudget(max_connections)
+    batch_progress = BatchProgress(progress_callback)
+    # the cache of the local directories already created by the download workers
+    existing_dirs = set()
+
+    def _download_action(file_info):
+        dir_name, file_name, file_size = file_info
+        if dir_name not in existing_dirs:
+            mkdir_p(os.path.join(destination, dir_name))
+            existing_dirs.add(dir_name)
+
+        file_connections = get_download_connections(client, file_size, connection_budget.size)
+        with connection_budget.reserve(file_connections) as connections:
+            get_file_args = {'share_name': source, 'directory_name': dir_name, 'file_name': file_name,
+                             'file_path': os.path.join(destination, dir_name, file_name),
+                             'max_connections': connections,
+                             'progress_callback': batch_progress.callback_for((dir_name, file_name))}
+
+            if cmd.supported_api_version(min_api='2016-05-31'):
+                get_file_args['validate_content'] = validate_content
+
+            download_file(client, **get_file_args)
+        return client.make_file_url(source, dir_name, file_name)
+
+    def _discover_files():
+        # list the share concurrently, the downloads start as soon as the first directory is listed
+        for file_info in glob_files_remotely_with_size(cmd, client, source, pattern,
+                                                       max_workers=connection_budget.size):
+            batch_progress.add_total(file_info[2] or 0)
+            yield file_info
+
+    results = []
+    failures = []
+    for file_info, result, error in run_batch(_download_action, _discover_files(), connection_budget.size):
+        if error:
+            failed_file = '/'.join(p for p in file_info[:2] if p)
+            logger.error('failed to download %s: %s', failed_file, error)
+            failures.append(failed_file)
+        else:
+            results.append(result)
+
+    if failures:
+        from knack.util import CLIError
+        raise CLIError('{} file(s) failed to download: {}'.format(len(failures), ', '.join(failures)))
 
-    return list(_download_action(f) for f in source_files)
+    return results
 
 
 def storage_file_copy_batch(cmd, client, source_client, destination_share=None, destination_path=None,
@@ -296,7 +376,7 @@ def _make_directory_in_files_share(file_service, file_share, directory_path, exi
         p = os.path.dirname(p)
 
     for dir_name in reversed(parents):
-        if existing_dirs and (dir_name in existing_dirs):
+        if existing_dirs is not None and (dir_name in existing_dirs):
             continue
 
         try:
@@ -305,5 +385,33 @@ def _make_directory_in_files_share(file_service, file_share, directory_path, exi
             from knack.util import CLIError
             raise CLIError('Failed to create directory {}'.format(dir_name))
 
-        if existing_dirs:
-            existing_dirs.add(directory_path)
+        if existing_dirs is not None:
+            existing_dirs.add(dir_name)
+
+
+def _make_directories_in_files_share(file_service, file_share, directory_paths, max_workers=1):
+    """
+    Create the given directories and all their parents, each of them once.
+
+    The directories are created level by level so that every parent exists before its children are created, and the
+    directories of the same level are created concurrently.
+    """
+    from azure.common import AzureHttpError
+    from ..transfer_util import run_batch
+
+    levels = {}
+    for directory_path in directory_paths:
+        while directory_path:
+            levels.setdefault(directory_path.count('/'), set()).add(directory_path)
+            directory_path = os.path.dirname(directory_path)
+
+    def _create_directory(dir_name):
+        file_service.create_directory(share_name=file_share, directory_name=dir_name, fail_on_exist=False)
+
+    for level in sorted(levels):
+        for dir_name, _, error in run_batch(_create_directory, sorted(levels[level]), max_workers, ordered=False):
+            if isinstance(error, AzureHttpError):
+                from knack.util import CLIError
+                raise CLIError('Failed to create directory {}'.format(dir_name))
+            elif error:
+                raise error
@@ -0,0 +1,203 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Tools to transfer only the populated or changed pages of page blobs.
+"""
+
+import os
+import threading
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+# the page ranges of a large page blob are queried in segments, since a single query on a fragmented blob can time out
+PAGE_RANGES_SEGMENT_SIZE = 1024 * 1024 * 1024
+
+
+def _query_page_ranges(query, size, max_connections):
+    """
+    Run a page ranges query on every segment of a page blob concurrently. Get the page ranges as a sorted list of
+    (start, end, is_cleared) tuples, where end is inclusive. Contiguous page ranges of the same kind are merged.
+    """
+    from .transfer_util import run_batch
+
+    def _query_segment(segment_start):
+        return query(segment_start, min(segment_start + PAGE_RANGES_SEGMENT_SIZE, size) - 1)
+
+    ranges = []
+    for _, page_ranges, error in run_batch(_query_segment, range(0, size, PAGE_RANGES_SEGMENT_SIZE), max_connections):
+        if error:
+            raise error
+        for page_range in page_ranges:
+            if ranges and ranges[-1][1] + 1 == page_range.start and ranges[-1][2] == page_range.is_cleared:
+                ranges[-1] = (ranges[-1][0], page_range.end, page_range.is_cleared)
+            else:
+                ranges.append((page_range.start, page_range.end, page_range.is_cleared))
+    return ranges
+
+
+def get_populated_ranges(client, container_name, blob_name, size, snapshot=None, lease_id=None, if_match=None,
+                         timeout=None, max_connections=2):
+    """
+    Get the populated page ranges of a page blob as a sorted list of (start, end) tuples, where end is inclusive.
+    Contiguous page ranges are merged.
+    """
+    def _query(start, end):
+        return client.get_page_ranges(container_name, blob_name, snapshot=snapshot, start_range=start, end_range=end,
+                                      lease_id=lease_id, if_match=if_match, timeout=timeout)
+
+    return [(start, end) for start, end, _ in _query_page_ranges(_query, size, max_connections)]
+
+
+def get_changed_ranges(client, container_name, blob_name, size, previous_snapshot, snapshot=None, lease_id=None,
+                       if_match=None, timeout=None, max_connections=2):
+    """
+    Get the page ranges of a page blob which changed since a previous snapshot as a sorted list of
+    (start, end, is_cleared) tuples, where end is inclusive. Contiguous page ranges of the same kind are merged.
+    """
+    def _query(start, end):
+        return client.get_page_ranges_diff(container_name, blob_name, previous_snapshot, snapshot=snapshot,
+                                           start_range=start, end_range=end, lease_id=lease_id, if_match=if_match,
+                                           timeout=timeout)
+
+    return _query_page_ranges(_query, size, max_connections)
+
+
+def split_ranges(ranges, chunk_size):
+    """Split (start, end, is_cleared) ranges into ranges of at most chunk_size bytes."""
+    for start, end, is_cleared in ranges:
+        for chunk_start in range(start, end + 1, chunk_size):
+            yield chunk_start, min(chunk_start + chunk_size, end + 1) - 1, is_cleared
+
+
+def _write_ranges(client, container_name, blob_name, writer, ranges, snapshot=None, etag=None, validate_content=False,
+                  progress_callback=None, max_connections=2, lease_id=None, timeout=None):
+    """
+    Write the ranges of a page blob to the same offsets of a file with a PositionalFileWriter concurrently. The
+    cleared ranges are written with zeros, the other ranges are downloaded. Get the errors of the ranges which failed.
+    """
+    from .transfer_util import run_batch
+
+    chunk_size = client.MAX_CHUNK_GET_SIZE
+    total = sum(end - start + 1 for start, end, _ in ranges)
+    progress = {'current': 0}
+    progress_lock = threading.Lock()
+    if progress_callback:
+        progress_callback(0, total)
+
+    def _write_range(chunk_range):
+        start, end, is_cleared = chunk_range
+        if is_cleared:
+            content = b'\0' * (end - start + 1)
+        else:
+            content = client.get_blob_to_bytes(container_name, blob_name, snapshot=snapshot, start_range=start,
+                                               end_range=end, validate_content=validate_content, max_connections=1,
+                                               lease_id=lease_id, if_match=etag, timeout=timeout).content
+        writer.write(start, content)
+
+        if progress_callback:
+            with progress_lock:
+                progress['current'] += end - start + 1
+                progress_callback(progress['current'], total)
+
+    errors = []
+    for chunk_range, _, error in run_batch(_write_range, split_ranges(ranges, chunk_size), max_connections,
+                                           ordered=False):
+        if error:
+            logger.debug('failed to write the range %d-%d of %s: %s', chunk_range[0], chunk_range[1], blob_name,
+                         error)
+            errors.append(error)
+    return errors
+
+
+def _get_page_blob_properties(client, container_name, blob_name, snapshot=None, lease_id=None, if_modified_since=None,
+                              if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None):
+    from knack.util import CLIError
+
+    blob = client.get_blob_properties(container_name, blob_name, snapshot=snapshot, lease_id=lease_id,
+                                      if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                                      if_match=if_match, if_none_match=if_none_match, timeout=timeout)
+    if blob.properties.blob_type != 'PageBlob':
+        raise CLIError('{} is not a page blob.'.format(blob_name))
+    return blob
+
+
+def download_page_blob_sparse(client, container_name, blob_name, file_path, snapshot=None, validate_content=False,
+                              progress_callback=None, max_connections=2, lease_id=None, if_modified_since=None,
+                              if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None):
+    """
+    Download the populated pages of a page blob to a file path. The file is extended to the size of the blob without
+    writing the unpopulated pages, which read as zeros, so it is created as a sparse file where the file system
+    supports it.
+    """
+    from knack.util import CLIError
+    from .transfer_util import PositionalFileWriter
+
+    blob = _get_page_blob_properties(client, container_name, blob_name, snapshot=snapshot, lease_id=lease_id,
+                                     if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                                     if_match=if_match, if_none_match=if_none_match, timeout=timeout)
+    size = blob.properties.content_length
+    # if_match makes sure the page ranges and the pages come from the same version of the blob
+    etag = blob.properties.etag
+    ranges = get_populated_ranges(client, container_name, blob_name, size, snapshot=snapshot, lease_id=lease_id,
+                                  if_match=etag, timeout=timeout, max_connections=max_connections)
+    logger.info('downloading %d populated byte(s) of %d in %d range(s) of %s',
+                sum(end - start + 1 for start, end in ranges), size, len(ranges), blob_name)
+
+    # the file is not preallocated so that the unpopulated pages stay holes
+    with PositionalFileWriter(file_path, size, preallocate=False) as writer:
+        errors = _write_ranges(client, container_name, blob_name, writer,
+                               [(start, end, False) for start, end in ranges], snapshot=snapshot, etag=etag,
+                               validate_content=validate_content, progress_callback=progress_callback,
+                               max_connections=max_connections, lease_id=lease_id, timeout=timeout)
+
+    if errors:
+        raise CLIError('Failed to download {} range(s) of {}: {}'.format(len(errors), blob_name, errors[0]))
+
+    return blob
+
+
+def download_page_blob_incremental(client, container_name, blob_name, file_path, previous_snapshot, snapshot=None,
+                                   validate_content=False, progress_callback=None, max_connections=2, lease_id=None,
+                                   if_modified_since=None, if_unmodified_since=None, if_match=None,
+                                   if_none_match=None, timeout=None):
+    """
+    Update a local copy of a previous snapshot of a page blob to a more recent snapshot, or to the current blob. Only
+    the pages which changed since the previous snapshot are downloaded and written to the file in place, and the
+    pages which were cleared are zeroed.
+    """
+    from knack.util import CLIError
+    from .transfer_util import PositionalFileWriter
+
+    if not os.path.isfile(file_path):
+        raise CLIError('{} does not exist. Download the previous snapshot of the blob to it first.'.format(file_path))
+
+    blob = _get_page_blob_properties(client, container_name, blob_name, snapshot=snapshot, lease_id=lease_id,
+                                     if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                                     if_match=if_match, if_none_match=if_none_match, timeout=timeout)
+    size = blob.properties.content_length
+    # snapshots are read-only, the current blob must not change between the page ranges query and the download
+    etag = None if snapshot else blob.properties.etag
+    ranges = get_changed_ranges(client, container_name, blob_name, size, previous_snapshot, snapshot=snapshot,
+                                lease_id=lease_id, if_match=etag, timeout=timeout, max_connections=max_connections)
+    logger.info('updating %s with %d changed and %d cleared byte(s) of %s', file_path,
+                sum(end - start + 1 for start, end, is_cleared in ranges if not is_cleared),
+                sum(end - start + 1 for start, end, is_cleared in ranges if is_cleared), blob_name)
+
+    with open(file_path, 'r+b') as stream:
+        # the blob may have been resized since the previous snapshot
+        stream.truncate(size)
+    with PositionalFileWriter(file_path, size, resume=True) as writer:
+        errors = _write_ranges(client, container_name, blob_name, writer, ranges, snapshot=snapshot, etag=etag,
+                               validate_content=validate_content, progress_callback=progress_callback,
+                               max_connections=max_connections, lease_id=lease_id, timeout=timeout)
+
+    if errors:
+        raise CLIError('Failed to update {} range(s) of {}: {}. The file is only partially updated, run the command '
+                       'again to complete it.'.format(len(errors), file_path, errors[0]))
+
+    return blob
@@ -0,0 +1,175 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Tools to resume interrupted blob downloads.
+"""
+
+import json
+import os
+import threading
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+DOWNLOAD_JOURNAL_SUFFIX = '.azjournal'
+DOWNLOAD_JOURNAL_VERSION = 1
+# the completed chunks are synced to disk and recorded in the journal in batches of this many chunks
+DOWNLOAD_JOURNAL_SYNC_CHUNKS = 16
+
+
+class DownloadJournal(object):
+    """
+    A sidecar file recording the chunks of a blob already written to the destination file.
+
+    The first line holds the ETag and the size of the blob, and the chunk size of the download. Then the offset of
+    every completed chunk is appended on its own line, so recording a chunk costs one small append regardless of the
+    size of the blob. The journal only applies to the version of the blob it was created for.
+
+    The offsets are appended in batches of DOWNLOAD_JOURNAL_SYNC_CHUNKS chunks, and only after the destination file
+    has been synced to disk, so that a crash or a power loss never leaves the journal recording a chunk whose data
+    was not persisted. A crash loses at most the progress of the last batch.
+    """
+
+    def __init__(self, file_path, etag, size, chunk_size):
+        self.path = file_path + DOWNLOAD_JOURNAL_SUFFIX
+        self.header = {'version': DOWNLOAD_JOURNAL_VERSION, 'etag': etag, 'size': size, 'chunk_size': chunk_size}
+        self._lock = threading.Lock()
+        self._stream = None
+        self._sync_data = None
+        self._pending = []
+
+    def load(self):
+        """Get the offsets of the completed chunks, or None if there is no journal for this version of the blob."""
+        try:
+            with open(self.path, 'r') as journal:
+                if json.loads(journal.readline()) != self.header:
+                    return None
+                completed = set()
+                for line in journal:
+                    try:
+                        completed.add(int(line))
+                    except ValueError:
+                        # a line left incomplete by an interruption
+                        pass
+                return completed
+        except (IOError, OSError, ValueError):
+            return None
+
+    def start(self, resumed, sync_data=None):
+        """
+        Open the journal to record chunks, starting a new journal unless the download is resumed. sync_data() syncs
+        the chunks written to the destination file to disk.
+        """
+        self._sync_data = sync_data
+        self._stream = open(self.path, 'a' if resumed else 'w')
+        if not resumed:
+            self._stream.write(json.dumps(self.header) + '\n')
+            self._stream.flush()
+
+    def record(self, offset):
+        """Record a chunk written to the destination file."""
+        with self._lock:
+            self._pending.append(offset)
+            if len(self._pending) >= DOWNLOAD_JOURNAL_SYNC_CHUNKS:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        if self._sync_data:
+            self._sync_data()
+        self._stream.write(''.join('{}\n'.format(offset) for offset in self._pending))
+        self._stream.flush()
+        os.fsync(self._stream.fileno())
+        self._pending = []
+
+    def close(self, completed=False):
+        """Record the pending chunks and close the journal, then remove it if the download is completed."""
+        if self._stream:
+            try:
+                with self._lock:
+                    if not completed:
+                        self._flush()
+            finally:
+                self._stream.close()
+                self._stream = None
+        if completed:
+            os.remove(self.path)
+
+
+def download_blob_resumable(client, container_name, blob_name, file_path, snapshot=None, validate_content=False,
+                            progress_callback=None, max_connections=2, lease_id=None, if_modified_since=None,
+                            if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None):
+    """
+    Download a blob to a file path in chunks, recording the completed chunks in a journal next to the file. If the
+    download is interrupted, downloading the same blob to the same path again only fetches the missing chunks, as
+    long as the blob has not changed.
+    """
+    from .transfer_util import PositionalFileWriter, run_batch
+
+    blob = client.get_blob_properties(container_name, blob_name, snapshot=snapshot, lease_id=lease_id,
+                                      if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                                      if_match=if_match, if_none_match=if_none_match, timeout=timeout)
+    size = blob.properties.content_length
+    etag = blob.properties.etag
+    chunk_size = client.MAX_CHUNK_GET_SIZE
+
+    journal = DownloadJournal(file_path, etag, size, chunk_size)
+    completed = journal.load()
+    resumed = completed is not None and os.path.isfile(file_path) and os.path.getsize(file_path) == size
+    if resumed:
+        logger.info('resuming the download of %s, %d of %d chunk(s) already downloaded', blob_name,
+                    len(completed), (size + chunk_size - 1) // chunk_size)
+    else:
+        completed = set()
+
+    writer = PositionalFileWriter(file_path, size, resume=resumed)
+    journal.start(resumed=bool(completed), sync_data=writer.sync)
+    offsets = range(0, size, chunk_size)
+    missing = [offset for offset in offsets if offset not in completed]
+    progress = {'current': sum(min(chunk_size, size - offset) for offset in offsets if offset in completed)}
+    progress_lock = threading.Lock()
+    if progress_callback:
+        progress_callback(progress['current'], size)
+
+    def _download_chunk(offset):
+        end = min(offset + chunk_size, size) - 1
+        # if_match makes sure every chunk comes from the version of the blob the journal was created for
+        chunk = client.get_blob_to_bytes(container_name, blob_name, snapshot=snapshot, start_range=offset,
+                                         end_range=end, validate_content=validate_content, max_connections=1,
+                                         lease_id=lease_id, if_match=etag, timeout=timeout)
+        writer.write(offset, chunk.content)
+        journal.record(offset)
+
+        if progress_callback:
+            with progress_lock:
+                progress['current'] += end - offset + 1
+                progress_callback(progress['current'], size)
+
+    errors = []
+    finished = False
+    try:
+        for offset, _, error in run_batch(_download_chunk, missing, max_connections, ordered=False):
+            if error:
+                logger.debug('failed to download the range at offset %d of %s: %s', offset, blob_name, error)
+                errors.append(error)
+        finished = True
+    finally:
+        try:
+            # keep the journal if the download is interrupted so that it can be resumed, the journal syncs the file
+            # before recording the last chunks so it is closed first
+            journal.close(completed=finished and not errors)
+        finally:
+            writer.close()
+
+    if errors:
+        from knack.util import CLIError
+        raise CLIError('Failed to download {} chunk(s) of {}: {}. Run the command again to resume the download.'
+                       .format(len(errors), blob_name, errors[0]))
+
+    return blob
+
@@ -0,0 +1,129 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+import unittest
+
+import mock
+import requests
+from azure.common import AzureHttpError
+from knack.util import CLIError
+
+from ...operations.blob import (storage_blob_delete_batch, DELETE_BATCH_INITIAL_CONCURRENCY,
+                                DELETE_BATCH_MAX_CONCURRENCY)
+from ...transfer_util import AdaptiveConcurrency
+
+
+class _FakeBlobService(object):
+    """A blob service whose deletes report their responses to response_callback, like the SDK does."""
+
+    def __init__(self, blob_names, statuses=None, delay=0.002):
+        self.blob_names = blob_names
+        # blob name -> the statuses of the responses to its delete, the last one is final
+        self.statuses = statuses or {}
+        self.delay = delay
+        self.response_callback = mock.Mock()
+        self.original_response_callback = self.response_callback
+        self._httpclient = mock.Mock()
+        self._httpclient.session = requests.Session()
+        self.deleted = []
+        self.active = 0
+        self.max_active = 0
+        # the most deletes in flight before the first one completed
+        self.max_active_before_first_completion = 0
+        self._lock = threading.Lock()
+
+    def list_blobs(self, container_name, prefix=None):
+        for name in self.blob_names:
+            blob = mock.Mock()
+            blob.name = name
+            blob.properties.content_length = 1
+            yield blob
+
+    def delete_blob(self, container_name, blob_name, **_):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            if not self.deleted:
+                self.max_active_before_first_completion = max(self.max_active_before_first_completion, self.active)
+        try:
+            time.sleep(self.delay)
+            statuses = self.statuses.get(blob_name, [202])
+            for status in statuses:
+                self.response_callback(mock.Mock(status=status))
+            if statuses[-1] >= 300:
+                raise AzureHttpError('delete failed', statuses[-1])
+            with self._lock:
+                self.deleted.append(blob_name)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class TestStorageBlobDeleteBatch(unittest.TestCase):
+    def setUp(self):
+        self.logger = mock.MagicMock()
+        patcher = mock.patch('azext_storage_preview.operations.blob.get_logger', return_value=self.logger)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _delete_batch(client, **kwargs):
+        return storage_blob_delete_batch(client, 'container', 'container', **kwargs)
+
+    def test_delete_ramps_up_concurrency(self):
+        blob_names = ['blob-{:03d}'.format(i) for i in range(400)]
+        client = _FakeBlobService(blob_names)
+
+        self._delete_batch(client)
+
+        self.assertEqual(sorted(client.deleted), blob_names)
+        self.assertLessEqual(client.max_active_before_first_completion, DELETE_BATCH_INITIAL_CONCURRENCY)
+        self.assertGreater(client.max_active, DELETE_BATCH_INITIAL_CONCURRENCY)
+        self.assertLessEqual(client.max_active, DELETE_BATCH_MAX_CONCURRENCY)
+
+    def test_connection_pool_is_sized(self):
+        client = _FakeBlobService(['blob'])
+        self._delete_batch(client)
+
+        adapter = client._httpclient.session.get_adapter('https://')  # pylint: disable=protected-access
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], DELETE_BATCH_MAX_CONCURRENCY)
+
+    def test_throttling_responses_are_reported(self):
+        # retried responses are reported as well as the final ones
+        client = _FakeBlobService(['a', 'b', 'c', 'd'], statuses={'a': [503, 202], 'b': [500, 503, 202], 'c': [404]})
+
+        with mock.patch.object(AdaptiveConcurrency, 'report_throttling', autospec=True) as report_throttling:
+            with self.assertRaises(CLIError) as context:
+                self._delete_batch(client)
+
+        self.assertEqual(report_throttling.call_count, 3)
+        self.assertEqual(str(context.exception), '1 blob(s) failed to be deleted: c')
+        self.assertEqual(sorted(client.deleted), ['a', 'b', 'd'])
+        # the callback of the client sees every response and is restored afterwards
+        self.assertEqual([c[0][0].status for c in client.original_response_callback.call_args_list].count(503), 2)
+        self.assertEqual(client.original_response_callback.call_count, 7)
+        self.assertIs(client.response_callback, client.original_response_callback)
+
+    def test_failed_preconditions_are_summarized(self):
+        client = _FakeBlobService(['a', 'b', 'c'], statuses={'a': [412], 'c': [412]})
+
+        self._delete_batch(client, if_match='"etag"')
+
+        self.assertEqual(client.deleted, ['b'])
+        self.logger.warning.assert_called_once_with(
+            '%d blob(s) were not deleted because their preconditions were not met. Use --verbose to list them.', 2)
+        self.assertIs(client.response_callback, client.original_response_callback)
+
+    def test_dryrun_deletes_nothing(self):
+        client = _FakeBlobService(['a', 'b'])
+        self.assertEqual(self._delete_batch(client, dryrun=True), [])
+        self.assertEqual(client.deleted, [])
+        self.logger.warning.assert_any_call('  - %s', 'b')
+
+
+if __name__ == '__main__':
+    unittest.main()
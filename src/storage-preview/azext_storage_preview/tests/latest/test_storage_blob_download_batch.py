@@ -0,0 +1,72 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+from knack.util import CLIError
+
+from ...operations.blob import storage_blob_download_batch
+
+BLOB_NAMES = ['a.txt', 'dir/b.txt', 'dir/sub/c.txt', 'd.txt']
+
+
+def _make_blob(name, size=1):
+    blob = mock.MagicMock()
+    blob.name = name
+    blob.properties.content_length = size
+    return blob
+
+
+class TestStorageBlobDownloadBatch(unittest.TestCase):
+    def setUp(self):
+        self.destination = tempfile.mkdtemp()
+        self.client = mock.MagicMock()
+        self.client.MAX_SINGLE_GET_SIZE = 32 * 1024 * 1024
+        self.client.list_blobs.side_effect = lambda container, prefix=None: iter(_make_blob(n) for n in BLOB_NAMES)
+
+        self.failing_blobs = []
+        self.downloads = []
+        patcher = mock.patch('azext_storage_preview.operations.blob.download_blob', side_effect=self._download_blob)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.destination)
+
+    def _download_blob(self, cmd, client, container_name, blob_name, file_path, **kwargs):
+        # the first blobs of the listing complete last
+        time.sleep(0.01 * (len(BLOB_NAMES) - BLOB_NAMES.index(blob_name)))
+        self.downloads.append((blob_name, file_path))
+        if blob_name in self.failing_blobs:
+            raise CLIError('download failed')
+        return _make_blob(blob_name)
+
+    def _download_batch(self):
+        return storage_blob_download_batch(mock.MagicMock(), self.client, 'container', self.destination, 'container',
+                                           max_connections=4)
+
+    def test_results_in_listing_order(self):
+        self.assertEqual(self._download_batch(), BLOB_NAMES)
+        self.assertEqual(sorted(self.downloads),
+                         sorted((name, os.path.join(self.destination, name)) for name in BLOB_NAMES))
+        self.assertTrue(os.path.isdir(os.path.join(self.destination, 'dir', 'sub')))
+
+    def test_failure_does_not_abort_the_others(self):
+        self.failing_blobs = ['d.txt', 'a.txt']
+
+        with self.assertRaises(CLIError) as context:
+            self._download_batch()
+
+        self.assertEqual(sorted(name for name, _ in self.downloads), sorted(BLOB_NAMES))
+        self.assertEqual(str(context.exception), '2 of 4 blob(s) failed to download: a.txt, d.txt')
+
+
+if __name__ == '__main__':
+    unittest.main()
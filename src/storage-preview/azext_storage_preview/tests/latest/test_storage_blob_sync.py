@@ -0,0 +1,223 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from knack.util import CLIError
+
+from ...operations.blob import (storage_blob_sync, _create_sync_manifest_entry, _get_sync_manifest_path,
+                                _load_sync_manifest, _save_sync_manifest, _get_file_md5)
+from ...vendored_sdks.azure_storage.v2018_03_28.blob.models import ContentSettings
+
+
+def _make_blob(name, size, etag='"etag"', content_md5=None):
+    blob = mock.MagicMock()
+    blob.name = name
+    blob.properties.content_length = size
+    blob.properties.etag = etag
+    blob.properties.content_settings.content_md5 = content_md5
+    return blob
+
+
+class TestSyncManifest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.test_dir, 'storage_sync', 'manifest.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_save_and_load(self):
+        files = {'a.txt': {'size': 1, 'mtime': 2.5, 'etag': '"etag"'}}
+        _save_sync_manifest(self.manifest_path, files)
+        self.assertEqual(_load_sync_manifest(self.manifest_path), files)
+
+        _save_sync_manifest(self.manifest_path, {})
+        self.assertEqual(_load_sync_manifest(self.manifest_path), {})
+        self.assertEqual(os.listdir(os.path.dirname(self.manifest_path)), ['manifest.json'])
+
+    def test_load_missing_or_invalid(self):
+        self.assertEqual(_load_sync_manifest(self.manifest_path), {})
+
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, 'w') as manifest_file:
+            manifest_file.write('{"version": 1, "files": ')
+        self.assertEqual(_load_sync_manifest(self.manifest_path), {})
+
+        with open(self.manifest_path, 'w') as manifest_file:
+            manifest_file.write('{"version": 0, "files": {"a.txt": {}}}')
+        self.assertEqual(_load_sync_manifest(self.manifest_path), {})
+
+    def test_failed_save_keeps_manifest(self):
+        files = {'a.txt': {'size': 1, 'mtime': 2.5, 'etag': '"etag"'}}
+        _save_sync_manifest(self.manifest_path, files)
+        with mock.patch('json.dump', side_effect=IOError('disk full')):
+            _save_sync_manifest(self.manifest_path, {})
+        self.assertEqual(_load_sync_manifest(self.manifest_path), files)
+        self.assertEqual(os.listdir(os.path.dirname(self.manifest_path)), ['manifest.json'])
+
+    def test_get_file_md5(self):
+        file_path = os.path.join(self.test_dir, 'file')
+        with open(file_path, 'wb') as stream:
+            stream.write(b'abc')
+        self.assertEqual(_get_file_md5(file_path), 'kAFQmDzST7DWlj99KOF/cg==')
+
+
+class TestStorageBlobSync(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.test_dir, 'source')
+        os.makedirs(os.path.join(self.source, 'sub'))
+        self.source_files = []
+        for name, content in [('a.txt', b'aaa'), ('sub/b.txt', b'bbbb')]:
+            src = os.path.join(self.source, *name.split('/'))
+            with open(src, 'wb') as stream:
+                stream.write(content)
+            self.source_files.append((src, name))
+
+        self.cmd = mock.MagicMock()
+        self.cmd.get_models.return_value = ContentSettings
+        self.cmd.cli_ctx.config.config_dir = os.path.join(self.test_dir, 'config')
+
+        self.client = mock.MagicMock()
+        self.client.account_name = 'account'
+        self.client.MAX_SINGLE_PUT_SIZE = 64 * 1024 * 1024
+        self.client.make_blob_url.side_effect = lambda container, blob_name: blob_name
+        self.remote_blobs = []
+        self.client.list_blobs.side_effect = lambda container, prefix=None: \
+            iter(b for b in self.remote_blobs if b.name.startswith(prefix or ''))
+
+        self.uploads = []
+        patcher = mock.patch('azext_storage_preview.operations.blob.upload_blob', side_effect=self._upload_blob)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.logger = mock.MagicMock()
+        patcher = mock.patch('azext_storage_preview.operations.blob.get_logger', return_value=self.logger)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _upload_blob(self, cmd, client, container_name, blob_name, file_path, **kwargs):
+        self.uploads.append(blob_name)
+        if blob_name in getattr(self, 'failing_blobs', []):
+            raise CLIError('upload failed')
+        result = mock.MagicMock()
+        result.etag = '"{}-uploaded"'.format(blob_name)
+        return result
+
+    def _sync(self, **kwargs):
+        return storage_blob_sync(self.cmd, self.client, self.source, 'container', source_files=self.source_files,
+                                 destination_container_name='container', **kwargs)
+
+    def _manifest_path(self):
+        return _get_sync_manifest_path(self.cmd, 'account', 'container', '', self.source)
+
+    def test_upload_new_files(self):
+        result = self._sync()
+
+        self.assertEqual(sorted(self.uploads), ['a.txt', 'sub/b.txt'])
+        self.assertEqual(sorted(result['Uploaded']), ['a.txt', 'sub/b.txt'])
+        self.assertEqual(result['Unchanged'], 0)
+        manifest = _load_sync_manifest(self._manifest_path())
+        self.assertEqual(manifest['a.txt']['etag'], '"a.txt-uploaded"')
+        self.assertEqual(manifest['sub/b.txt']['size'], 4)
+
+    def test_skip_unchanged_files_by_manifest(self):
+        # the remote blobs have no MD5, so only the manifest tells that they are unchanged
+        self.remote_blobs = [_make_blob('a.txt', 3), _make_blob('sub/b.txt', 4)]
+        _save_sync_manifest(self._manifest_path(),
+                            dict((dst, _create_sync_manifest_entry(os.stat(src), '"etag"'))
+                                 for src, dst in self.source_files))
+
+        with mock.patch('azext_storage_preview.operations.blob._get_file_md5') as get_file_md5:
+            result = self._sync()
+            get_file_md5.assert_not_called()
+
+        self.assertEqual(self.uploads, [])
+        self.assertEqual(result['Unchanged'], 2)
+
+    def test_upload_changed_files(self):
+        # a.txt has another etag than in the manifest, sub/b.txt has another size than the blob
+        self.remote_blobs = [_make_blob('a.txt', 3, etag='"changed"'), _make_blob('sub/b.txt', 5)]
+        _save_sync_manifest(self._manifest_path(),
+                            dict((dst, _create_sync_manifest_entry(os.stat(src), '"etag"'))
+                                 for src, dst in self.source_files))
+
+        result = self._sync()
+
+        self.assertEqual(sorted(self.uploads), ['a.txt', 'sub/b.txt'])
+        self.assertEqual(result['Unchanged'], 0)
+
+    def test_skip_unchanged_files_by_content_md5(self):
+        self.remote_blobs = [_make_blob('a.txt', 3, content_md5=_get_file_md5(self.source_files[0][0])),
+                             _make_blob('sub/b.txt', 4, content_md5='bm90IHRoZSBtZDU=')]
+
+        result = self._sync()
+
+        self.assertEqual(self.uploads, ['sub/b.txt'])
+        self.assertEqual(result['Unchanged'], 1)
+        # the unchanged blob is added to the manifest, so the next sync does not read the file
+        self.assertEqual(_load_sync_manifest(self._manifest_path())['a.txt']['etag'], '"etag"')
+
+    def test_sync_to_destination_path(self):
+        self.remote_blobs = [_make_blob('dir/a.txt', 3, content_md5=_get_file_md5(self.source_files[0][0])),
+                             _make_blob('dir/orphan.txt', 1), _make_blob('other.txt', 1)]
+
+        result = self._sync(destination_path='dir', delete_orphans=True)
+
+        self.client.list_blobs.assert_called_once_with('container', prefix='dir/')
+        self.assertEqual(self.uploads, ['dir/sub/b.txt'])
+        self.assertEqual(result['Unchanged'], 1)
+        self.assertEqual(result['Deleted'], ['dir/orphan.txt'])
+
+    def test_report_orphans(self):
+        self.remote_blobs = [_make_blob('orphan.txt', 1), _make_blob('sub/orphan.log', 1)]
+
+        result = self._sync(pattern='*.txt')
+
+        self.client.delete_blob.assert_not_called()
+        self.assertEqual(result['Deleted'], [])
+        self.logger.warning.assert_any_call(
+            '%d blob(s) in the destination have no local file. Use --delete-orphans to delete them.', 1)
+
+    def test_delete_orphans(self):
+        self.remote_blobs = [_make_blob('orphan.txt', 1), _make_blob('sub/orphan.log', 1)]
+
+        result = self._sync(pattern='*.txt', delete_orphans=True)
+
+        self.client.delete_blob.assert_called_once_with('container', 'orphan.txt', timeout=None)
+        self.assertEqual(result['Deleted'], ['orphan.txt'])
+
+    def test_dryrun_makes_no_writes(self):
+        self.remote_blobs = [_make_blob('orphan.txt', 1)]
+
+        self.assertEqual(self._sync(delete_orphans=True, dryrun=True), [])
+
+        self.assertEqual(self.uploads, [])
+        self.client.delete_blob.assert_not_called()
+        self.assertFalse(os.path.exists(self._manifest_path()))
+        self.logger.warning.assert_any_call('  - upload %s', 'a.txt')
+        self.logger.warning.assert_any_call('  - delete %s', 'orphan.txt')
+
+    def test_save_manifest_after_partial_failure(self):
+        self.failing_blobs = ['sub/b.txt']
+
+        with self.assertRaises(CLIError):
+            self._sync()
+
+        self.assertEqual(sorted(self.uploads), ['a.txt', 'sub/b.txt'])
+        # the failed file is uploaded again by the next sync
+        self.assertEqual(list(_load_sync_manifest(self._manifest_path())), ['a.txt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+from azure.common import AzureHttpError
+from knack.util import CLIError
+
+from ...operations.blob import storage_blob_upload_batch
+from ...vendored_sdks.azure_storage.v2018_03_28.blob.models import ContentSettings
+
+# file name -> content, the client uploads files of more than 4 bytes in blocks of 4 bytes
+SOURCE_FILES = [('a.txt', b'0123456789'), ('b.txt', b'01'), ('dir/c.txt', b'012345'), ('dir/d.json', b'0')]
+
+
+class TestStorageBlobUploadBatch(unittest.TestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.source_files = []
+        for name, content in SOURCE_FILES:
+            src = os.path.join(self.source, *name.split('/'))
+            if not os.path.isdir(os.path.dirname(src)):
+                os.makedirs(os.path.dirname(src))
+            with open(src, 'wb') as stream:
+                stream.write(content)
+            self.source_files.append((src, name))
+
+        self.cmd = mock.MagicMock()
+        self.cmd.get_models.return_value = ContentSettings
+        self.client = mock.MagicMock()
+        self.client.MAX_SINGLE_PUT_SIZE = 4
+        self.client.MAX_BLOCK_SIZE = 4
+        self.client.make_blob_url.side_effect = lambda container, blob_name: blob_name
+
+        self.failing_blobs = {}
+        self.uploads = []
+        self.connections = {'current': 0, 'max': 0}
+        self._lock = threading.Lock()
+        patcher = mock.patch('azext_storage_preview.operations.blob.upload_blob', side_effect=self._upload_blob)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.source)
+
+    def _upload_blob(self, cmd, client, container_name, blob_name, file_path, max_connections=2, **kwargs):
+        with self._lock:
+            self.uploads.append((blob_name, max_connections))
+            self.connections['current'] += max_connections
+            self.connections['max'] = max(self.connections['max'], self.connections['current'])
+        try:
+            # the first files complete last
+            time.sleep(0.01 * (len(SOURCE_FILES) - [name for name, _ in SOURCE_FILES].index(blob_name)))
+            if blob_name in self.failing_blobs:
+                raise self.failing_blobs[blob_name]
+            result = mock.MagicMock()
+            result.etag = '"{}"'.format(blob_name)
+            return result
+        finally:
+            with self._lock:
+                self.connections['current'] -= max_connections
+
+    def _upload_batch(self, **kwargs):
+        return storage_blob_upload_batch(self.cmd, self.client, self.source, 'container',
+                                         source_files=self.source_files, destination_container_name='container',
+                                         blob_type='block', content_settings=ContentSettings(), **kwargs)
+
+    def test_results_in_source_order(self):
+        results = self._upload_batch(max_connections=8)
+
+        self.assertEqual([r['Blob'] for r in results], [name for name, _ in SOURCE_FILES])
+        self.assertEqual([r['eTag'] for r in results], ['"{}"'.format(name) for name, _ in SOURCE_FILES])
+        self.assertEqual([r['Type'] for r in results], [mimetypes.guess_type(name)[0] for name, _ in SOURCE_FILES])
+
+    def test_max_connections_is_shared(self):
+        self._upload_batch(max_connections=3)
+
+        # a.txt has 3 blocks and c.txt 2, the other files are uploaded with a single request
+        self.assertEqual(sorted(self.uploads), [('a.txt', 3), ('b.txt', 1), ('dir/c.txt', 2), ('dir/d.json', 1)])
+        self.assertLessEqual(self.connections['max'], 3)
+        self.assertGreater(self.connections['max'], 1)
+
+    def test_single_connection(self):
+        self._upload_batch(max_connections=1)
+        self.assertEqual(self.connections['max'], 1)
+        self.assertEqual(sorted(c for _, c in self.uploads), [1] * len(SOURCE_FILES))
+
+    def test_failure_does_not_stop_the_others(self):
+        self.failing_blobs = {'b.txt': CLIError('upload failed'),
+                              'dir/d.json': AzureHttpError('The server encountered an internal error.', 500)}
+
+        with self.assertRaises(CLIError) as context:
+            self._upload_batch(max_connections=4)
+
+        self.assertEqual(sorted(name for name, _ in self.uploads), [name for name, _ in SOURCE_FILES])
+        self.assertEqual(str(context.exception), '2 of 4 file(s) failed to upload: {}, {}'.format(
+            self.source_files[1][0], self.source_files[3][0]))
+
+    def test_failed_precondition_is_skipped(self):
+        self.failing_blobs = {'b.txt': AzureHttpError('The condition specified is not met.', 412)}
+
+        results = self._upload_batch(if_none_match='*')
+
+        self.assertEqual([r['Blob'] for r in results], ['a.txt', 'dir/c.txt', 'dir/d.json'])
+
+    def test_dryrun_uploads_nothing(self):
+        results = self._upload_batch(dryrun=True)
+
+        self.assertEqual(self.uploads, [])
+        self.assertEqual([r['Blob'] for r in results], [name for name, _ in SOURCE_FILES])
+        self.assertEqual([r['eTag'] for r in results], [None] * len(SOURCE_FILES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from knack.util import CLIError
+
+from ...block_blob_util import (get_block_size, upload_block_blob_from_path, MAX_BLOCKS_PER_BLOB,
+                                MAX_PUT_BLOCK_SIZE)
+from ...vendored_sdks.azure_storage.v2018_03_28.blob.models import BlobBlock, BlobBlockList, BlockListType
+
+
+class _FakeBlockBlobClient(object):
+    MAX_BLOCK_SIZE = 4
+
+    def __init__(self, fail_offsets=None):
+        self.staged = {}
+        self.fail_offsets = set(fail_offsets or [])
+        self.put_offsets = []
+        self.committed = None
+
+    def get_block_list(self, container_name, blob_name, block_list_type=None, **_):
+        block_list = BlobBlockList()
+        for block_id, block in self.staged.items():
+            blob_block = BlobBlock(block_id)
+            blob_block._set_size(len(block))  # pylint: disable=protected-access
+            block_list.uncommitted_blocks.append(blob_block)
+        return block_list
+
+    def put_block(self, container_name, blob_name, block, block_id, **_):
+        offset = int(block_id[-20:])
+        self.put_offsets.append(offset)
+        if offset in self.fail_offsets:
+            raise Exception('connection reset')
+        self.staged[block_id] = block
+
+    def put_block_list(self, container_name, blob_name, block_list, **_):
+        self.committed = b''.join(self.staged[block.id] for block in block_list)
+        self.staged = {}
+
+
+class TestUploadBlockBlobFromPath(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_dir, 'file')
+        with open(self.file_path, 'wb') as stream:
+            stream.write(b'0123456789')
+        self.cmd = mock.MagicMock()
+        self.cmd.get_models.side_effect = lambda model: {'blob.models#BlobBlock': BlobBlock,
+                                                         'blob.models#BlockListType': BlockListType}[model]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_upload(self):
+        client = _FakeBlockBlobClient()
+        progress = []
+        upload_block_blob_from_path(self.cmd, client, 'container', 'blob', self.file_path, max_connections=3,
+                                    progress_callback=lambda current, total: progress.append((current, total)))
+
+        self.assertEqual(client.committed, b'0123456789')
+        self.assertEqual(sorted(client.put_offsets), [0, 4, 8])
+        self.assertEqual(progress[0], (0, 10))
+        self.assertEqual(progress[-1], (10, 10))
+
+    def test_upload_auto_tune(self):
+        client = _FakeBlockBlobClient()
+        upload_block_blob_from_path(self.cmd, client, 'container', 'blob', self.file_path, max_connections=1,
+                                    auto_tune=True)
+
+        self.assertEqual(client.committed, b'0123456789')
+        self.assertEqual(client.put_offsets[:2], [0, 4])
+
+    def test_block_size_fits_block_list(self):
+        client = _FakeBlockBlobClient()
+        self.assertEqual(get_block_size(client, 10), 4)
+        self.assertEqual(get_block_size(client, 4 * MAX_BLOCKS_PER_BLOB), 4)
+        self.assertEqual(get_block_size(client, 4 * MAX_BLOCKS_PER_BLOB + 1), 8)
+
+    def test_block_size_within_service_limit(self):
+        client = _FakeBlockBlobClient()
+        client.MAX_BLOCK_SIZE = 3 * 1024 * 1024
+        max_size = MAX_BLOCKS_PER_BLOB * MAX_PUT_BLOCK_SIZE
+        # the multiple of MAX_BLOCK_SIZE would exceed the limit
+        self.assertEqual(get_block_size(client, max_size), MAX_PUT_BLOCK_SIZE)
+        with self.assertRaises(CLIError):
+            get_block_size(client, max_size + 1)
+
+    def test_resume_skips_staged_blocks(self):
+        client = _FakeBlockBlobClient(fail_offsets=[4])
+        with self.assertRaises(CLIError):
+            upload_block_blob_from_path(self.cmd, client, 'container', 'blob', self.file_path, max_connections=2,
+                                        resume=True)
+        self.assertIsNone(client.committed)
+
+        client.fail_offsets = set()
+        client.put_offsets = []
+        upload_block_blob_from_path(self.cmd, client, 'container', 'blob', self.file_path, max_connections=2,
+                                    resume=True)
+
+        self.assertEqual(client.put_offsets, [4])
+        self.assertEqual(client.committed, b'0123456789')
+
+    def test_upload_without_resume_uploads_all_blocks(self):
+        client = _FakeBlockBlobClient(fail_offsets=[4])
+        with self.assertRaises(CLIError):
+            upload_block_blob_from_path(self.cmd, client, 'container', 'blob', self.file_path, max_connections=2)
+
+        client.fail_offsets = set()
+        client.put_offsets = []
+        upload_block_blob_from_path(self.cmd, client, 'container', 'blob', self.file_path, max_connections=2)
+
+        self.assertEqual(sorted(client.put_offsets), [0, 4, 8])
+        self.assertEqual(client.committed, b'0123456789')
+
+    def test_changed_file_uploads_all_blocks(self):
+        client = _FakeBlockBlobClient(fail_offsets=[4])
+        with self.assertRaises(CLIError):
+            upload_block_blob_from_path(self.cmd, client, 'container', 'blob', self.file_path, max_connections=2,
+                                        resume=True)
+
+        with open(self.file_path, 'wb') as stream:
+            stream.write(b'abcdefghij')
+        file_stat = os.stat(self.file_path)
+        os.utime(self.file_path, (file_stat.st_atime, file_stat.st_mtime + 10))
+
+        client.fail_offsets = set()
+        client.put_offsets = []
+        upload_block_blob_from_path(self.cmd, client, 'container', 'blob', self.file_path, max_connections=2,
+                                    resume=True)
+
+        self.assertEqual(sorted(client.put_offsets), [0, 4, 8])
+        self.assertEqual(client.committed, b'abcdefghij')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from collections import defaultdict
+
+import mock
+
+from ..._client_factory import get_request_session, size_connection_pool, _get_connection_pool_size
+
+
+class TestRequestSession(unittest.TestCase):
+    def setUp(self):
+        self.cli_ctx = mock.MagicMock()
+        self.cli_ctx.data = defaultdict(lambda: None)
+
+    def _get_pool_size(self, session):
+        return session.get_adapter('https://').poolmanager.connection_pool_kw.get('maxsize')
+
+    def test_session_is_shared(self):
+        session = get_request_session(self.cli_ctx)
+        self.assertIs(get_request_session(self.cli_ctx), session)
+
+    def test_pool_only_grows(self):
+        session = get_request_session(self.cli_ctx)
+        client = mock.MagicMock()
+        client._httpclient.session = session  # pylint: disable=protected-access
+
+        size_connection_pool(client, 32)
+        self.assertEqual(self._get_pool_size(session), 32)
+        size_connection_pool(client, 4)
+        self.assertEqual(self._get_pool_size(session), 32)
+
+    def test_pool_size_follows_concurrency(self):
+        self.assertEqual(_get_connection_pool_size({}), 2)
+        self.assertEqual(_get_connection_pool_size({'max_connections': 12}), 24)
+        self.assertEqual(_get_connection_pool_size({'max_connections': 2, 'auto_tune': True}), 32)
+
+
+if __name__ == '__main__':
+    unittest.main()
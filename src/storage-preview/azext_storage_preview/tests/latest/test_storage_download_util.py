@@ -0,0 +1,133 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from azure.common import AzureHttpError
+from knack.util import CLIError
+
+from ...download_util import download_blob_to_path, download_file_to_path
+
+
+def _make_range(content, start, end, etag):
+    chunk = mock.MagicMock()
+    chunk.content = content[start:end + 1]
+    chunk.properties.content_length = len(chunk.content)
+    chunk.properties.content_range = 'bytes {}-{}/{}'.format(start, start + len(chunk.content) - 1, len(content))
+    chunk.properties.etag = etag
+    return chunk
+
+
+class _FakeBlobClient(object):
+    MAX_SINGLE_GET_SIZE = 4
+    MAX_CHUNK_GET_SIZE = 3
+
+    def __init__(self, content, etag='"etag"'):
+        self.content = content
+        self.etag = etag
+        self.requested_ranges = []
+
+    def get_blob_to_bytes(self, container_name, blob_name, start_range=None, end_range=None, if_match=None, **_):
+        self.requested_ranges.append((start_range, end_range, if_match))
+        if not self.content:
+            raise AzureHttpError('The range specified is invalid for the current size of the resource.', 416)
+        if if_match not in (None, self.etag):
+            raise AzureHttpError('The condition specified using HTTP conditional header(s) is not met.', 412)
+        return _make_range(self.content, start_range, end_range, self.etag)
+
+    def get_blob_to_path(self, container_name, blob_name, file_path, **_):
+        with open(file_path, 'wb'):
+            pass
+        return mock.MagicMock()
+
+
+class _FakeFileClient(object):
+    MAX_SINGLE_GET_SIZE = 4
+    MAX_CHUNK_GET_SIZE = 3
+
+    def __init__(self, content, etags=None):
+        self.content = content
+        self.etags = etags or {}
+        self.requested_ranges = []
+
+    def get_file_to_bytes(self, share_name, directory_name, file_name, start_range=None, end_range=None, **_):
+        self.requested_ranges.append((start_range, end_range))
+        return _make_range(self.content, start_range, end_range, self.etags.get(start_range, '"etag"'))
+
+
+class TestDownloadToPath(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_dir, 'blob')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _read_file(self):
+        with open(self.file_path, 'rb') as stream:
+            return stream.read()
+
+    def test_download_blob(self):
+        client = _FakeBlobClient(b'0123456789')
+        progress = []
+        blob = download_blob_to_path(client, 'container', 'blob', self.file_path, max_connections=3,
+                                     progress_callback=lambda current, total: progress.append((current, total)))
+
+        self.assertEqual(self._read_file(), b'0123456789')
+        self.assertEqual(sorted(client.requested_ranges), [(0, 3, None), (4, 6, '"etag"'), (7, 9, '"etag"')])
+        self.assertEqual(blob.properties.content_length, 10)
+        self.assertEqual(blob.properties.content_range, 'bytes 0-9/10')
+        self.assertEqual(progress[0], (4, 10))
+        self.assertEqual(progress[-1], (10, 10))
+
+    def test_download_blob_auto_tune(self):
+        client = _FakeBlobClient(b'0123456789' * 4)
+        download_blob_to_path(client, 'container', 'blob', self.file_path, max_connections=1, auto_tune=True)
+        self.assertEqual(self._read_file(), b'0123456789' * 4)
+
+    def test_download_small_blob(self):
+        client = _FakeBlobClient(b'01')
+        download_blob_to_path(client, 'container', 'blob', self.file_path)
+
+        self.assertEqual(self._read_file(), b'01')
+        self.assertEqual(client.requested_ranges, [(0, 3, None)])
+
+    def test_download_empty_blob(self):
+        client = _FakeBlobClient(b'')
+        download_blob_to_path(client, 'container', 'blob', self.file_path)
+        self.assertEqual(self._read_file(), b'')
+
+    def test_download_changed_blob_fails(self):
+        client = _FakeBlobClient(b'0123456789')
+        original = client.get_blob_to_bytes
+
+        def _get_blob_to_bytes(*args, **kwargs):
+            chunk = original(*args, **kwargs)
+            client.etag = '"changed"'
+            return chunk
+
+        client.get_blob_to_bytes = _get_blob_to_bytes
+        with self.assertRaises(CLIError):
+            download_blob_to_path(client, 'container', 'blob', self.file_path, max_connections=2)
+
+    def test_download_file(self):
+        client = _FakeFileClient(b'0123456789')
+        download_file_to_path(client, 'share', None, 'file', self.file_path, max_connections=2)
+
+        self.assertEqual(self._read_file(), b'0123456789')
+        self.assertEqual(sorted(client.requested_ranges), [(0, 3), (4, 6), (7, 9)])
+
+    def test_download_changed_file_fails(self):
+        client = _FakeFileClient(b'0123456789', etags={7: '"changed"'})
+        with self.assertRaises(CLIError):
+            download_file_to_path(client, 'share', None, 'file', self.file_path, max_connections=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+from azure.common import AzureHttpError
+from knack.util import CLIError
+
+from ...operations.file import (storage_file_upload_batch, storage_file_download_batch,
+                                _make_directories_in_files_share)
+from ...util import glob_files_remotely_with_size
+from ...vendored_sdks.azure_storage.v2018_03_28.file.models import ContentSettings, Directory, File, FileProperties
+
+# directory -> (files with their sizes, subdirectories)
+SHARE_TREE = {
+    '': ({'a.txt': 1, 'skip.log': 2}, ['x', 'w']),
+    'x': ({'b.txt': 3}, ['y']),
+    'x/y': ({'c.txt': 4, 'c.log': 5}, ['z']),
+    'x/y/z': ({'d.txt': 6}, []),
+    'w': ({'e.txt': 7}, [])
+}
+SHARE_TXT_FILES = [('', 'a.txt', 1), ('w', 'e.txt', 7), ('x', 'b.txt', 3), ('x/y', 'c.txt', 4), ('x/y/z', 'd.txt', 6)]
+
+
+class _FakeFileService(object):
+    MAX_RANGE_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, failing_files=None):
+        self.failing_files = failing_files or []
+        self.created_directories = []
+        self.uploaded_files = []
+        self._lock = threading.Lock()
+
+    def create_directory(self, share_name, directory_name, fail_on_exist=False):
+        parent = os.path.dirname(directory_name)
+        time.sleep(0.001)
+        with self._lock:
+            if parent and parent not in self.created_directories:
+                raise AzureHttpError('The specified parent path does not exist.', 404)
+            self.created_directories.append(directory_name)
+
+    def create_file_from_path(self, share_name, directory_name, file_name, local_file_path, **_):
+        with self._lock:
+            if directory_name and directory_name not in self.created_directories:
+                raise AzureHttpError('The specified parent path does not exist.', 404)
+        if file_name in self.failing_files:
+            raise AzureHttpError('The server encountered an internal error.', 500)
+        with self._lock:
+            self.uploaded_files.append('/'.join(p for p in [directory_name, file_name] if p))
+
+    @staticmethod
+    def make_file_url(share_name, directory_name, file_name):
+        return 'https://account.file.core.windows.net/{}/{}'.format(
+            share_name, '/'.join(p for p in [directory_name, file_name] if p))
+
+
+class TestMakeDirectoriesInFilesShare(unittest.TestCase):
+    def test_parents_before_children(self):
+        file_service = _FakeFileService()
+        _make_directories_in_files_share(file_service, 'share', ['a/b/c', 'a/b', 'a/d', 'e', ''], max_workers=4)
+
+        self.assertEqual(sorted(file_service.created_directories), ['a', 'a/b', 'a/b/c', 'a/d', 'e'])
+
+    def test_failure_to_create_directory(self):
+        file_service = _FakeFileService()
+        file_service.create_directory = mock.Mock(side_effect=AzureHttpError('Forbidden', 403))
+        with self.assertRaises(CLIError):
+            _make_directories_in_files_share(file_service, 'share', ['a'])
+
+
+class TestStorageFileUploadBatch(unittest.TestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        for name in ['a.txt', 'x/b.txt', 'x/y/c.txt', 'x/y/d.txt', 'z/e.txt']:
+            path = os.path.join(self.source, *name.split('/'))
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as stream:
+                stream.write(name)
+
+        self.cmd = mock.MagicMock()
+        self.cmd.get_models.return_value = ContentSettings
+        self.cmd.supported_api_version.return_value = True
+
+    def tearDown(self):
+        shutil.rmtree(self.source)
+
+    def test_upload_creates_each_directory_once(self):
+        file_service = _FakeFileService()
+        results = storage_file_upload_batch(self.cmd, file_service, 'share', self.source, destination_path='dest',
+                                            max_connections=4, content_settings=ContentSettings())
+
+        self.assertEqual(sorted(file_service.created_directories),
+                         ['dest', 'dest/x', 'dest/x/y', 'dest/z'])
+        self.assertEqual(sorted(file_service.uploaded_files),
+                         ['dest/a.txt', 'dest/x/b.txt', 'dest/x/y/c.txt', 'dest/x/y/d.txt', 'dest/z/e.txt'])
+        self.assertEqual(len(results), 5)
+
+    def test_upload_failures_are_collected(self):
+        file_service = _FakeFileService(failing_files=['b.txt', 'd.txt'])
+        with self.assertRaises(CLIError) as context:
+            storage_file_upload_batch(self.cmd, file_service, 'share', self.source, max_connections=4,
+                                      content_settings=ContentSettings())
+
+        self.assertEqual(sorted(file_service.uploaded_files), ['a.txt', 'x/y/c.txt', 'z/e.txt'])
+        message = str(context.exception)
+        self.assertTrue(message.startswith('2 of 5 file(s) failed to upload: '), message)
+        self.assertIn(os.path.join(self.source, 'x', 'b.txt'), message)
+        self.assertIn(os.path.join(self.source, 'x', 'y', 'd.txt'), message)
+
+
+class TestStorageFileDownloadBatch(unittest.TestCase):
+    def setUp(self):
+        self.destination = tempfile.mkdtemp()
+        self.cmd = mock.MagicMock()
+        self.cmd.get_models.return_value = (Directory, File)
+        self.cmd.supported_api_version.return_value = True
+
+        self.client = mock.MagicMock()
+        self.client.MAX_SINGLE_GET_SIZE = 32 * 1024 * 1024
+        self.client.list_directories_and_files.side_effect = self._list_directories_and_files
+        self.client.make_file_url.side_effect = lambda share, dir_name, file_name: (dir_name, file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.destination)
+
+    @staticmethod
+    def _list_directories_and_files(share_name, directory_name):
+        time.sleep(0.001)
+        files, dirs = SHARE_TREE[directory_name]
+        for name, size in sorted(files.items()):
+            props = FileProperties()
+            props.content_length = size
+            yield File(name, props=props)
+        for name in dirs:
+            yield Directory(name)
+
+    def test_glob_nested_directories(self):
+        for max_workers in [1, 4]:
+            files = list(glob_files_remotely_with_size(self.cmd, self.client, 'share', '*.txt', max_workers))
+            self.assertEqual(sorted(files), SHARE_TXT_FILES)
+
+        files = list(glob_files_remotely_with_size(self.cmd, self.client, 'share', 'x/y/*', 4))
+        self.assertEqual(sorted(files), [('x/y', 'c.log', 5), ('x/y', 'c.txt', 4), ('x/y/z', 'd.txt', 6)])
+
+    def test_download_nested_directories(self):
+        with mock.patch('azext_storage_preview.operations.file.download_file') as download_file:
+            results = storage_file_download_batch(self.cmd, self.client, 'share', self.destination, pattern='*.txt',
+                                                  max_connections=4)
+
+        self.assertEqual(sorted(results), [(d, f) for d, f, _ in SHARE_TXT_FILES])
+        self.assertEqual(sorted((c[1]['directory_name'], c[1]['file_name']) for c in download_file.call_args_list),
+                         [(d, f) for d, f, _ in SHARE_TXT_FILES])
+        self.assertTrue(os.path.isdir(os.path.join(self.destination, 'x', 'y', 'z')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from knack.util import CLIError
+
+from ...page_blob_util import (get_populated_ranges, get_changed_ranges, split_ranges, download_page_blob_sparse,
+                               download_page_blob_incremental)
+from ...vendored_sdks.azure_storage.v2018_03_28.blob.models import PageRange
+
+
+class _FakePageBlobClient(object):
+    MAX_CHUNK_GET_SIZE = 4
+
+    def __init__(self, content, page_ranges, blob_type='PageBlob', changed_ranges=None):
+        self.content = content
+        self.page_ranges = page_ranges
+        self.changed_ranges = changed_ranges or []
+        self.blob_type = blob_type
+        self.requested_ranges = []
+
+    def get_blob_properties(self, container_name, blob_name, **_):
+        blob = mock.MagicMock()
+        blob.name = blob_name
+        blob.properties.blob_type = self.blob_type
+        blob.properties.content_length = len(self.content)
+        blob.properties.etag = '"etag"'
+        return blob
+
+    def get_page_ranges(self, container_name, blob_name, start_range=None, end_range=None, **_):
+        return [PageRange(max(start, start_range), min(end, end_range)) for start, end in self.page_ranges
+                if start <= end_range and end >= start_range]
+
+    def get_page_ranges_diff(self, container_name, blob_name, previous_snapshot, start_range=None, end_range=None,
+                             **_):
+        return [PageRange(max(start, start_range), min(end, end_range), is_cleared)
+                for start, end, is_cleared in self.changed_ranges if start <= end_range and end >= start_range]
+
+    def get_blob_to_bytes(self, container_name, blob_name, start_range=None, end_range=None, **_):
+        self.requested_ranges.append((start_range, end_range))
+        chunk = mock.MagicMock()
+        chunk.content = self.content[start_range:end_range + 1]
+        return chunk
+
+
+class TestPageBlobUtil(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_dir, 'disk.vhd')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_get_populated_ranges_merges_segments(self):
+        client = _FakePageBlobClient(b'\0' * 32, [(0, 3), (4, 9), (16, 23)])
+        with mock.patch('azext_storage_preview.page_blob_util.PAGE_RANGES_SEGMENT_SIZE', 8):
+            ranges = get_populated_ranges(client, 'container', 'disk.vhd', 32, max_connections=3)
+        self.assertEqual(ranges, [(0, 9), (16, 23)])
+
+    def test_split_ranges(self):
+        self.assertEqual(list(split_ranges([(0, 9, False), (16, 19, True)], 4)),
+                         [(0, 3, False), (4, 7, False), (8, 9, False), (16, 19, True)])
+
+    def test_get_changed_ranges_merges_ranges_of_same_kind(self):
+        client = _FakePageBlobClient(b'\0' * 32, [], changed_ranges=[(0, 3, False), (4, 7, True), (8, 11, True),
+                                                                     (12, 15, False)])
+        ranges = get_changed_ranges(client, 'container', 'disk.vhd', 32, 'previous')
+        self.assertEqual(ranges, [(0, 3, False), (4, 11, True), (12, 15, False)])
+
+    def test_download_sparse(self):
+        content = b'0123' + b'\0' * 8 + b'456789' + b'\0' * 2
+        client = _FakePageBlobClient(content, [(0, 3), (12, 17)])
+        progress = []
+        download_page_blob_sparse(client, 'container', 'disk.vhd', self.file_path, max_connections=2,
+                                  progress_callback=lambda current, total: progress.append((current, total)))
+
+        with open(self.file_path, 'rb') as stream:
+            self.assertEqual(stream.read(), content)
+        self.assertEqual(sorted(client.requested_ranges), [(0, 3), (12, 15), (16, 17)])
+        self.assertEqual(progress[-1], (10, 10))
+
+    def test_download_sparse_requires_page_blob(self):
+        client = _FakePageBlobClient(b'0123', [], blob_type='BlockBlob')
+        with self.assertRaises(CLIError):
+            download_page_blob_sparse(client, 'container', 'blob', self.file_path)
+
+    def test_download_incremental(self):
+        with open(self.file_path, 'wb') as stream:
+            stream.write(b'aaaabbbbccccdddd')
+
+        content = b'eeee' + b'\0' * 8 + b'ffffgggg'
+        client = _FakePageBlobClient(content, [], changed_ranges=[(0, 3, False), (4, 11, True), (16, 19, False)])
+        download_page_blob_incremental(client, 'container', 'disk.vhd', self.file_path, 'previous', max_connections=2)
+
+        with open(self.file_path, 'rb') as stream:
+            self.assertEqual(stream.read(), b'eeee' + b'\0' * 8 + b'ddddgggg')
+        self.assertEqual(sorted(client.requested_ranges), [(0, 3), (16, 19)])
+
+    def test_download_incremental_requires_local_file(self):
+        client = _FakePageBlobClient(b'0123', [])
+        with self.assertRaises(CLIError):
+            download_page_blob_incremental(client, 'container', 'disk.vhd', self.file_path, 'previous')
+
+
+if __name__ == '__main__':
+    unittest.main()
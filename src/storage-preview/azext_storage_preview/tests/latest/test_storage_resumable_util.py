@@ -0,0 +1,159 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from knack.util import CLIError
+
+from ...resumable_util import (DownloadJournal, download_blob_resumable, DOWNLOAD_JOURNAL_SUFFIX,
+                               DOWNLOAD_JOURNAL_SYNC_CHUNKS)
+
+
+class _FakeBlobClient(object):
+    MAX_CHUNK_GET_SIZE = 4
+
+    def __init__(self, content, etag='"etag"', fail_offsets=None):
+        self.content = content
+        self.etag = etag
+        self.fail_offsets = set(fail_offsets or [])
+        self.requested_offsets = []
+
+    def get_blob_properties(self, container_name, blob_name, **_):
+        blob = mock.MagicMock()
+        blob.name = blob_name
+        blob.properties.content_length = len(self.content)
+        blob.properties.etag = self.etag
+        return blob
+
+    def get_blob_to_bytes(self, container_name, blob_name, start_range=None, end_range=None, if_match=None, **_):
+        self.requested_offsets.append(start_range)
+        if start_range in self.fail_offsets or if_match != self.etag:
+            raise Exception('connection reset')
+        chunk = mock.MagicMock()
+        chunk.content = self.content[start_range:end_range + 1]
+        return chunk
+
+
+class TestDownloadJournal(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_dir, 'blob')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_record_and_load(self):
+        journal = DownloadJournal(self.file_path, '"etag"', 10, 4)
+        self.assertIsNone(journal.load())
+        journal.start(resumed=False)
+        journal.record(0)
+        journal.record(8)
+        journal.close()
+
+        self.assertEqual(DownloadJournal(self.file_path, '"etag"', 10, 4).load(), {0, 8})
+        self.assertIsNone(DownloadJournal(self.file_path, '"changed"', 10, 4).load())
+        self.assertIsNone(DownloadJournal(self.file_path, '"etag"', 10, 8).load())
+
+    def test_incomplete_line_is_ignored(self):
+        journal = DownloadJournal(self.file_path, '"etag"', 10, 4)
+        journal.start(resumed=False)
+        journal.record(0)
+        journal.close()
+        with open(journal.path, 'a') as stream:
+            stream.write('4')
+
+        self.assertEqual(journal.load(), {0, 4})
+        with open(journal.path, 'a') as stream:
+            stream.write('x')
+        self.assertEqual(journal.load(), {0})
+
+    def test_data_is_synced_before_recording(self):
+        journal = DownloadJournal(self.file_path, '"etag"', 100, 1)
+        # the chunks recorded in the journal when the data is synced
+        synced = []
+
+        def _sync_data():
+            synced.append(journal.load())
+
+        journal.start(resumed=False, sync_data=_sync_data)
+        for offset in range(DOWNLOAD_JOURNAL_SYNC_CHUNKS - 1):
+            journal.record(offset)
+        self.assertEqual(synced, [])
+        self.assertEqual(journal.load(), set())
+
+        journal.record(DOWNLOAD_JOURNAL_SYNC_CHUNKS - 1)
+        self.assertEqual(synced, [set()])
+        self.assertEqual(journal.load(), set(range(DOWNLOAD_JOURNAL_SYNC_CHUNKS)))
+
+        # an interrupted download records the pending chunks when the journal is closed
+        journal.record(DOWNLOAD_JOURNAL_SYNC_CHUNKS)
+        journal.close()
+        self.assertEqual(synced, [set(), set(range(DOWNLOAD_JOURNAL_SYNC_CHUNKS))])
+        self.assertEqual(journal.load(), set(range(DOWNLOAD_JOURNAL_SYNC_CHUNKS + 1)))
+
+    def test_close_completed_removes_journal(self):
+        journal = DownloadJournal(self.file_path, '"etag"', 10, 4)
+        journal.start(resumed=False)
+        journal.close(completed=True)
+        self.assertFalse(os.path.exists(journal.path))
+
+
+class TestDownloadBlobResumable(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_dir, 'blob')
+        self.journal_path = self.file_path + DOWNLOAD_JOURNAL_SUFFIX
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _read_file(self):
+        with open(self.file_path, 'rb') as stream:
+            return stream.read()
+
+    def test_download(self):
+        client = _FakeBlobClient(b'0123456789')
+        progress = []
+        download_blob_resumable(client, 'container', 'blob', self.file_path, max_connections=3,
+                                progress_callback=lambda current, total: progress.append((current, total)))
+
+        self.assertEqual(self._read_file(), b'0123456789')
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertEqual(sorted(client.requested_offsets), [0, 4, 8])
+        self.assertEqual(progress[0], (0, 10))
+        self.assertEqual(progress[-1], (10, 10))
+
+    def test_resume_downloads_missing_chunks(self):
+        client = _FakeBlobClient(b'0123456789', fail_offsets=[4])
+        with self.assertRaises(CLIError):
+            download_blob_resumable(client, 'container', 'blob', self.file_path, max_connections=2)
+        self.assertTrue(os.path.exists(self.journal_path))
+
+        client.fail_offsets = set()
+        client.requested_offsets = []
+        download_blob_resumable(client, 'container', 'blob', self.file_path, max_connections=2)
+
+        self.assertEqual(client.requested_offsets, [4])
+        self.assertEqual(self._read_file(), b'0123456789')
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_changed_blob_restarts_download(self):
+        client = _FakeBlobClient(b'0123456789', fail_offsets=[4])
+        with self.assertRaises(CLIError):
+            download_blob_resumable(client, 'container', 'blob', self.file_path, max_connections=2)
+
+        client = _FakeBlobClient(b'abcdefghij', etag='"changed"')
+        download_blob_resumable(client, 'container', 'blob', self.file_path, max_connections=2)
+
+        self.assertEqual(sorted(client.requested_offsets), [0, 4, 8])
+        self.assertEqual(self._read_file(), b'abcdefghij')
+
+
+if __name__ == '__main__':
+    unittest.main()
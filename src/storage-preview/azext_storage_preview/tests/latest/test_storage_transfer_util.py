@@ -0,0 +1,256 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import functools
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+
+from ...transfer_util import (ConnectionBudget, AdaptiveConcurrency, TransferTuner, BatchProgress,
+                               PositionalFileReader, PositionalFileWriter, run_batch, run_chunks)
+
+
+class TestConnectionBudget(unittest.TestCase):
+    def test_reserve_is_capped_by_size(self):
+        budget = ConnectionBudget(4)
+        with budget.reserve(10) as connections:
+            self.assertEqual(connections, 4)
+        with budget.reserve(0) as connections:
+            self.assertEqual(connections, 1)
+
+    def test_reservations_never_exceed_size(self):
+        budget = ConnectionBudget(3)
+        lock = threading.Lock()
+        in_use = [0, 0]  # current, peak
+
+        def _transfer(count):
+            with budget.reserve(count) as connections:
+                with lock:
+                    in_use[0] += connections
+                    in_use[1] = max(in_use[1], in_use[0])
+                time.sleep(0.01)
+                with lock:
+                    in_use[0] -= connections
+
+        threads = [threading.Thread(target=_transfer, args=(i % 3 + 1,)) for i in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(in_use[0], 0)
+        self.assertLessEqual(in_use[1], 3)
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    def test_limit_grows_on_success(self):
+        concurrency = AdaptiveConcurrency(2, 3)
+        for _ in range(2):
+            with concurrency.slot():
+                pass
+        self.assertEqual(concurrency.limit, 3)
+        for _ in range(10):
+            with concurrency.slot():
+                pass
+        self.assertEqual(concurrency.limit, 3)
+
+    def test_limit_backs_off_on_throttling(self):
+        concurrency = AdaptiveConcurrency(8, 8, cooldown=60)
+        concurrency.report_throttling()
+        concurrency.report_throttling()
+        self.assertEqual(concurrency.limit, 4)
+        self.assertEqual(concurrency.throttled_count, 2)
+
+        concurrency = AdaptiveConcurrency(1, 8, cooldown=0)
+        concurrency.report_throttling()
+        self.assertEqual(concurrency.limit, 1)
+
+    def test_failures_do_not_grow_limit(self):
+        concurrency = AdaptiveConcurrency(1, 4)
+        with self.assertRaises(ValueError):
+            with concurrency.slot():
+                raise ValueError()
+        self.assertEqual(concurrency.limit, 1)
+
+
+class TestTransferTuner(unittest.TestCase):
+    @staticmethod
+    def _record_round(tuner, count, size, seconds, concurrent):
+        for i in range(count):
+            started = 100 + (i // concurrent) * seconds
+            tuner.record(size, started, started + seconds)
+
+    def test_connections_grow_while_throughput_increases(self):
+        tuner = TransferTuner('blob', 4, 32, 2, 8)
+        self._record_round(tuner, 4, 4, 1, 2)
+        self.assertEqual((tuner.chunk_size, tuner.connections), (8, 4))
+        self._record_round(tuner, 8, 8, 1, 4)
+        self.assertEqual((tuner.chunk_size, tuner.connections), (16, 8))
+
+        # doubling the connections again does not increase the throughput
+        self._record_round(tuner, 16, 16, 4, 8)
+        self.assertEqual((tuner.chunk_size, tuner.connections), (8, 4))
+        self.assertFalse(tuner.tuning)
+
+        self._record_round(tuner, 8, 8, 10, 4)
+        self.assertEqual((tuner.chunk_size, tuner.connections), (8, 4))
+
+    def test_limits(self):
+        tuner = TransferTuner('blob', 4, 8, 1, 1)
+        self._record_round(tuner, 2, 4, 0.1, 1)
+        self.assertEqual((tuner.chunk_size, tuner.connections), (8, 1))
+        self.assertFalse(tuner.tuning)
+
+
+class TestRunChunks(unittest.TestCase):
+    def test_fixed_chunks(self):
+        ranges = []
+        failures = run_chunks(lambda offset, end: ranges.append((offset, end)), 2, 10, 3, 2)
+        self.assertEqual(sorted(ranges), [(2, 4), (5, 7), (8, 9)])
+        self.assertEqual(failures, [])
+
+    def test_tuned_chunks(self):
+        ranges = []
+
+        def _action(offset, end):
+            ranges.append((offset, end))
+            if offset == 0:
+                raise ValueError('bad chunk')
+
+        # a clock ticking once per reading
+        tuner = TransferTuner('blob', 2, 6, 1, 4, clock=functools.partial(next, itertools.count()))
+        failures = run_chunks(_action, 0, 40, 2, 1, tuner)
+
+        ranges.sort()
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], 39)
+        self.assertTrue(all(previous[1] + 1 == current[0] for previous, current in zip(ranges, ranges[1:])))
+        self.assertTrue(any(end - offset + 1 > 2 for offset, end in ranges))
+        self.assertEqual([chunk_range for chunk_range, _ in failures], [(0, 1)])
+
+
+class TestBatchProgress(unittest.TestCase):
+    def test_aggregate_progress(self):
+        reports = []
+        progress = BatchProgress(lambda current, total: reports.append((current, total)), 30)
+        first, second = progress.callback_for('a'), progress.callback_for('b')
+        first(0, 10)
+        second(10, 20)
+        first(10, 10)
+        second(20, 20)
+        self.assertEqual(reports, [(0, 30), (10, 30), (20, 30), (30, 30)])
+
+    def test_no_progress_callback(self):
+        self.assertIsNone(BatchProgress(None).callback_for('a'))
+
+
+class TestPositionalFileReader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_dir, 'file')
+        with open(self.file_path, 'wb') as stream:
+            stream.write(b'0123456789')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _assert_reads(self, reader):
+        self.assertEqual(reader.read(2, 3), b'234')
+        self.assertEqual(reader.read(8, 4), b'89')
+        self.assertEqual(reader.read(10, 4), b'')
+        results = list(run_batch(lambda offset: reader.read(offset, 2), range(0, 10, 2), 4))
+        self.assertEqual(b''.join(result for _, result, _ in results), b'0123456789')
+
+    def test_read(self):
+        with PositionalFileReader(self.file_path) as reader:
+            self._assert_reads(reader)
+
+    def test_read_without_pread(self):
+        with mock.patch('azext_storage_preview.transfer_util.os', mock.Mock(wraps=os, spec=['open', 'close'])):
+            reader = PositionalFileReader(self.file_path)
+        with reader:
+            self._assert_reads(reader)
+
+
+class TestPositionalFileWriter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_dir, 'file')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _read_file(self):
+        with open(self.file_path, 'rb') as stream:
+            return stream.read()
+
+    def _write_chunks(self, writer):
+        list(run_batch(lambda offset: writer.write(offset, b'0123456789'[offset:offset + 2]), range(0, 10, 2), 4))
+
+    def test_write(self):
+        with open(self.file_path, 'wb') as stream:
+            stream.write(b'previous content')
+
+        with PositionalFileWriter(self.file_path, 10) as writer:
+            self.assertEqual(os.path.getsize(self.file_path), 10)
+            self._write_chunks(writer)
+        self.assertEqual(self._read_file(), b'0123456789')
+
+    def test_resume_keeps_content(self):
+        with open(self.file_path, 'wb') as stream:
+            stream.write(b'abcdefghij')
+
+        with PositionalFileWriter(self.file_path, 10, resume=True) as writer:
+            writer.write(4, b'45')
+        self.assertEqual(self._read_file(), b'abcd45ghij')
+
+    def test_write_without_pwrite(self):
+        with mock.patch('azext_storage_preview.transfer_util.os', mock.Mock(wraps=os, spec=['open', 'close'])):
+            writer = PositionalFileWriter(self.file_path, 10, preallocate=False)
+        with writer:
+            self._write_chunks(writer)
+        self.assertEqual(self._read_file(), b'0123456789')
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_ordered_results_and_failures(self):
+        def _action(item):
+            time.sleep(0.001 * (10 - item))
+            if item == 3:
+                raise ValueError('bad item')
+            return item * 2
+
+        outcomes = list(run_batch(_action, range(10), 4))
+        self.assertEqual([item for item, _, _ in outcomes], list(range(10)))
+        self.assertEqual([result for item, result, _ in outcomes if item != 3], [i * 2 for i in range(10) if i != 3])
+        self.assertIsInstance(outcomes[3][2], ValueError)
+
+    def test_unordered_results(self):
+        outcomes = list(run_batch(lambda item: item, iter(range(20)), 3, ordered=False))
+        self.assertEqual(sorted(item for item, _, _ in outcomes), list(range(20)))
+        self.assertTrue(all(error is None for _, _, error in outcomes))
+
+    def test_items_are_consumed_lazily(self):
+        consumed = []
+
+        def _items():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        batch = run_batch(lambda item: item, _items(), 2)
+        next(batch)
+        self.assertLessEqual(len(consumed), 5)
+        batch.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from fnmatch import fnmatch
+
+import mock
+
+from ...util import collect_blobs, _get_pattern_prefix, compile_pattern
+
+
+class TestStorageUtil(unittest.TestCase):
+    def test_get_pattern_prefix(self):
+        with mock.patch('os.path.normcase', lambda path: path):
+            self.assertEqual(_get_pattern_prefix('logs/2018/10/*'), 'logs/2018/10/')
+            self.assertEqual(_get_pattern_prefix('logs/201?/[0-9]*'), 'logs/201')
+            self.assertEqual(_get_pattern_prefix('*.txt'), '')
+            self.assertEqual(_get_pattern_prefix(None), '')
+
+        with mock.patch('os.path.normcase', lambda path: path.lower()):
+            self.assertEqual(_get_pattern_prefix('logs/*'), '')
+
+    def test_compile_pattern(self):
+        paths = ['logs/2018/10/a.txt', 'logs/2018/11/b.log', 'logs/x', 'a[b]c', '']
+        for pattern in ['logs/*', '*.txt', 'logs/2018/1[!1]/*', 'a[[]b]c', '?']:
+            match_path = compile_pattern(pattern)
+            for path in paths:
+                self.assertEqual(match_path(path), fnmatch(path, pattern), (path, pattern))
+        self.assertTrue(compile_pattern(None)('anything'))
+
+    def test_collect_blobs_pushes_prefix_down(self):
+        blobs = []
+        for name in ['logs/2018/10/a.txt', 'logs/2018/10/sub/b.log']:
+            blob = mock.Mock()
+            blob.name = name
+            blobs.append(blob)
+        blob_service = mock.Mock()
+        blob_service.list_blobs.return_value = iter(blobs)
+
+        with mock.patch('os.path.normcase', lambda path: path):
+            result = collect_blobs(blob_service, 'container', 'logs/2018/10/*.txt')
+            blob_service.list_blobs.assert_not_called()
+            self.assertEqual(list(result), ['logs/2018/10/a.txt'])
+        blob_service.list_blobs.assert_called_once_with('container', prefix='logs/2018/10/')
+
+
+if __name__ == '__main__':
+    unittest.main()
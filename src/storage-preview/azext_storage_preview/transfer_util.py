@@ -0,0 +1,487 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Tools to run the transfers of batch commands concurrently.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+# the upper bound of the connections of an auto-tuned transfer, whatever the initial number of connections
+AUTO_TUNE_MAX_CONNECTIONS = 16
+# auto-tuned chunks are sized to take about this long on one connection, so that the round trip of every request is
+# amortized on fast links
+AUTO_TUNE_TARGET_CHUNK_SECONDS = 2.0
+# the minimum throughput increase for doubling the connections of an auto-tuned transfer to pay off
+AUTO_TUNE_MIN_GAIN = 0.1
+
+
+class ConnectionBudget(object):
+    """
+    The connections shared by all the transfers of a batch command.
+
+    Every transfer reserves the connections it uses for its duration: one for a single-shot transfer, more for a
+    chunked transfer. This way the concurrent transfers of different files and the concurrent chunks of a single file
+    never open more connections than the budget altogether. Reservations are granted in the order they are requested,
+    so a large file waiting for many connections is not starved by a stream of small files.
+    """
+
+    def __init__(self, size):
+        self.size = max(1, size or 1)
+        self._available = self.size
+        self._condition = threading.Condition()
+        self._next_ticket = 0
+        self._serving_ticket = 0
+
+    @contextmanager
+    def reserve(self, count=1):
+        """Reserve up to count connections, yield the number of connections reserved."""
+        count = max(1, min(count, self.size))
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while ticket != self._serving_ticket or self._available < count:
+                self._condition.wait()
+            self._serving_ticket += 1
+            self._available -= count
+            self._condition.notify_all()
+
+        try:
+            yield count
+        finally:
+            with self._condition:
+                self._available += count
+                self._condition.notify_all()
+
+
+class AdaptiveConcurrency(object):
+    """
+    A limit on the number of concurrent operations which backs off when the service throttles the requests.
+
+    The limit is halved when a throttling response is reported (at most once per cooldown period, since the
+    operations in flight at that time are likely throttled as well) and grows by one after as many operations
+    as the current limit succeed in a row. This is an additive-increase, multiplicative-decrease scheme.
+    """
+
+    def __init__(self, initial, maximum, cooldown=1.0):
+        self.maximum = max(1, maximum)
+        self.limit = max(1, min(initial, self.maximum))
+        self.throttled_count = 0
+        self._cooldown = cooldown
+        self._last_decrease = None
+        self._active = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Wait until the operation is allowed to run under the current limit."""
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            with self._condition:
+                self._active -= 1
+                if succeeded:
+                    self._successes += 1
+                    if self._successes >= self.limit and self.limit < self.maximum:
+                        self.limit += 1
+                        self._successes = 0
+                self._condition.notify_all()
+
+    def report_throttling(self):
+        """Report a throttling response from the service."""
+        with self._condition:
+            self.throttled_count += 1
+            self._successes = 0
+            now = time.time()
+            if self._last_decrease is None or now - self._last_decrease >= self._cooldown:
+                self.limit = max(1, self.limit // 2)
+                self._last_decrease = now
+
+
+class TransferTuner(object):
+    """
+    Tune the chunk size and the number of connections of a chunked transfer from the throughput of its first chunks.
+
+    The chunks are measured in rounds of twice as many chunks as connections. After every round, the chunk size is
+    set so that a chunk takes about AUTO_TUNE_TARGET_CHUNK_SECONDS at the median throughput of a connection, between
+    the initial and the maximum chunk size, and the connections are doubled as long as doubling them increased the
+    throughput of the round by at least AUTO_TUNE_MIN_GAIN. Once they stop paying off, the connections of the best
+    round are kept and the tuning ends. The chosen parameters are logged at the debug level.
+    """
+
+    def __init__(self, name, chunk_size, max_chunk_size, connections, max_connections, clock=time.time):
+        self.name = name
+        self.chunk_size = chunk_size
+        self.max_connections = max(1, max_connections)
+        self.connections = max(1, min(connections, self.max_connections))
+        self.tuning = True
+        self.clock = clock
+        self._min_chunk_size = chunk_size
+        self._max_chunk_size = max(chunk_size, max_chunk_size)
+        self._best = None
+        self._round = []
+        self._active = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Wait until a chunk is allowed to run under the current number of connections."""
+        with self._condition:
+            while self._active >= self.connections:
+                self._condition.wait()
+            self._active += 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def record(self, size, started, ended):
+        """Record a chunk of size bytes transferred between the started and ended times."""
+        with self._condition:
+            if not self.tuning:
+                return
+            self._round.append((size, started, ended))
+            if len(self._round) >= 2 * self.connections:
+                self._tune()
+                self._round = []
+                self._condition.notify_all()
+
+    def _tune(self):
+        elapsed = max(ended for _, _, ended in self._round) - min(started for _, started, _ in self._round)
+        throughput = sum(size for size, _, _ in self._round) / max(elapsed, 1e-6)
+        rates = sorted(size / max(ended - started, 1e-6) for size, started, ended in self._round)
+        connection_throughput = rates[len(rates) // 2]
+
+        target_chunk_size = int(connection_throughput * AUTO_TUNE_TARGET_CHUNK_SECONDS)
+        target_chunk_size -= target_chunk_size % self._min_chunk_size
+        self.chunk_size = max(self._min_chunk_size, min(self._max_chunk_size, target_chunk_size))
+
+        round_connections = self.connections
+        if self._best is None or throughput >= self._best[0] * (1 + AUTO_TUNE_MIN_GAIN):
+            self._best = (throughput, self.connections)
+            if self.connections < self.max_connections:
+                self.connections = min(self.max_connections, 2 * self.connections)
+            else:
+                self.tuning = False
+        else:
+            self.connections = self._best[1]
+            self.tuning = False
+
+        logger.debug('auto-tune %s: %.1f MiB/s with %d connection(s), %s with %d connection(s) and %d byte chunks',
+                     self.name, throughput / (1024 * 1024), round_connections,
+                     'continuing' if self.tuning else 'tuned', self.connections, self.chunk_size)
+
+
+class BatchProgress(object):
+    """
+    Aggregate the progress of the transfers of a batch command into the progress callback of the command.
+
+    Every transfer reports its own progress through the callback returned by callback_for(), which is translated to
+    the progress of the whole batch.
+    """
+
+    def __init__(self, progress_callback, total=0):
+        self._progress_callback = progress_callback
+        self._lock = threading.Lock()
+        self._total = total
+        self._current = 0
+        self._item_progress = {}
+
+    def add_total(self, total):
+        """Add the size of the transfers discovered after the batch has started."""
+        with self._lock:
+            self._total += total
+
+    def callback_for(self, key):
+        """Get the progress callback of a single transfer identified by key."""
+        if not self._progress_callback:
+            return None
+
+        def _update_progress(current, _):
+            with self._lock:
+                self._current += current - self._item_progress.get(key, 0)
+                self._item_progress[key] = current
+                self._progress_callback(self._current, self._total)
+
+        return _update_progress
+
+
+class PositionalFileReader(object):
+    """
+    Read ranges of a local file from multiple threads without a shared lock.
+
+    Ranges are read with positional reads (os.pread) where the platform supports them, so the threads share a single
+    file descriptor without moving a shared file position. Otherwise every thread reads from its own file handle.
+    """
+
+    def __init__(self, file_path):
+        self._file_path = file_path
+        self._fd = os.open(file_path, os.O_RDONLY) if hasattr(os, 'pread') else None
+        self._local = threading.local()
+        self._streams = []
+        self._streams_lock = threading.Lock()
+
+    def read(self, offset, size):
+        """Read up to size bytes at offset. Fewer bytes are returned only at the end of the file."""
+        if self._fd is None:
+            stream = self._get_thread_stream()
+            stream.seek(offset)
+            return stream.read(size)
+
+        # positional reads may return fewer bytes than requested before the end of the file
+        chunks = []
+        while size > 0:
+            data = os.pread(self._fd, size, offset)
+            if not data:
+                break
+            chunks.append(data)
+            offset += len(data)
+            size -= len(data)
+        return b''.join(chunks)
+
+    def _get_thread_stream(self):
+        stream = getattr(self._local, 'stream', None)
+        if stream is None:
+            stream = open(self._file_path, 'rb')
+            self._local.stream = stream
+            with self._streams_lock:
+                self._streams.append(stream)
+        return stream
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        with self._streams_lock:
+            for stream in self._streams:
+                stream.close()
+            self._streams = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class PositionalFileWriter(object):
+    """
+    Write ranges of a local file from multiple threads without a shared lock.
+
+    Ranges are written with positional writes (os.pwrite) where the platform supports them, so the threads share a
+    single file descriptor without moving a shared file position. Otherwise every thread writes to its own file
+    handle.
+
+    Unless the file is opened to resume writing it, it is created with the given size. If preallocate is True, the
+    space of the file is allocated upfront where the file system supports it, which avoids fragmenting large files
+    written out of order. Otherwise the ranges never written are left as holes.
+    """
+
+    def __init__(self, file_path, size, resume=False, preallocate=True):
+        self._file_path = file_path
+        self._local = threading.local()
+        self._streams = []
+        self._streams_lock = threading.Lock()
+
+        if not resume:
+            with open(file_path, 'wb') as stream:
+                stream.truncate(size)
+                if preallocate and size and hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(stream.fileno(), 0, size)
+                    except OSError:
+                        # not supported by the file system, the file is allocated as it is written
+                        pass
+        self._fd = os.open(file_path, os.O_WRONLY) if hasattr(os, 'pwrite') else None
+
+    def write(self, offset, data):
+        if self._fd is None:
+            stream = self._get_thread_stream()
+            stream.seek(offset)
+            stream.write(data)
+            stream.flush()
+            return
+
+        # positional writes may write fewer bytes than requested
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(self._fd, view, offset)
+            view = view[written:]
+            offset += written
+
+    def sync(self):
+        """Sync the ranges written so far to disk."""
+        if self._fd is not None:
+            os.fsync(self._fd)
+        with self._streams_lock:
+            for stream in self._streams:
+                os.fsync(stream.fileno())
+
+    def _get_thread_stream(self):
+        stream = getattr(self._local, 'stream', None)
+        if stream is None:
+            stream = open(self._file_path, 'r+b')
+            self._local.stream = stream
+            with self._streams_lock:
+                self._streams.append(stream)
+        return stream
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        with self._streams_lock:
+            for stream in self._streams:
+                stream.close()
+            self._streams = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def get_file_size(file_path):
+    """Get the size of a local file, or 0 if it cannot be accessed. The error is left to the transfer to report."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def get_download_connections(service, size, max_connections):
+    """
+    Get the number of connections a blob or file download uses. The service downloads the first MAX_SINGLE_GET_SIZE
+    bytes in a single request and the rest in chunks of MAX_CHUNK_GET_SIZE bytes, one connection per chunk.
+    """
+    if size is None:
+        return max_connections
+
+    first_get_size = getattr(service, 'MAX_SINGLE_GET_SIZE', 0)
+    chunk_size = getattr(service, 'MAX_CHUNK_GET_SIZE', 0)
+    if size <= first_get_size or not chunk_size:
+        return 1
+    return max(1, min(max_connections, (size - first_get_size + chunk_size - 1) // chunk_size))
+
+
+def run_batch(action, items, max_workers, ordered=True):
+    """
+    Run the action on every item with a pool of at most max_workers threads.
+
+    The items are consumed lazily and at most twice as many items as workers are in flight, so items can be produced
+    by a generator (e.g. a paged listing) while the action is running on the previous ones.
+
+    A failed action does not stop the batch. Yields a tuple (item, result, error) for every item, where error is the
+    exception raised by the action or None. The tuples are yielded in the order of the items if ordered is True,
+    or as soon as the actions complete otherwise.
+    """
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+    def _get_outcome(item, future):
+        try:
+            return item, future.result(), None
+        except Exception as ex:  # pylint: disable=broad-except
+            return item, None, ex
+
+    max_workers = max(1, max_workers or 1)
+    max_pending = 2 * max_workers
+    pending = deque()
+
+    def _drain(count):
+        if ordered:
+            for _ in range(count):
+                item, future = pending.popleft()
+                yield _get_outcome(item, future)
+        else:
+            done, _ = wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+            for item, future in [p for p in pending if p[1] in done]:
+                pending.remove((item, future))
+                yield _get_outcome(item, future)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for item in items:
+            pending.append((item, executor.submit(action, item)))
+            if len(pending) >= max_pending:
+                for outcome in _drain(1):
+                    yield outcome
+
+        while pending:
+            for outcome in _drain(len(pending) if ordered else 1):
+                yield outcome
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def run_chunks(action, start, size, chunk_size, max_connections, tuner=None):
+    """
+    Run action(offset, end) on the consecutive chunks of the range from start to size of a transfer concurrently,
+    where end is inclusive. Get the ((offset, end), error) tuples of the chunks which failed.
+
+    The chunks are chunk_size bytes long and run on max_connections threads, unless a TransferTuner is given. Then
+    every chunk is cut when a connection is available for it, so that it gets the chunk size tuned so far, and the
+    tuner measures it.
+    """
+    if tuner is None:
+        ranges = [(offset, min(offset + chunk_size, size) - 1) for offset in range(start, size, chunk_size)]
+        return [(chunk_range, error) for chunk_range, _, error
+                in run_batch(lambda chunk_range: action(*chunk_range), ranges, max_connections, ordered=False)
+                if error]
+
+    cursor = {'offset': start}
+    cursor_lock = threading.Lock()
+    failures = []
+
+    def _next_range():
+        with cursor_lock:
+            offset = cursor['offset']
+            if offset >= size:
+                return None
+            cursor['offset'] = min(offset + tuner.chunk_size, size)
+            return offset, cursor['offset'] - 1
+
+    def _run_chunk(_):
+        with tuner.slot():
+            chunk_range = _next_range()
+            if chunk_range is None:
+                return
+            started = tuner.clock()
+            try:
+                action(*chunk_range)
+            except Exception as ex:  # pylint: disable=broad-except
+                failures.append((chunk_range, ex))
+            else:
+                tuner.record(chunk_range[1] - chunk_range[0] + 1, started, tuner.clock())
+
+    def _tickets():
+        # a ticket runs the next chunk, or nothing if the tickets in flight have already covered the range
+        while cursor['offset'] < size:
+            yield None
+
+    for _ in run_batch(_run_chunk, _tickets(), tuner.max_connections, ordered=False):
+        pass
+    return failures
@@ -10,6 +10,24 @@ import os
 def collect_blobs(blob_service, container, pattern=None):
     """
     List the blobs in the given blob container, filter the blob by comparing their path to the given pattern.
+    Yields the blob names as the pages of the listing are retrieved.
+    """
+    for blob_name, _ in iter_blobs_with_size(blob_service, container, pattern):
+        yield blob_name
+
+
+def collect_blobs_with_size(blob_service, container, pattern=None):
+    """
+    List the blobs in the given blob container, filter the blob by comparing their path to the given pattern.
+    Returns a list of tuple (name, size).
+    """
+    return list(iter_blobs_with_size(blob_service, container, pattern))
+
+
+def iter_blobs_with_size(blob_service, container, pattern=None):
+    """
+    List the blobs in the given blob container, filter the blob by comparing their path to the given pattern.
+    Yields a tuple (name, size) for every blob as the pages of the listing are retrieved.
     """
     if not blob_service:
         raise ValueError('missing parameter blob_service')
@@ -18,19 +36,25 @@ def collect_blobs(blob_service, container, pattern=None):
         raise ValueError('missing parameter container')
 
     if not _pattern_has_wildcards(pattern):
-        return [pattern] if blob_service.exists(container, pattern) else []
-
-    results = []
-    for blob in blob_service.list_blobs(container):
+        from azure.common import AzureMissingResourceHttpError
+        try:
+            blob = blob_service.get_blob_properties(container, pattern)
+        except AzureMissingResourceHttpError:
+            return
+        yield pattern, blob.properties.content_length
+        return
+
+    # only list the blobs whose names start with the literal part of the pattern
+    prefix = _get_pattern_prefix(pattern)
+    match_path = compile_pattern(pattern)
+    for blob in blob_service.list_blobs(container, prefix=prefix or None):
         try:
             blob_name = blob.name.encode('utf-8') if isinstance(blob.name, unicode) else blob.name
         except NameError:
             blob_name = blob.name
 
-        if not pattern or _match_path(blob_name, pattern):
-            results.append(blob_name)
-
-    return results
+        if match_path(blob_name):
+            yield blob_name, blob.properties.content_length
 
 
 def collect_files(cmd, file_service, share, pattern=None):
@@ -57,6 +81,23 @@ def create_blob_service_from_storage_client(cmd, client):
                             sas_token=client.sas_token)
 
 
+def create_page_blob_service_from_storage_client(cmd, client):
+    """Get a page blob service with the credentials, endpoints and HTTP session of a blob service client."""
+    t_page_blob_svc = cmd.get_models('blob#PageBlobService')
+    if isinstance(client, t_page_blob_svc):
+        return client
+
+    page_blob_service = t_page_blob_svc(account_name=client.account_name,
+                                        account_key=client.account_key,
+                                        sas_token=client.sas_token,
+                                        token_credential=client.token_credential)
+    page_blob_service.primary_endpoint = client.primary_endpoint
+    page_blob_service.secondary_endpoint = client.secondary_endpoint
+    page_blob_service.request_callback = client.request_callback
+    page_blob_service._httpclient = client._httpclient  # pylint: disable=protected-access
+    return page_blob_service
+
+
 def create_file_share_from_storage_client(cmd, client):
     t_file_svc = cmd.get_models('file.fileservice#FileService')
     return t_file_svc(account_name=client.account_name,
@@ -74,27 +115,61 @@ def glob_files_locally(folder_path, pattern):
     pattern = os.path.join(folder_path, pattern.lstrip('/')) if pattern else None
 
     len_folder_path = len(folder_path) + 1
+    match_path = compile_pattern(pattern)
     for root, _, files in os.walk(folder_path):
         for f in files:
             full_path = os.path.join(root, f)
-            if not pattern or _match_path(full_path, pattern):
+            if match_path(full_path):
                 yield (full_path, full_path[len_folder_path:])
 
 
-def glob_files_remotely(cmd, client, share_name, pattern):
+def glob_files_remotely(cmd, client, share_name, pattern, max_workers=1):
     """glob the files in remote file share based on the given pattern"""
+    for dir_name, file_name, _ in glob_files_remotely_with_size(cmd, client, share_name, pattern, max_workers):
+        yield dir_name, file_name
+
+
+def glob_files_remotely_with_size(cmd, client, share_name, pattern, max_workers=1):
+    """
+    glob the files in remote file share based on the given pattern, yield a tuple (dir, name, size) for every file.
+    Up to max_workers directories are listed concurrently, and the files are yielded as soon as their directory has
+    been listed.
+    """
     from collections import deque
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
     t_dir, t_file = cmd.get_models('file.models#Directory', 'file.models#File')
 
-    queue = deque([""])
-    while queue:
-        current_dir = queue.pop()
+    def _list_directory(current_dir):
+        files, dirs = [], []
         for f in client.list_directories_and_files(share_name, current_dir):
             if isinstance(f, t_file):
-                if not pattern or _match_path(os.path.join(current_dir, f.name), pattern):
-                    yield current_dir, f.name
+                files.append(f)
             elif isinstance(f, t_dir):
-                queue.appendleft(os.path.join(current_dir, f.name))
+                dirs.append(os.path.join(current_dir, f.name))
+        return files, dirs
+
+    match_path = compile_pattern(pattern)
+    queue = deque([""])
+    listing = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        while queue or listing:
+            while queue and len(listing) < max(1, max_workers):
+                current_dir = queue.popleft()
+                listing[executor.submit(_list_directory, current_dir)] = current_dir
+
+            done, _ = wait(list(listing), return_when=FIRST_COMPLETED)
+            for future in done:
+                current_dir = listing.pop(future)
+                files, dirs = future.result()
+                queue.extend(dirs)
+                for f in files:
+                    if match_path(os.path.join(current_dir, f.name)):
+                        yield current_dir, f.name, f.properties.content_length
+    finally:
+        for future in listing:
+            future.cancel()
+        executor.shutdown(wait=True)
 
 
 def create_short_lived_blob_sas(cmd, account_name, account_key, container, blob):
@@ -167,9 +242,30 @@ def _pattern_has_wildcards(p):
     return not p or p.find('*') != -1 or p.find('?') != -1 or p.find('[') != -1
 
 
-def _match_path(path, pattern):
-    from fnmatch import fnmatch
-    return fnmatch(path, pattern)
+def _get_pattern_prefix(pattern):
+    """
+    Get the literal part of the pattern before the first wildcard, which can be used to filter a listing on the
+    server side. The matching is case insensitive on the platforms where fnmatch normalizes the case of the paths
+    (e.g. Windows), so the prefix cannot be used there.
+    """
+    if not pattern or os.path.normcase('Aa/') != 'Aa/':
+        return ''
+    wildcards = [i for i in (pattern.find('*'), pattern.find('?'), pattern.find('[')) if i != -1]
+    return pattern[:min(wildcards)] if wildcards else pattern
+
+
+def compile_pattern(pattern):
+    """
+    Compile the pattern once into a function which matches a path to the pattern with the semantics of fnmatch.
+    Every path matches if pattern is empty.
+    """
+    if not pattern:
+        return lambda path: True
+
+    import re
+    from fnmatch import translate
+    regex = re.compile(translate(os.path.normcase(pattern)))
+    return lambda path: regex.match(os.path.normcase(path)) is not None
 
 
 def guess_content_type(file_path, original, settings_class):
@@ -209,7 +305,7 @@ def normalize_blob_file_path(path, name):
     return path_sep.join(os.path.normpath(name).split(os.path.sep)).strip(path_sep)
 
 
-def check_precondition_success(func):
+def check_precondition_success(func, log_failure=True):
     def wrapper(*args, **kwargs):
         from azure.common import AzureHttpError
         try:
@@ -221,8 +317,9 @@ def check_precondition_success(func):
             # https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/304
             if ex.status_code not in [304, 412]:
                 raise
-            from knack.log import get_logger
-            logger = get_logger(__name__)
-            logger.warning('Failed precondition')
+            if log_failure:
+                from knack.log import get_logger
+                logger = get_logger(__name__)
+                logger.warning('Failed precondition')
             return False, None
     return wrapper